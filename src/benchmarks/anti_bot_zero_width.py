@@ -0,0 +1,171 @@
+"""
+Micro-benchmark of anti_bot_zero_width, on the strings ducks send when they spawn and on the cartographer maps.
+
+    python -m benchmarks.anti_bot_zero_width --iterations 20000 --language fr
+
+The previous implementation, which rolled a die for each character, is kept here as a reference. Besides the speed
+of both, the report compares their output: how often a zero-width space follows each character that allows one, and
+how many zero-width spaces a string gets. Both should match up to sampling noise.
+"""
+import argparse
+import collections
+import json
+import random
+import time
+
+from utils.ducks import Duck, Map, MapTile, XCOORDS, YCOORDS, get_message_template
+from utils.interaction import NO_ZERO_WIDTH_AFTER, ZERO_WIDTH_CHANCE, ZERO_WIDTH_SPACE, anti_bot_zero_width
+
+
+def reference_anti_bot_zero_width(mystr: str):
+    addings = [
+        ZERO_WIDTH_SPACE,
+    ]
+
+    replacements = {
+        " ": [" "]
+    }
+
+    out = []
+    for char in mystr:
+        if char in replacements.keys():
+            if random.randint(1, 100) <= 50:
+                out.append(random.choice(replacements[char]))
+            else:
+                out.append(char)
+        else:
+            out.append(char)
+        if random.randint(1, 100) <= 15 and char not in ["\\", "*", "`", "~", ">", "|"]:
+            out.append(random.choice(addings))
+
+    return "".join(out)
+
+
+def reference_map_string(grid_map: Map):
+    string = "‮‭".join(XCOORDS) + "🔢\n"
+    string += "\n".join(
+        [
+            "".join(
+                map(
+                    lambda e: reference_anti_bot_zero_width(e.value)
+                    if e != MapTile.NOTHING
+                    else reference_anti_bot_zero_width(MapTile.TREE1.value),
+                    row,
+                )
+            )
+            + YCOORDS[i]
+            for i, row in enumerate(grid_map.grid)
+        ]
+    )
+
+    return string
+
+
+def spawn_strings(language: str) -> list:
+    """
+    Every trace, face and shout a normal duck can spawn with.
+    """
+    strings = []
+    for kind in ("traces", "faces", "shouts"):
+        strings.extend(get_message_template(language, Duck.category, kind))
+
+    return [string for string in strings if string]
+
+
+def measure(iterations: int, render, inputs: list, rounds: int) -> dict:
+    """
+    Time the rendering of the inputs, keeping the best of a few rounds so that noise from the machine is left out.
+    """
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(iterations):
+            render(inputs[i % len(inputs)])
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "us_per_call": round(best / iterations * 1_000_000, 2),
+        "calls_per_second": round(iterations / best),
+    }
+
+
+def zero_width_statistics(obfuscate, inputs: list, samples: int) -> dict:
+    """
+    Obfuscate strings again and again, and count where zero-width spaces land.
+    """
+    eligible = 0
+    inserted = 0
+    per_string = collections.Counter()
+
+    for i in range(samples):
+        mystr = inputs[i % len(inputs)]
+        out = obfuscate(mystr)
+
+        count = out.count(ZERO_WIDTH_SPACE) - mystr.count(ZERO_WIDTH_SPACE)
+        eligible += sum(1 for char in mystr if char not in NO_ZERO_WIDTH_AFTER)
+        inserted += count
+        per_string[count] += 1
+
+        if out.replace(ZERO_WIDTH_SPACE, "") != mystr.replace(ZERO_WIDTH_SPACE, ""):
+            raise AssertionError(f"{obfuscate.__name__} changed more than zero-width spaces in {mystr!r}")
+
+        position = 0
+        for char in out:
+            if char == ZERO_WIDTH_SPACE and position < len(mystr) and mystr[position] == ZERO_WIDTH_SPACE:
+                position += 1
+            elif char == ZERO_WIDTH_SPACE:
+                if mystr[position - 1] in NO_ZERO_WIDTH_AFTER:
+                    raise AssertionError(f"{obfuscate.__name__} added a zero-width space after {mystr[position - 1]!r}")
+            else:
+                position += 1
+
+    return {
+        "zero_width_rate": round(inserted / eligible, 4),
+        "mean_per_string": round(inserted / samples, 3),
+        "no_zero_width_strings": round(per_string[0] / samples, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time spent adding zero-width spaces to ducks messages.")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--samples", type=int, default=50_000, help="Strings obfuscated for the output comparison.")
+    parser.add_argument("--maps", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    strings = spawn_strings(args.language)
+    maps = [Map() for _ in range(args.maps)]
+
+    reference_spawn = measure(args.iterations, reference_anti_bot_zero_width, strings, args.rounds)
+    spawn = measure(args.iterations, anti_bot_zero_width, strings, args.rounds)
+    reference_maps = measure(args.iterations // 10, reference_map_string, maps, args.rounds)
+    maps_timing = measure(args.iterations // 10, Map.get_map_string, maps, args.rounds)
+
+    report = {
+        "language": args.language,
+        "expected_zero_width_rate": ZERO_WIDTH_CHANCE,
+        "spawn_strings": {
+            "count": len(strings),
+            "reference": reference_spawn,
+            "current": spawn,
+            "speedup": round(reference_spawn["us_per_call"] / spawn["us_per_call"], 1),
+            "reference_output": zero_width_statistics(reference_anti_bot_zero_width, strings, args.samples),
+            "current_output": zero_width_statistics(anti_bot_zero_width, strings, args.samples),
+        },
+        "maps": {
+            "count": len(maps),
+            "reference": reference_maps,
+            "current": maps_timing,
+            "speedup": round(reference_maps["us_per_call"] / maps_timing["us_per_call"], 1),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
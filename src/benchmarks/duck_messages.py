@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of the messages ducks send when they spawn, get hurt, get killed or leave.
+
+    python -m benchmarks.duck_messages --iterations 20000 --language fr
+
+No database nor Discord is needed: ducks get in-memory settings, and the hunter is a stand-in with a mention.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import time
+
+from benchmarks.ducks_spawning import FakeGuild, FakeTextChannel
+from utils.ducks import Duck, SuperDuck
+from utils.events import Events
+from utils.models import DiscordChannel, DiscordGuild
+
+
+class FakeBot:
+    def __init__(self, language: str):
+        self.language = language
+        self.current_event = Events.CALM
+
+    async def get_guild_language(self, guild):
+        return self.language
+
+
+class FakeMember:
+    id = 1
+    mention = "<@1>"
+
+
+class FakeHunter:
+    def __init__(self):
+        self.killed = collections.defaultdict(int, {"normal": 41, "super": 3})
+
+
+def make_duck(duck_class, bot: FakeBot, channel: FakeTextChannel):
+    duck = duck_class(bot, channel)
+    duck._db_channel = DiscordChannel(discord_id=channel.id, name=channel.name)
+    duck._db_guild = DiscordGuild(discord_id=channel.guild.id, name=channel.guild.name, language=bot.language)
+    duck.spawned_at = time.time() - 42
+    return duck
+
+
+async def measure(iterations: int, render) -> dict:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await render()
+    duration = time.perf_counter() - start
+
+    return {
+        "us_per_message": round(duration / iterations * 1_000_000, 2),
+        "messages_per_second": round(iterations / duration),
+    }
+
+
+async def run(args) -> dict:
+    bot = FakeBot(args.language)
+    channel = FakeTextChannel(1 << 22, FakeGuild(1 << 22, shard_id=0))
+    duck = make_duck(Duck, bot, channel)
+    super_duck = make_duck(SuperDuck, bot, channel)
+    await super_duck.get_lives()
+
+    killer, db_killer = FakeMember(), FakeHunter()
+
+    return {
+        "language": args.language,
+        "iterations": args.iterations,
+        "spawn": await measure(args.iterations, duck.get_spawn_message),
+        "kill": await measure(
+            args.iterations,
+            lambda: duck.get_kill_message(killer, db_killer, 18, 5, 0, 3),
+        ),
+        "hurt": await measure(args.iterations, lambda: super_duck.get_hurt_message(killer, db_killer, 1)),
+        "left": await measure(args.iterations, duck.get_left_message),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time spent rendering ducks messages.")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--language", default="fr")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure how much memory live ducks use.
+
+    python -m benchmarks.ducks_memory --ducks 50000
+
+Ducks are drawn with the default spawn weights of a channel, spread over fake channels, and a fraction of them get
+targeted (which creates their lock). The report gives the memory traced per duck, and checks that every duck
+survives a serialize / deserialize round trip unchanged.
+"""
+import argparse
+import json
+import random
+import tracemalloc
+
+from benchmarks.ducks_spawning import FakeGuild, FakeTextChannel
+from utils.ducks import RANDOM_DAYTIME_SPAWN_DUCKS_CLASSES, deserialize_duck
+from utils.models import DiscordChannel
+
+CHANNELS_COUNT = 1000
+
+
+def make_ducks(count: int, contested: float, rng: random.Random) -> list:
+    guild = FakeGuild(1 << 22, shard_id=0)
+    channels = [FakeTextChannel((index + 1) << 22, guild) for index in range(CHANNELS_COUNT)]
+
+    db_channel = DiscordChannel()
+    weights = [
+        getattr(db_channel, f"spawn_weight_{duck_class.category}_ducks")
+        for duck_class in RANDOM_DAYTIME_SPAWN_DUCKS_CLASSES
+    ]
+    classes = rng.choices(RANDOM_DAYTIME_SPAWN_DUCKS_CLASSES, weights=weights, k=count)
+
+    ducks = []
+    for duck_class in classes:
+        duck = duck_class(None, rng.choice(channels))
+        duck.spawned_at = 1_700_000_000
+        if rng.random() < contested:
+            # Someone shot at it
+            duck.target_lock
+        ducks.append(duck)
+
+    return ducks
+
+
+def check_round_trip(ducks: list) -> int:
+    """
+    Return the number of ducks that come back different from a serialize / deserialize round trip.
+    """
+    different = 0
+    for duck in ducks:
+        data = duck.serialize()
+        restored = deserialize_duck(None, duck.channel, json.loads(json.dumps(data, default=lambda obj: None)))
+        restored_data = restored.serialize()
+
+        for key in ("spawned_at", "spawned_for"):
+            data.pop(key)
+            restored_data.pop(key)
+
+        if restored_data != data:
+            different += 1
+
+    return different
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory used by live ducks.")
+    parser.add_argument("--ducks", type=int, default=50_000)
+    parser.add_argument("--contested", type=float, default=0.05, help="Fraction of ducks that get shot at.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    # Warm up the caches shared by every duck, so that they aren't counted.
+    make_ducks(100, args.contested, rng)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    ducks = make_ducks(args.ducks, args.contested, rng)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = {
+        "ducks": len(ducks),
+        "traced_mb": round((after - before) / 1024 / 1024, 2),
+        "bytes_per_duck": round((after - before) / len(ducks)),
+        "round_trip_differences": check_round_trip(ducks),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
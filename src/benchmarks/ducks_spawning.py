@@ -0,0 +1,336 @@
+"""
+Offline benchmark of the ducks spawning loop, without Discord nor a database.
+
+    python -m benchmarks.ducks_spawning --channels 100000 --hours 24
+
+This builds fake text channels and in-memory DiscordChannel rows with varied ducks per day, night hours and ducks
+time to live, then drives the real DucksSpawning cog (planification, spawn rolls, leaves and dispatch) on a virtual
+clock, one second after the other. Spawning and leaving only update counters, so the report measures the loop itself:
+tick latencies, ducks spawned versus planned for every channel, and peak memory.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import random
+import resource
+import time
+import tracemalloc
+import typing
+
+from cogs import ducks_spawning
+from utils.channels import ChannelsRegistry
+from utils.events import Events
+from utils.journal import DucksJournal
+from utils.models import DiscordChannel, DucksLeft
+from utils.scheduling import DuckExpiryQueue
+from utils.timings import LatencyHistogram
+
+SECOND = 1
+MINUTE = 60 * SECOND
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+CHANNELS_PER_GUILD = 3
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, shard_id: int):
+        self.id = guild_id
+        self.shard_id = shard_id
+        self.name = f"Guild {guild_id}"
+
+
+class FakeTextChannel:
+    """
+    Stands for a discord.TextChannel: hashable, with an ID and a guild, which is all the spawning loop looks at.
+    """
+
+    def __init__(self, channel_id: int, guild: FakeGuild):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f"channel-{channel_id}"
+
+    def __hash__(self):
+        return self.id
+
+    def __eq__(self, other):
+        return isinstance(other, FakeTextChannel) and other.id == self.id
+
+
+class SimulatedDuck:
+    """
+    A duck that only exists in the bot ducks_spawned and expiry queue, and leaves without sending anything.
+    """
+
+    def __init__(self, bot: "FakeBot", channel: FakeTextChannel, spawned_at: int, time_to_live: int):
+        self.bot = bot
+        self.channel = channel
+        self.spawned_at = spawned_at
+        self.expires_at = spawned_at + time_to_live
+
+    async def leave(self):
+        self.bot.ducks_spawned[self.channel].remove(self)
+        self.expires_at = None
+        self.bot.stats.left += 1
+
+
+class SimulationStats:
+    def __init__(self):
+        self.spawned: typing.Counter[int] = collections.Counter()
+        self.left = 0
+
+
+class FakeBot:
+    """
+    The parts of MyBot used by the DucksSpawning cog.
+    """
+
+    def __init__(self, channels: typing.List[FakeTextChannel], shards_count: int, config: dict, events: bool):
+        self.logger = logging.getLogger("benchmark")
+        self.config = config
+        self.channels_registry = ChannelsRegistry()
+        for channel in channels:
+            self.channels_registry.add(channel)
+        self.shards_ready = set(range(shards_count))
+        self.current_event = Events.CALM
+        self.stay_tuned_was_n_events_ago = 99
+        self.calm_times_ahead_was_n_events_ago = 99
+        self.allow_ducks_spawning = True
+        self.cluster = None
+        # Events change the number of ducks spawned, so they are only rolled when asked to.
+        self.is_cluster_leader = events
+
+        self.ducks_spawned = collections.defaultdict(collections.deque)
+        self.ducks_expiry_queue = DuckExpiryQueue(self)
+        # Never started, so nothing is written to disk.
+        self.ducks_journal = DucksJournal(self, name="ducks_benchmark")
+        self.enabled_channels: typing.Dict[FakeTextChannel, DucksLeft] = {}
+        self.stats = SimulationStats()
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def get_channel(self, channel_id: int):
+        return self.channels_registry.get(channel_id)
+
+    async def log_to_channel(self, *args, **kwargs):
+        return True
+
+    async def change_presence(self, *args, **kwargs):
+        pass
+
+
+def build_channels(
+        count: int, shards_count: int, rng: random.Random
+) -> typing.Tuple[typing.List[FakeTextChannel], typing.List[DiscordChannel]]:
+    """
+    Make `count` channels, with a mix of default and custom settings, like on the real bot.
+    """
+    channels, db_channels = [], []
+    guild = None
+
+    for index in range(count):
+        if index % CHANNELS_PER_GUILD == 0:
+            guild_id = (index // CHANNELS_PER_GUILD + 1) << 22
+            guild = FakeGuild(guild_id, shard_id=(guild_id >> 22) % shards_count)
+
+        channel_id = (index + 1) << 22 | 1
+        channels.append(FakeTextChannel(channel_id, guild))
+
+        ducks_per_day = 96 if rng.random() < 0.6 else rng.randint(1, 300)
+
+        night_kind = rng.random()
+        if night_kind < 0.6:
+            # No night
+            night_start_at, night_end_at = 0, 0
+        elif night_kind < 0.85:
+            # Night on the same day
+            night_start_at = rng.randint(0, 6 * HOUR)
+            night_end_at = night_start_at + rng.randint(2 * HOUR, 10 * HOUR)
+        else:
+            # Night over midnight
+            night_start_at = rng.randint(20 * HOUR, DAY - 1)
+            night_end_at = rng.randint(4 * HOUR, 8 * HOUR)
+
+        ducks_time_to_live = 660 if rng.random() < 0.4 else rng.randint(MINUTE, HOUR)
+
+        db_channels.append(
+            DiscordChannel(
+                discord_id=channel_id,
+                name=channels[-1].name,
+                enabled=True,
+                ducks_per_day=ducks_per_day,
+                night_start_at=night_start_at,
+                night_end_at=night_end_at,
+                ducks_time_to_live=ducks_time_to_live,
+            )
+        )
+
+    return channels, db_channels
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def simulate(args) -> dict:
+    rng = random.Random(args.seed)
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    setup_start = time.perf_counter()
+    channels, db_channels = build_channels(args.channels, args.shards, rng)
+    db_channels_by_id = {db_channel.discord_id: db_channel for db_channel in db_channels}
+    setup_duration = time.perf_counter() - setup_start
+
+    config = {
+        "cogs": {
+            "DucksSpawning": {
+                "dispatch_rate": args.dispatch_rate,
+                "dispatch_burst": args.dispatch_burst,
+            }
+        }
+    }
+    bot = FakeBot(channels, args.shards, config, events=args.events)
+    cog = ducks_spawning.DucksSpawning(bot)
+    cog.interval = 1
+    cog.last_planned_day = 0
+    cog.current_iteration_public = 0
+
+    async def get_enabled_channels():
+        return db_channels
+
+    # Read the channels from memory instead of the database.
+    ducks_spawning.get_enabled_channels = get_enabled_channels
+
+    async def spawn_duck(channel, db_channel=None, sun_state=None, ghost=False):
+        if not bot.allow_ducks_spawning:
+            return
+
+        db_channel = db_channel or db_channels_by_id[channel.id]
+        duck = SimulatedDuck(bot, channel, cog.current_iteration_public, db_channel.ducks_time_to_live)
+        bot.ducks_spawned[channel].append(duck)
+        bot.ducks_expiry_queue.push(duck)
+        bot.stats.spawned[channel.id] += 1
+
+    # Ducks spawns only update counters.
+    cog.spawn_duck = spawn_duck
+
+    start = args.start - args.start % DAY
+    end = start + int(args.hours * HOUR)
+
+    second_latency = LatencyHistogram()
+    planned: typing.Dict[int, int] = {}
+
+    simulation_start = time.perf_counter()
+    for now in range(start, end):
+        second_start = time.perf_counter()
+
+        await cog.global_tick(now)
+        if now == start:
+            planned = {channel.id: ducks_left.ducks_left for channel, ducks_left in bot.enabled_channels.items()}
+            # The shard loops are driven by the virtual clock below.
+            for partition in cog.partitions.values():
+                partition.task.cancel()
+
+        for partition in cog.partitions.values():
+            await cog.shard_tick(partition, now)
+
+        # Let the dispatched spawns and leaves run.
+        await asyncio.sleep(0)
+
+        second_latency.record(time.perf_counter() - second_start)
+
+    simulation_duration = time.perf_counter() - simulation_start
+
+    # Channels report
+    full_day = end - start >= DAY
+    spawned_total = sum(bot.stats.spawned.values())
+    due_total = 0
+    mismatches = 0
+    max_difference = 0
+    for channel, ducks_left in bot.enabled_channels.items():
+        due = planned[channel.id] - ducks_left.ducks_left
+        due_total += due
+        difference = abs(bot.stats.spawned[channel.id] - due)
+        if difference:
+            mismatches += 1
+            max_difference = max(max_difference, difference)
+
+    report = {
+        "channels": args.channels,
+        "shards": args.shards,
+        "simulated_seconds": end - start,
+        "setup_seconds": round(setup_duration, 2),
+        "simulation_seconds": round(simulation_duration, 2),
+        "virtual_second": second_latency.summary(),
+        "loop": cog.timings.summary(),
+        "ducks": {
+            "ducks_per_day": sum(db_channel.ducks_per_day for db_channel in db_channels),
+            "planned": sum(planned.values()),
+            "due": due_total,
+            "spawned": spawned_total,
+            "left": bot.stats.left,
+            "still_on_channels": spawned_total - bot.stats.left,
+            "channels_not_matching_due": mismatches,
+            "max_difference_with_due": max_difference,
+            "waiting_in_dispatch_queues": sum(len(p.dispatch_queue) for p in cog.partitions.values()),
+        },
+        "dispatch": {
+            shard_id: {
+                "dispatched": partition.dispatch_queue.dispatched,
+                "deferred": partition.dispatch_queue.deferred,
+                "mean_deferral": round(partition.dispatch_queue.mean_deferral, 2),
+                "max_deferral": partition.dispatch_queue.max_deferral,
+            }
+            for shard_id, partition in sorted(cog.partitions.items())
+        },
+        "memory": {
+            "max_rss_mb": max_rss_mb(),
+        },
+    }
+
+    if full_day:
+        # Over a whole day, channels should get the ducks per day set in their settings.
+        report["ducks"]["channels_not_matching_ducks_per_day"] = sum(
+            1 for db_channel in db_channels if bot.stats.spawned[db_channel.discord_id] != db_channel.ducks_per_day
+        )
+
+    if args.trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["memory"]["traced_peak_mb"] = round(peak / 1024 / 1024, 1)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ducks spawning loop on a simulated day.")
+    parser.add_argument("--channels", type=int, default=10_000, help="Number of enabled channels (1k to 1M).")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--hours", type=float, default=24, help="Simulated hours, starting at midnight (max 24).")
+    parser.add_argument("--start", type=int, default=int(time.time()), help="Timestamp of the simulated day.")
+    parser.add_argument("--dispatch-rate", type=float, default=40, help="Spawns and leaves per second per shard.")
+    parser.add_argument("--dispatch-burst", type=float, default=None)
+    parser.add_argument("--events", action="store_true", help="Roll events every hour, like the cluster leader.")
+    parser.add_argument("--trace-memory", action="store_true", help="Trace Python allocations (much slower).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the channels settings.")
+    parser.add_argument("--verbose", action="store_true", help="Show the loop warnings, like deferred dispatches.")
+    args = parser.parse_args()
+
+    if not 0 < args.hours <= 24:
+        parser.error("--hours must be between 0 and 24, the loop plans one day at a time.")
+
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.ERROR)
+
+    report = asyncio.run(simulate(args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
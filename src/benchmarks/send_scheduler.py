@@ -0,0 +1,154 @@
+"""
+Simulate outbound messages going through the send scheduler, to check that spawns stay fast when traffic grows.
+
+    python -m benchmarks.send_scheduler --channels 300 --seconds 5 --latency 0.08 --max-in-flight 10
+
+Every channel sends spawns, kills, leaves and bushes loot at random. A fake Discord answers each message after
+`latency` seconds, with the rate limit headers of a bucket of 5 messages per 5 seconds per channel, which the
+scheduler reads like it does with the real responses. The run is done with the normal traffic, then with twice as
+much (like during the MIGRATING event), both with priorities and with every message at the same priority.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import types
+
+import yarl
+
+from utils.send_scheduler import MessagePriority, SendScheduler
+
+# (priority, share of the messages)
+MESSAGES_MIX = {
+    "spawn": (MessagePriority.HIGH, 0.3),
+    "kill": (MessagePriority.HIGH, 0.25),
+    "leave": (MessagePriority.LOW, 0.3),
+    "bushes": (MessagePriority.LOW, 0.15),
+}
+
+BUCKET_LIMIT = 5
+BUCKET_PERIOD = 5
+
+
+class FakeDiscord:
+    def __init__(self, scheduler: SendScheduler, latency: float):
+        self.scheduler = scheduler
+        self.latency = latency
+        # Channel ID -> (window start, messages sent in the window)
+        self.windows = {}
+        self.rate_limited = 0
+
+    async def post(self, channel_id: int):
+        await asyncio.sleep(self.latency)
+
+        now = time.monotonic()
+        start, count = self.windows.get(channel_id, (now, 0))
+        if now - start >= BUCKET_PERIOD:
+            start, count = now, 0
+
+        status = 200
+        if count >= BUCKET_LIMIT:
+            status = 429
+            self.rate_limited += 1
+        else:
+            count += 1
+        self.windows[channel_id] = (start, count)
+
+        reset_after = BUCKET_PERIOD - (now - start)
+        response = types.SimpleNamespace(
+            status=status,
+            headers={
+                "X-RateLimit-Limit": str(BUCKET_LIMIT),
+                "X-RateLimit-Remaining": str(BUCKET_LIMIT - count),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                "Retry-After": f"{reset_after:.3f}",
+            },
+        )
+        params = types.SimpleNamespace(
+            method="POST",
+            url=yarl.URL(f"https://discord.com/api/v10/channels/{channel_id}/messages"),
+            response=response,
+        )
+        await self.scheduler._on_request_end(None, None, params)
+
+        if status == 429:
+            # discord.py retries by itself after the reset
+            await asyncio.sleep(reset_after)
+            await self.post(channel_id)
+
+
+async def simulate(args, traffic: float, use_priorities: bool) -> dict:
+    scheduler = SendScheduler(None, max_in_flight=args.max_in_flight)
+    discord = FakeDiscord(scheduler, args.latency)
+    rng = random.Random(args.seed)
+
+    kinds = list(MESSAGES_MIX)
+    weights = [share for _, share in MESSAGES_MIX.values()]
+    # Messages per second, for all channels
+    rate = args.channels * args.messages_per_channel_minute / 60 * traffic
+
+    waits = {kind: [] for kind in kinds}
+    sends = []
+
+    async def send(kind: str, channel_id: int):
+        priority = MESSAGES_MIX[kind][0] if use_priorities else MessagePriority.NORMAL
+        queued_at = time.monotonic()
+        started_at = None
+
+        async def post():
+            nonlocal started_at
+            started_at = time.monotonic()
+            await discord.post(channel_id)
+
+        await scheduler.send(("channels", channel_id), priority, post)
+        waits[kind].append(started_at - queued_at)
+
+    end = time.monotonic() + args.seconds
+    while time.monotonic() < end:
+        await asyncio.sleep(rng.expovariate(rate))
+        kind = rng.choices(kinds, weights)[0]
+        sends.append(asyncio.create_task(send(kind, rng.randrange(args.channels))))
+
+    await asyncio.gather(*sends)
+    scheduler.close()
+
+    report = {"messages": len(sends), "rate_limited_responses": discord.rate_limited}
+    for kind, kind_waits in waits.items():
+        kind_waits.sort()
+        if kind_waits:
+            report[kind] = {
+                "p50_ms": round(kind_waits[len(kind_waits) // 2] * 1000, 1),
+                "p99_ms": round(kind_waits[int(len(kind_waits) * 0.99)] * 1000, 1),
+            }
+    return report
+
+
+async def run(args) -> dict:
+    return {
+        "normal_traffic": {
+            "priorities": await simulate(args, 1, True),
+            "same_priority": await simulate(args, 1, False),
+        },
+        "double_traffic": {
+            "priorities": await simulate(args, 2, True),
+            "same_priority": await simulate(args, 2, False),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long messages wait in the send scheduler.")
+    parser.add_argument("--channels", type=int, default=300)
+    parser.add_argument("--messages-per-channel-minute", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--latency", type=float, default=0.08, help="Time Discord takes to answer, in seconds.")
+    parser.add_argument("--max-in-flight", type=int, default=10, help="Low enough for twice the traffic to queue.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
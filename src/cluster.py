@@ -0,0 +1,86 @@
+"""
+Run the bot in cluster mode, with the shards split between many worker processes on the same machine.
+
+    python cluster.py
+
+The launcher starts the coordinator (see utils/cluster.py), then one worker process per shards range, as set in the
+[cluster] section of the config. Workers that crash are restarted.
+"""
+import asyncio
+import os
+import signal
+import sys
+
+from main import config, create_bot
+from utils.cluster import ClusterClient, Coordinator, split_shards
+from utils.journal import DucksJournal
+from utils.logger import FakeLogger
+
+RESTART_DELAY = 10
+
+
+async def run_worker(worker_id: int):
+    cluster_config = config["cluster"]
+    shard_count = cluster_config["shard_count"]
+    shard_ids = split_shards(shard_count, cluster_config["workers"])[worker_id]
+
+    bot = create_bot(shard_ids=shard_ids, shard_count=shard_count)
+    bot.cluster = ClusterClient(bot, cluster_config["socket_path"], worker_id, shard_ids)
+    # Each worker only restores the ducks of its own shards
+    bot.ducks_journal = DucksJournal(bot, name=f"ducks_worker_{worker_id}")
+
+    async with bot:
+        await bot.start(config["auth"]["discord"]["token"])
+
+
+async def run_launcher():
+    logger = FakeLogger()
+    cluster_config = config["cluster"]
+    workers_count = cluster_config["workers"]
+    start_delay = cluster_config.get("start_delay", 5)
+
+    coordinator = Coordinator(cluster_config["socket_path"], logger)
+    await coordinator.start()
+
+    processes = {}
+    stopping = False
+
+    def stop(signame):
+        nonlocal stopping
+        logger.warning(f"Received signal {signame}, stopping workers...")
+        stopping = True
+        for process in processes.values():
+            if process.returncode is None:
+                process.send_signal(signal.SIGTERM)
+
+    loop = asyncio.get_running_loop()
+    for signame in {"SIGINT", "SIGTERM"}:
+        loop.add_signal_handler(getattr(signal, signame), stop, signame)
+
+    async def supervise(worker_id: int):
+        # Don't make every shard identify at the same time.
+        await asyncio.sleep(worker_id * start_delay)
+
+        while not stopping:
+            logger.info(f"Starting worker {worker_id}...")
+            process = processes[worker_id] = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), "worker", str(worker_id)
+            )
+            return_code = await process.wait()
+
+            if stopping:
+                break
+
+            logger.error(f"Worker {worker_id} exited with code {return_code}, restarting it in {RESTART_DELAY} seconds...")
+            await asyncio.sleep(RESTART_DELAY)
+
+    await asyncio.gather(*(supervise(worker_id) for worker_id in range(workers_count)))
+    await coordinator.stop()
+    logger.warning("Cluster stopped. Bye.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "worker":
+        asyncio.run(run_worker(int(sys.argv[2])))
+    else:
+        asyncio.run(run_launcher())
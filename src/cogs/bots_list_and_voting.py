@@ -36,7 +36,9 @@ class BotsListVoting(Cog):
             custom1=self.statcord_custom_value_ducks_spawned,
             custom2=self.statcord_custom_value_players_count,
         )
-        self.statcord_api.start_loop()
+        if not self.bot.cluster or self.bot.cluster.worker_id == 0:
+            # In cluster mode, statcord only gets the stats of the first worker.
+            self.statcord_api.start_loop()
         self.last_stats_post = 0
 
     @Cog.listener()
@@ -359,6 +361,9 @@ class BotsListVoting(Cog):
         await asyncio.sleep(30)
         await self.bot.wait_until_ready()
 
+        if not self.bot.is_cluster_leader:
+            return "Stats are posted by the cluster leader."
+
         if int(time.time()) - self.last_stats_post < 30 * 60:
             return "Can't post stats more than twice per hour."
         else:
@@ -366,7 +371,7 @@ class BotsListVoting(Cog):
 
         self.bot.logger.debug(f"Updating stats on bots list")
 
-        server_count = len(self.bot.guilds)
+        server_count = await self.bot.get_guilds_count()
         shard_count = self.bot.shard_count
 
         for bot_list in await self.get_bot_list():
@@ -86,9 +86,23 @@ class DuckBoss(Cog):
 
         return new_embed
 
+    async def cog_load(self):
+        if self.bot.cluster:
+            self.bot.cluster.add_handler("spawn_boss", self.cluster_spawn_boss)
+
+    async def cluster_spawn_boss(self, data):
+        if self.bot.get_channel(self.config()["boss_channel_id"]):
+            await self.spawn_boss()
+            return True
+        return False
+
     @tasks.loop(minutes=1)
     async def background_loop(self):
         channel = self.bot.get_channel(self.config()["boss_channel_id"])
+        if not channel and self.bot.cluster:
+            # The boss channel is on another worker, the boss loop runs there.
+            return
+
         latest_messages = [m async for m in channel.history(limit=1)]
 
         if not latest_messages:
@@ -80,7 +80,7 @@ class DucksHuntingCommands(Cog):
         language_code = await ctx.get_language_code()
 
         if db_hunter.is_powerup_active("dead"):
-            db_hunter.shooting_stats["shots_when_dead"] += 1
+            db_hunter.increment("shooting_stats", "shots_when_dead")
             await db_hunter.save()
             await CommandView(
                 self.bot,
@@ -99,7 +99,7 @@ class DucksHuntingCommands(Cog):
             return False
 
         if db_hunter.is_powerup_active("wet"):
-            db_hunter.shooting_stats["shots_when_wet"] += 1
+            db_hunter.increment("shooting_stats", "shots_when_wet")
             await db_hunter.save()
 
             td = get_timedelta(db_hunter.active_powerups["wet"], now)
@@ -121,7 +121,7 @@ class DucksHuntingCommands(Cog):
             return False
 
         if db_hunter.is_powerup_active("confiscated"):
-            db_hunter.shooting_stats["shots_when_confiscated"] += 1
+            db_hunter.increment("shooting_stats", "shots_when_confiscated")
             await db_hunter.save()
 
             await CommandView(
@@ -153,7 +153,7 @@ class DucksHuntingCommands(Cog):
 
             db_hunter.weapon_sabotaged_by = None
             db_hunter.active_powerups["jammed"] = 1
-            db_hunter.shooting_stats["shots_when_sabotaged"] += 1
+            db_hunter.increment("shooting_stats", "shots_when_sabotaged")
             await db_hunter.save()
 
             await ctx.reply(
@@ -167,7 +167,7 @@ class DucksHuntingCommands(Cog):
             return False
 
         if db_hunter.is_powerup_active("jammed"):
-            db_hunter.shooting_stats["shots_when_jammed"] += 1
+            db_hunter.increment("shooting_stats", "shots_when_jammed")
             await db_hunter.save()
 
             await CommandView(
@@ -191,9 +191,9 @@ class DucksHuntingCommands(Cog):
                 if db_hunter.magazines > 0:
                     db_hunter.magazines -= 1
                     db_hunter.bullets = level_info["bullets"]
-                    db_hunter.shooting_stats["autoreloads"] += 1
+                    db_hunter.increment("shooting_stats", "autoreloads")
                 else:
-                    db_hunter.shooting_stats["failed_autoreloads"] += 1
+                    db_hunter.increment("shooting_stats", "failed_autoreloads")
                     await db_hunter.save()
                     if level_info["bullets"] > 2:
                         await CommandView(
@@ -229,7 +229,7 @@ class DucksHuntingCommands(Cog):
                         )
                     return False
             else:
-                db_hunter.shooting_stats["shots_with_empty_magazine"] += 1
+                db_hunter.increment("shooting_stats", "shots_with_empty_magazine")
                 await db_hunter.save()
 
                 await CommandView(
@@ -259,7 +259,7 @@ class DucksHuntingCommands(Cog):
             lucky = lucky and compute_luck(level_info["reliability"])
 
         if not lucky:
-            db_hunter.shooting_stats["shots_jamming_weapon"] += 1
+            db_hunter.increment("shooting_stats", "shots_jamming_weapon")
             db_hunter.active_powerups["jammed"] = 1
             await db_hunter.save()
             msg = _("💥 Your weapon jammed. Reload it and consider buying grease next time.")
@@ -283,16 +283,16 @@ class DucksHuntingCommands(Cog):
             return False
 
         db_hunter.bullets -= 1
-        db_hunter.shooting_stats["bullets_used"] += 1
+        db_hunter.increment("shooting_stats", "bullets_used")
         db_channel = await get_from_db(ctx.channel)
 
         homing = db_hunter.is_powerup_active("homing_bullets")
         if homing:
             db_hunter.active_powerups["homing_bullets"] -= 1
-            db_hunter.shooting_stats["homing_kills"] += 1
-            db_hunter.shooting_stats["missed"] += 1
-            db_hunter.shooting_stats["killed"] += 1
-            db_hunter.shooting_stats["murders"] += 1
+            db_hunter.increment("shooting_stats", "homing_kills")
+            db_hunter.increment("shooting_stats", "missed")
+            db_hunter.increment("shooting_stats", "killed")
+            db_hunter.increment("shooting_stats", "murders")
             db_hunter.active_powerups["dead"] += 1
             await db_hunter.edit_experience_with_levelups(ctx, -2)  # Missed
 
@@ -384,7 +384,7 @@ class DucksHuntingCommands(Cog):
             murder = bool(target)
 
             if missed:
-                db_hunter.shooting_stats["missed"] += 1
+                db_hunter.increment("shooting_stats", "missed")
                 await db_hunter.edit_experience_with_levelups(ctx, -2)
 
             # Killing
@@ -399,7 +399,7 @@ class DucksHuntingCommands(Cog):
             if killed_someone:
                 if murder:
                     db_target: Player = await get_player(target, ctx.channel)
-                    db_hunter.shooting_stats["murders"] += 1
+                    db_hunter.increment("shooting_stats", "murders")
                 else:
                     db_target: Player = await get_random_player(db_channel)
                     if db_target.member.user.discord_id == 138751484517941259:
@@ -418,8 +418,8 @@ class DucksHuntingCommands(Cog):
                         and target_coat_color == Coats.ORANGE
                         and random.randint(1, 100) <= 75
                 ):
-                    db_hunter.shooting_stats["near_misses"] += 1
-                    db_target.shooting_stats["near_missed"] += 1
+                    db_hunter.increment("shooting_stats", "near_misses")
+                    db_target.increment("shooting_stats", "near_missed")
 
                     await ctx.reply(
                         _(
@@ -437,10 +437,10 @@ class DucksHuntingCommands(Cog):
                         hunter_coat_color == Coats.PINK and target_coat_color == Coats.PINK
                 ):
                     if murder:
-                        db_hunter.shooting_stats["murders"] -= 1  # Cancel the murder
+                        db_hunter.increment("shooting_stats", "murders", -1)  # Cancel the murder
 
-                        db_hunter.shooting_stats["love_avoids_murder"] += 1
-                        db_target.shooting_stats["love_avoided_murder"] += 1
+                        db_hunter.increment("shooting_stats", "love_avoids_murder")
+                        db_target.increment("shooting_stats", "love_avoided_murder")
 
                         await ctx.reply(
                             _(
@@ -451,8 +451,8 @@ class DucksHuntingCommands(Cog):
                             force_public=True,
                         )
                     else:
-                        db_hunter.shooting_stats["love_avoids_accidents"] += 1
-                        db_target.shooting_stats["love_avoided_accidents"] += 1
+                        db_hunter.increment("shooting_stats", "love_avoids_accidents")
+                        db_target.increment("shooting_stats", "love_avoided_accidents")
 
                         await ctx.reply(
                             _(
@@ -470,7 +470,7 @@ class DucksHuntingCommands(Cog):
                         db_hunter.is_powerup_active("kill_licence") and not murder
                 )
 
-                db_hunter.shooting_stats["killed"] += 1
+                db_hunter.increment("shooting_stats", "killed")
 
                 if hunter_coat_color == Coats.RED and murder:
                     await db_hunter.edit_experience_with_levelups(ctx, -15)
@@ -480,9 +480,9 @@ class DucksHuntingCommands(Cog):
 
                 if db_target.id == db_hunter.id:
                     db_target = db_hunter
-                    db_hunter.shooting_stats["suicides"] += 1
+                    db_hunter.increment("shooting_stats", "suicides")
 
-                db_target.shooting_stats["got_killed"] += 1
+                db_target.increment("shooting_stats", "got_killed")
                 db_target.active_powerups["dead"] += 1
 
                 if db_target.id != db_hunter.id:
@@ -598,8 +598,8 @@ class DucksHuntingCommands(Cog):
         if duck:
             if self.bot.current_event == Events.REVOLUTION:
                 if random.randint(0, 99) < 10:
-                    db_hunter.shooting_stats["shot_by_duck"] += 1
-                    db_hunter.shooting_stats["got_killed"] += 1
+                    db_hunter.increment("shooting_stats", "shot_by_duck")
+                    db_hunter.increment("shooting_stats", "got_killed")
                     db_hunter.active_powerups["dead"] += 1
 
                     await db_hunter.edit_experience_with_levelups(ctx, -2)
@@ -618,20 +618,20 @@ class DucksHuntingCommands(Cog):
 
                     return False
 
-            db_hunter.shooting_stats["shots_with_duck"] += 1
+            db_hunter.increment("shooting_stats", "shots_with_duck")
             duck.db_target_lock_by = db_hunter  # Since we have unsaved data
             result = await duck.shoot(args)
             if result is False and db_hunter.is_powerup_active("detector"):
                 db_hunter.bullets += 1
-                db_hunter.shooting_stats["bullets_used"] -= 1
+                db_hunter.increment("shooting_stats", "bullets_used", -1)
                 # Since the detector is used here.
                 db_hunter.active_powerups["detector"] -= 1
-                db_hunter.shooting_stats["shots_stopped_by_detector"] += 1
+                db_hunter.increment("shooting_stats", "shots_stopped_by_detector")
                 await db_hunter.save()
         elif db_hunter.is_powerup_active("detector"):
             db_hunter.active_powerups["detector"] -= 1
-            db_hunter.shooting_stats["shots_stopped_by_detector"] += 1
-            db_hunter.shooting_stats["bullets_used"] -= 1
+            db_hunter.increment("shooting_stats", "shots_stopped_by_detector")
+            db_hunter.increment("shooting_stats", "bullets_used", -1)
             db_hunter.bullets += 1
             await db_hunter.save()
             await ctx.reply(
@@ -641,7 +641,7 @@ class DucksHuntingCommands(Cog):
                 force_public=True,
             )
         else:
-            db_hunter.shooting_stats["shots_without_ducks"] += 1
+            db_hunter.increment("shooting_stats", "shots_without_ducks")
             await db_hunter.edit_experience_with_levelups(ctx, -2)
             await db_hunter.save()
             await ctx.reply(
@@ -662,7 +662,7 @@ class DucksHuntingCommands(Cog):
         now = int(time.time())
 
         if db_hunter.is_powerup_active("confiscated"):
-            db_hunter.shooting_stats["reloads_when_confiscated"] += 1
+            db_hunter.increment("shooting_stats", "reloads_when_confiscated")
             await db_hunter.save()
 
             await CommandView(
@@ -691,7 +691,7 @@ class DucksHuntingCommands(Cog):
         level_info = db_hunter.level_info()
 
         if db_hunter.bullets <= 0 and db_hunter.magazines >= 1:
-            db_hunter.shooting_stats["reloads"] += 1
+            db_hunter.increment("shooting_stats", "reloads")
             db_hunter.magazines -= 1
             db_hunter.bullets = level_info["bullets"]
 
@@ -708,7 +708,7 @@ class DucksHuntingCommands(Cog):
             )
             return True
         elif db_hunter.bullets > 0:
-            db_hunter.shooting_stats["unneeded_reloads"] += 1
+            db_hunter.increment("shooting_stats", "unneeded_reloads")
             await db_hunter.save()
 
             await ctx.reply(
@@ -722,7 +722,7 @@ class DucksHuntingCommands(Cog):
             )
             return False
         elif db_hunter.magazines <= 0:
-            db_hunter.shooting_stats["empty_reloads"] += 1
+            db_hunter.increment("shooting_stats", "empty_reloads")
             await db_hunter.save()
             await CommandView(
                 self.bot,
@@ -778,7 +778,7 @@ class DucksHuntingCommands(Cog):
         db_hunter: Player = await get_player(ctx.author, ctx.channel, giveback=True)
 
         if db_hunter.is_powerup_active("dead"):
-            db_hunter.hugged["when_dead"] += 1
+            db_hunter.increment("hugged", "when_dead")
             await db_hunter.save()
             await ctx.reply(
                 _(
@@ -794,11 +794,11 @@ class DucksHuntingCommands(Cog):
                 return False
             else:
                 await ctx.reply(_("🌳 You hugged the tree... Thanks!"))
-                db_hunter.hugged["trees"] += 1
+                db_hunter.increment("hugged", "trees")
                 await db_hunter.save()
                 return
         elif isinstance(target, discord.Role):
-            db_hunter.hugged["roles"] += 1
+            db_hunter.increment("hugged", "roles")
             await db_hunter.save()
 
             you_mention = ctx.author.mention
@@ -833,7 +833,7 @@ class DucksHuntingCommands(Cog):
             target_mention = target.mention
 
             if target.id == self.bot.user.id:
-                db_hunter.hugged["duckhunt"] += 1
+                db_hunter.increment("hugged", "duckhunt")
                 await db_hunter.save()
                 await ctx.reply(
                     _(
@@ -846,7 +846,7 @@ class DucksHuntingCommands(Cog):
                 )
                 return
 
-            db_hunter.hugged["players"] += 1
+            db_hunter.increment("hugged", "players")
             await db_hunter.save()
             if target.id == 687932431314976790:
                 # https://discord.com/channels/195260081036591104/195260081036591104/863475741840506900
@@ -888,7 +888,7 @@ class DucksHuntingCommands(Cog):
                 await ctx.reply(_("You hugged a tree, Wizzz?!"))
             else:
                 await ctx.reply(_("What are you trying to hug, exactly? A tree?"))
-            db_hunter.hugged["nothing"] += 1
+            db_hunter.increment("hugged", "nothing")
             await db_hunter.save()
 
     @commands.command(aliases=["cpr", "brains", "zombie", "undead"])
@@ -904,15 +904,15 @@ class DucksHuntingCommands(Cog):
         dead_times = db_hunter.active_powerups["dead"]
 
         if dead_times == 0:
-            db_hunter.shooting_stats["useless_revives"] += 1
+            db_hunter.increment("shooting_stats", "useless_revives")
             await db_hunter.save()
             await ctx.reply(_("You are already alive and well."))
             return
 
         else:
             db_hunter.active_powerups["dead"] = 0
-            db_hunter.shooting_stats["revives"] += 1
-            db_hunter.shooting_stats["brains_eaten"] += dead_times
+            db_hunter.increment("shooting_stats", "revives")
+            db_hunter.increment("shooting_stats", "brains_eaten", dead_times)
             db_hunter.shooting_stats["max_brains_eaten_at_once"] = max(
                 db_hunter.shooting_stats["max_brains_eaten_at_once"], dead_times
             )
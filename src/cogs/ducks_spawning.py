@@ -1,5 +1,7 @@
 import asyncio
+import collections
 import datetime
+import functools
 import json
 import random
 from time import time
@@ -8,10 +10,23 @@ from typing import Dict
 import discord
 
 from utils import ducks
+from utils.cluster import ClusterError
 from utils.cog_class import Cog
 from utils.ducks import deserialize_duck, GhostDuck
 from utils.events import Events
-from utils.models import DiscordChannel, DucksLeft, get_enabled_channels
+from utils.models import (
+    CHANNEL_SAVE_LISTENERS,
+    DiscordChannel,
+    DucksLeft,
+    SunState,
+    compute_ducks_counts,
+    disable_channels,
+    get_channels_with_guilds,
+    get_enabled_channels,
+    get_from_db,
+)
+from utils.scheduling import ShardPartition
+from utils.timings import LoopTimings
 
 SECOND = 1
 MINUTE = 60 * SECOND
@@ -26,6 +41,8 @@ class DucksSpawning(Cog):
     def __init__(self, bot, *args, **kwargs):
         super().__init__(bot, *args, **kwargs)
         self.index = 0
+        self.partitions: Dict[int, ShardPartition] = {}
+        self.timings = LoopTimings(["tick", "spawn_roll", "leave_scan", "dispatch", "planify", "event_change"])
 
     async def cog_load(self) -> None:
         self.background_loop = self.bot.loop.create_task(self.loop())
@@ -33,41 +50,78 @@ class DucksSpawning(Cog):
         self.last_planned_day = 0
         self.current_iteration_public = 0
 
+        CHANNEL_SAVE_LISTENERS.append(self.channel_saved)
+
+        if self.bot.cluster:
+            self.bot.cluster.add_handler("planify", self.cluster_planify)
+            self.bot.cluster.add_handler("set_allow_ducks_spawning", self.cluster_set_allow_ducks_spawning)
+            self.bot.cluster.add_handler("change_event", self.cluster_change_event)
+            self.bot.cluster.add_handler("get_event_state", self.cluster_get_event_state)
+            self.bot.cluster.add_handler("event_changed", self.cluster_event_changed)
+
+    def get_partition(self, shard_id: int) -> ShardPartition:
+        """
+        Get the spawning state of a shard, starting its loop the first time.
+        """
+        partition = self.partitions.get(shard_id)
+
+        if partition is None:
+            config = self.config()
+            partition = self.partitions[shard_id] = ShardPartition(
+                shard_id,
+                dispatch_rate=config.get("dispatch_rate", 40),
+                dispatch_burst=config.get("dispatch_burst", None),
+            )
+            partition.task = self.bot.loop.create_task(self.shard_loop(partition))
+
+        return partition
+
     async def loop(self):
         try:
             await self.before()
         except:
             self.bot.logger.exception("Error in before_loop")
             raise
+
+        await self.run_every_interval(self.global_tick, "Ducks spawning loop")
+
+    async def shard_loop(self, partition: ShardPartition):
+        await self.run_every_interval(
+            functools.partial(self.shard_tick, partition),
+            f"Ducks spawning loop (shard {partition.shard_id})",
+        )
+
+    async def run_every_interval(self, tick, name: str):
         now = time()
         current_iteration = int(now)
-        while not self.background_loop.cancelled():
+        while True:
             # Precalculate timings
             now = time()
             current_iteration = current_iteration + self.interval
-            self.current_iteration_public = current_iteration
 
             delay = now - current_iteration
+            self.timings.drift[name].record(delay)
             if delay >= 30:
                 self.bot.logger.error(
-                    f"Ignoring iterations to compensate for delays ({delay} seconds)!"
+                    f"{name}: Ignoring iterations to compensate for delays ({delay} seconds)!"
                 )
+                self.timings.skipped_iterations[name] += (int(now) - current_iteration) // self.interval
                 current_iteration = int(now)
             elif delay >= 5:
                 self.bot.logger.warning(
-                    f"Loop running with severe delays ({delay} seconds)!"
+                    f"{name}: Loop running with severe delays ({delay} seconds)!"
                 )
 
             self.bot.logger.debug(
-                f"Ducks spawning loop : [{int(current_iteration)}/{int(now)}]"
+                f"{name} : [{int(current_iteration)}/{int(now)}]"
             )
 
             # Loop part
             try:
-                await self.spawn_ducks(current_iteration)
+                await tick(current_iteration)
             except Exception as e:
                 self.bot.logger.exception(
-                    "Ignoring exception inside loop and hoping for the best..."
+                    f"{name}: Ignoring exception inside loop and hoping for the best..."
                 )
 
             # Loop the loop
@@ -75,16 +129,70 @@ class DucksSpawning(Cog):
             next_iteration = current_iteration + self.interval
             await asyncio.sleep(max(0.0, next_iteration - now))
 
-    async def spawn_ducks(self, now: int):
+    async def global_tick(self, now: int):
+        """
+        The parts of the ducks spawning loop that are not specific to a shard: daily planning and hourly events.
+        """
+        self.current_iteration_public = now
+
         SECONDS_SPENT_TODAY = now % 86400
         SECONDS_LEFT_TODAY = 86400 - SECONDS_SPENT_TODAY
 
-        if self.bot.allow_ducks_spawning:
-            start_spawning = time()
-            ducks_spawned = 0
-            for channel, ducks_left_to_spawn in self.bot.enabled_channels.items():
-                maybe_spawn_type = await ducks_left_to_spawn.maybe_spawn_type(now)
-                if maybe_spawn_type is not None:
+        CURRENT_PLANNED_DAY = now - (now % DAY)
+        if CURRENT_PLANNED_DAY != self.last_planned_day:
+            with self.timings.measure("planify"):
+                await self.planify(now)
+
+            if self.bot.is_cluster_leader:
+                embed = discord.Embed()
+
+                embed.colour = discord.Colour.green()
+                embed.title = f"It's freetime!"
+                embed.description = f"Your magazines have been refilled, and confiscated weapons have just been released"
+                dtnow = datetime.datetime.fromtimestamp(now)
+                if dtnow.day == 1 and dtnow.month == 4:
+                    # April 1st
+                    embed.set_footer(text="🐟️")
+                else:
+                    embed.set_footer(text="Freetime happens every 24 hours.")
+                await self.bot.log_to_channel(embed=embed)
+
+        if SECONDS_LEFT_TODAY % HOUR == 0 and self.bot.is_cluster_leader:
+            with self.timings.measure("event_change"):
+                await self.change_event()
+
+        # Ducks can be on a shard that has no spawns planned (restored from the journal, spawned by a command...).
+        # Every shard with ducks waiting to leave needs its loop, or they'd stay on the channel forever.
+        for shard_id in self.bot.ducks_expiry_queue.shard_ids():
+            self.get_partition(shard_id)
+
+    async def shard_tick(self, partition: ShardPartition, now: int):
+        if partition.shard_id not in self.bot.shards_ready:
+            if not partition.paused:
+                self.bot.logger.warning(
+                    f"Shard {partition.shard_id} is disconnected, pausing its ducks spawns and leaves."
+                )
+                partition.paused = True
+            # Spawns and leaves stay planned, and will happen once the shard is back.
+            return
+        elif partition.paused:
+            self.bot.logger.info(f"Shard {partition.shard_id} is back, resuming its ducks spawns and leaves.")
+            partition.paused = False
+
+        with self.timings.measure("tick"):
+            await self.spawn_ducks(partition, now)
+
+    async def spawn_ducks(self, partition: ShardPartition, now: int):
+        with self.timings.measure("spawn_roll"):
+            if self.bot.allow_ducks_spawning:
+                for ducks_left_to_spawn, sun_state in partition.spawn_scheduler.pop_due(now):
+                    channel = ducks_left_to_spawn.channel
+                    if self.bot.enabled_channels.get(channel) is not ducks_left_to_spawn:
+                        # The channel was disabled or replanned since this spawn was planned.
+                        continue
+
+                    ducks_left_to_spawn.consume(sun_state)
+
                     if (
                             self.bot.current_event == Events.CONNECTION
                             and random.randint(1, 10) == 10
@@ -92,125 +200,76 @@ class DucksSpawning(Cog):
                         continue
 
                     if self.bot.current_event == Events.HAUNTED_HOUSE:
-                        asyncio.ensure_future(
-                            GhostDuck(
-                                self.bot,
-                                channel,
-                            ).spawn()
+                        partition.dispatch_queue.push(
+                            channel.guild.id,
+                            functools.partial(self.spawn_duck, channel, ghost=True),
+                            now,
                         )
                     else:
-                        asyncio.ensure_future(
-                            ducks.spawn_random_weighted_duck(
-                                self.bot,
-                                channel,
-                                ducks_left_to_spawn.db_channel,
-                                sun=maybe_spawn_type,
-                            )
+                        partition.dispatch_queue.push(
+                            channel.guild.id,
+                            functools.partial(self.spawn_duck, channel, ducks_left_to_spawn.db_channel, sun_state),
+                            now,
                         )
-                    ducks_spawned += 1
 
                     if (
                             self.bot.current_event == Events.MIGRATING
                             and random.randint(1, 10) == 10
                     ):
-                        asyncio.ensure_future(
-                            ducks.spawn_random_weighted_duck(
-                                self.bot,
-                                channel,
-                                ducks_left_to_spawn.db_channel,
-                                sun=maybe_spawn_type,
-                            )
+                        partition.dispatch_queue.push(
+                            channel.guild.id,
+                            functools.partial(self.spawn_duck, channel, ducks_left_to_spawn.db_channel, sun_state),
+                            now,
                         )
-                        ducks_spawned += 1
 
-                if ducks_spawned > 20:
-                    self.bot.logger.warning(
-                        f"Tried to make more than {ducks_spawned} ducks spawn at once, "
-                        f"stopping there to protect rate limits..."
-                    )
-                    break
-
-            end_spawning = time()
+        with self.timings.measure("leave_scan"):
+            for duck in self.bot.ducks_expiry_queue.pop_expired(now, partition.shard_id):
+                partition.dispatch_queue.push(duck.channel.guild.id, functools.partial(self.leave_duck, duck), now)
 
-            if end_spawning - start_spawning > 0.7:
-                duration = round(end_spawning - start_spawning, 2)
-                self.bot.logger.error(
-                    f"Spawning {ducks_spawned} ducks took more than {duration} seconds..."
-                )
+        with self.timings.measure("dispatch"):
+            start_dispatching = time()
+            dispatched = 0
+            for action in partition.dispatch_queue.pop_ready(now):
+                asyncio.ensure_future(action())
+                dispatched += 1
 
-        start_leaving = time()
-        total_leaves = 0
-        for channel, ducks_queue in self.bot.ducks_spawned.copy().items():
-            for duck in ducks_queue.copy():
-                left = await duck.maybe_leave()
-                if not left:
-                    break
-                else:
-                    total_leaves += 1
+            end_dispatching = time()
 
-            if total_leaves > 25:
-                self.bot.logger.warning(
-                    f"Tried to make more than {total_leaves} ducks leave at once, "
-                    f"stopping there to protect rate limits..."
+            if end_dispatching - start_dispatching > 0.7:
+                duration = round(end_dispatching - start_dispatching, 2)
+                self.bot.logger.error(
+                    f"Dispatching {dispatched} ducks spawns and leaves took more than {duration} seconds..."
                 )
-                break
-
-        end_leaving = time()
 
-        if end_leaving - start_leaving > 0.7:
-            duration = round(end_leaving - start_leaving, 2)
-            self.bot.logger.error(
-                f"Leaving {total_leaves} ducks took more than {duration} seconds..."
+        if len(partition.dispatch_queue):
+            oldest_wait = round(now - partition.dispatch_queue.oldest_enqueued_at, 2)
+            self.bot.logger.warning(
+                f"Shard {partition.shard_id}: {len(partition.dispatch_queue)} ducks spawns and leaves from "
+                f"{partition.dispatch_queue.guilds_waiting} guilds deferred to protect rate limits "
+                f"(oldest waiting for {oldest_wait} seconds)..."
             )
 
-        CURRENT_PLANNED_DAY = now - (now % DAY)
-        if CURRENT_PLANNED_DAY != self.last_planned_day:
-            await self.planify(now)
-            embed = discord.Embed()
-
-            embed.colour = discord.Colour.green()
-            embed.title = f"It's freetime!"
-            embed.description = f"Your magazines have been refilled, and confiscated weapons have just been released"
-            dtnow = datetime.datetime.fromtimestamp(now)
-            if dtnow.day == 1 and dtnow.month == 4:
-                # April 1st
-                embed.set_footer(text="🐟️")
-            else:
-                embed.set_footer(text="Freetime happens every 24 hours.")
-            await self.bot.log_to_channel(embed=embed)
-
-        if SECONDS_LEFT_TODAY % HOUR == 0:
-            await self.change_event()
-
     def cog_unload(self):
         self.bot.logger.warning(f"Unloading DucksSpawning cog...")
 
         try:
             self.background_loop.cancel()
+            for partition in self.partitions.values():
+                partition.task.cancel()
         except:
             self.bot.logger.exception(f"Couldn't cancel the background loop...")
 
-        self.bot.logger.info(f"Saving ducks to cache...")
+        CHANNEL_SAVE_LISTENERS.remove(self.channel_saved)
 
-        ducks_spawned = self.bot.ducks_spawned
+        if self.bot.cluster:
+            for name in ["planify", "set_allow_ducks_spawning", "change_event", "get_event_state", "event_changed"]:
+                self.bot.cluster.remove_handler(name)
 
-        ducks_count = 0
+        self.bot.logger.info(f"Saving ducks to the journal snapshot...")
 
-        serialized = {}
+        ducks_count = self.bot.ducks_journal.close()
 
-        # Copy to avoid
-        # RuntimeError: dictionary changed size during iteration
-        for channel, ducks in ducks_spawned.copy().items():
-            ducks_in_channel = []
-            for duck in ducks:
-                ducks_in_channel.append(duck.serialize())
-                ducks_count += 1
-            serialized[channel.id] = ducks_in_channel
-
-        with open("cache/ducks_spawned_cache.json", "w") as f:
-            json.dump(serialized, f)
-
-        self.bot.logger.info(f"Saved {ducks_count} to cache/ducks_spawned_cache.json")
+        self.bot.logger.info(f"Saved {ducks_count} ducks to {self.bot.ducks_journal.snapshot_path}")
 
     async def planify(self, now=None):
         if now is None:
@@ -224,49 +283,56 @@ class DucksSpawning(Cog):
 
         channels_to_disable = []
 
-        channels: Dict[int, discord.TextChannel] = {
-            c.id: c for c in self.bot.get_all_channels()
-        }
-        i = 0
+        channels_to_plan = []
 
         for db_channel in db_channels:
-            i += 1
-            channel = channels.get(db_channel.discord_id)
-
-            if i % 500 == 0:
-                await asyncio.sleep(0)
-                self.bot.logger.debug(
-                    f"Planifying ducks spawns on {i}/{len(db_channels)} channels"
-                )
+            channel = self.bot.channels_registry.get(db_channel.discord_id)
 
             if channel:
-                self.bot.enabled_channels[channel] = await DucksLeft(
-                    channel
-                ).compute_ducks_count(db_channel, now)
+                channels_to_plan.append((channel, db_channel))
             else:
                 # self.bot.logger.warning(
                 #    f"Channel {db_channel.name} is unknown, marking for disable"
                 # )
                 channels_to_disable.append(db_channel)
 
+        day_ducks, night_ducks = compute_ducks_counts(
+            [db_channel for channel, db_channel in channels_to_plan], now
+        )
+
+        for (channel, db_channel), day_ducks_count, night_ducks_count in zip(
+            channels_to_plan, day_ducks.tolist(), night_ducks.tolist()
+        ):
+            self.bot.enabled_channels[channel] = DucksLeft(
+                channel, day_ducks_count, night_ducks_count, db_channel=db_channel
+            )
+
+        ducks_lefts_by_shard = collections.defaultdict(list)
+        for ducks_left in self.bot.enabled_channels.values():
+            ducks_lefts_by_shard[ducks_left.channel.guild.shard_id].append(ducks_left)
+
+        for shard_id in set(ducks_lefts_by_shard) | set(self.partitions):
+            partition = self.get_partition(shard_id)
+            partition.spawn_scheduler.rebuild(ducks_lefts_by_shard[shard_id], now)
+            self.bot.logger.debug(
+                f"Planned {len(partition.spawn_scheduler)} ducks spawns for the rest of the day on shard {shard_id}"
+            )
+
         if 0 < len(channels_to_disable) < self.DISCORD_BUG_THRESHOLD:
             self.bot.logger.warning(
                 f"Disabling {len(channels_to_disable)} channels "
                 f"that are no longer available to the bot."
             )
-            for db_channel in channels_to_disable:
-                # TODO : We can probably only do 1 big query here, but for that I'd have to learn Tortoise.
-                # To be honest, improvement would be limited since 100 queries max isn't that slow and there obviously
-                # aren't that many channels that get disabled during a reboot...
-                if db_channel.discord_id == 853566725621809172:
-                    # Skip dank memer channel, they lock the server every so often
-                    continue
-
-                db_channel.enabled = False
-                await db_channel.save()
-                await asyncio.sleep(0)  # Just in case
+            # Some channels should never be disabled automatically.
+            # For instance, dank memer locks their server every so often.
+            never_disable_channel_ids = self.config().get("never_disable_channel_ids", [])
+
+            disabled_count = await disable_channels(
+                [db_channel.discord_id for db_channel in channels_to_disable],
+                skip_discord_ids=never_disable_channel_ids,
+            )
             self.bot.logger.warning(
-                f"Disabled {len(channels_to_disable)} channels "
+                f"Disabled {disabled_count} channels "
                 f"that are no longer available to the bot."
             )
         elif len(channels_to_disable) >= self.DISCORD_BUG_THRESHOLD:
@@ -293,32 +359,42 @@ class DucksSpawning(Cog):
         # Then try again to make sure we are still good.
         await self.bot.wait_until_ready()
 
-        self.bot.logger.info(f"Restoring ducks from cache...")
+        self.bot.logger.info(f"Restoring ducks from the journal...")
 
         ducks_count = 0
-        try:
-            with open("cache/ducks_spawned_cache.json", "r") as f:
-                serialized = json.load(f)
-        except FileNotFoundError:
-            self.bot.logger.warning(
-                "No ducks_spawned_cache.json found. Normal on first run."
-            )
-            serialized = {}
+        serialized, event_state = await self.bot.ducks_journal.load()
 
-        self.bot.logger.info(f"Loaded JSON file...")
+        if serialized is None:
+            serialized = self.load_legacy_ducks_cache()
 
-        self.bot.logger.debug(f"Building channels hash table for fast-access...")
-        channels = {c.id: c for c in self.bot.get_all_channels()}
-        self.bot.logger.debug(f"Hash table built, restoring ducks...")
+        self.bot.logger.info(f"Loaded journal...")
 
-        for channel_id, ducks in serialized.items():
-            channel = channels.get(int(channel_id), None)
+        ducks_to_restore = []
+        for channel_id, serialized_ducks in serialized.items():
+            channel = self.bot.channels_registry.get(int(channel_id))
 
             if channel:
-                for data in ducks:
-                    ducks_count += 1
+                for journal_id, data in serialized_ducks:
                     duck = deserialize_duck(self.bot, channel, data)
-                    await duck.spawn(loud=False)
+                    duck.journal_id = journal_id
+                    ducks_to_restore.append(duck)
+
+        db_channels = await get_channels_with_guilds(duck.channel.id for duck in ducks_to_restore)
+        self.bot.logger.debug(f"Fetched {len(db_channels)} channels from the database, restoring ducks...")
+
+        for duck in ducks_to_restore:
+            db_channel = db_channels.get(duck.channel.id)
+            if db_channel:
+                duck.restore(db_channel)
+            else:
+                await duck.spawn(loud=False)
+            ducks_count += 1
+
+        config = self.config()
+        self.bot.ducks_journal.start(
+            flush_interval=config.get("journal_flush_interval", None),
+            snapshot_interval=config.get("journal_snapshot_interval", None),
+        )
 
         self.bot.logger.info(f"{ducks_count} ducks restored!")
 
@@ -331,7 +407,10 @@ class DucksSpawning(Cog):
         embed = discord.Embed()
 
         embed.colour = discord.Colour.dark_green()
-        embed.title = f"Bot restarted"
+        if self.bot.cluster:
+            embed.title = f"Bot restarted (worker {self.bot.cluster.worker_id})"
+        else:
+            embed.title = f"Bot restarted"
         embed.description = (
             f"The bot restarted and is now ready to spawn ducks. Get your rifles out!"
         )
@@ -348,22 +427,28 @@ class DucksSpawning(Cog):
 
         self.bot.logger.info(f"Restoring an event for the rest of the hour")
 
+        if not self.bot.is_cluster_leader:
+            # Only the leader rolls events, use the same one.
+            try:
+                event_state = (await self.bot.cluster.request("get_event_state"))[0]
+            except (ClusterError, asyncio.TimeoutError):
+                self.bot.logger.exception("Couldn't get the current event from the cluster leader.")
+
+        if event_state is None:
+            event_state = self.load_legacy_event_cache()
+
         try:
-            with open("cache/event_cache.json", "r") as f:
-                event_cache = json.load(f)
-            event_name = event_cache["current_event"]
-            event = Events[event_name]
-            self.bot.current_event = event
-            self.bot.stay_tuned_was_n_events_ago = int(event_cache.get("stay_tuned_was_n_events_ago", 99))
-            self.bot.calm_times_ahead_was_n_events_ago = int(event_cache.get("calm_times_ahead_was_n_events_ago", 99))
-        except FileNotFoundError:
-            self.bot.logger.warning(
-                "No event_cache.json found. Normal on first run. Rolling an event instead."
-            )
-            await self.change_event()
+            if event_state is None:
+                if self.bot.is_cluster_leader:
+                    self.bot.logger.warning(
+                        "No event saved. Normal on first run. Rolling an event instead."
+                    )
+                    await self.change_event()
+            else:
+                self.apply_event_state(event_state)
         except KeyError:
             self.bot.logger.exception(
-                "event_cache.json found, but couldn't read it. Rolling an event instead."
+                "Event state found, but couldn't read it. Rolling an event instead."
             )
             await self.change_event()
 
@@ -372,6 +457,34 @@ class DucksSpawning(Cog):
 
         self.bot.logger.info(f"Ducks spawning started")
 
+    def apply_event_state(self, event_state: dict):
+        self.bot.current_event = Events[event_state["current_event"]]
+        self.bot.stay_tuned_was_n_events_ago = int(event_state.get("stay_tuned_was_n_events_ago", 99))
+        self.bot.calm_times_ahead_was_n_events_ago = int(event_state.get("calm_times_ahead_was_n_events_ago", 99))
+        self.bot.ducks_journal.record_event()
+
+    def load_legacy_ducks_cache(self):
+        """
+        Read the ducks saved by the previous versions of the bot, before the journal existed.
+        """
+        try:
+            with open("cache/ducks_spawned_cache.json", "r") as f:
+                legacy = json.load(f)
+        except FileNotFoundError:
+            self.bot.logger.warning(
+                "No ducks journal found. Normal on first run."
+            )
+            return {}
+
+        return {channel_id: [(None, data) for data in ducks] for channel_id, ducks in legacy.items()}
+
+    def load_legacy_event_cache(self):
+        try:
+            with open("cache/event_cache.json", "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
     async def calculate_ducks_per_day(self, db_channel: DiscordChannel, now: int):
         # TODO : Compute ducks sleep
         ducks_per_day = db_channel.ducks_per_day
@@ -387,10 +500,78 @@ class DucksSpawning(Cog):
 
         return ducks
 
-    async def recompute_channel(self, channel: discord.TextChannel):
-        self.bot.enabled_channels[channel] = await DucksLeft(
-            channel
-        ).compute_ducks_count()
+    async def recompute_channel(self, channel: discord.TextChannel, db_channel: DiscordChannel = None):
+        """
+        Bring a single channel planification up to date with its settings, without touching the other channels.
+
+        Disabled channels leave the schedule, and enabled ones join it. If the spawn settings changed, the ducks left and
+        their spawn times are computed again for the rest of the day. Spawns planned before are skipped when due, since
+        they belong to the previous DucksLeft.
+        """
+        if db_channel is None:
+            db_channel = await get_from_db(channel)
+
+        if not db_channel.enabled:
+            self.bot.enabled_channels.pop(channel, None)
+            return
+
+        ducks_left = self.bot.enabled_channels.get(channel)
+        if ducks_left is not None and ducks_left.planned_settings == db_channel.spawn_settings:
+            # Already planned with these settings.
+            ducks_left.db_channel = db_channel
+            return
+
+        ducks_left = await DucksLeft(channel).compute_ducks_count(db_channel)
+        self.bot.enabled_channels[channel] = ducks_left
+        self.get_partition(channel.guild.shard_id).spawn_scheduler.plan(ducks_left)
+
+    async def channel_saved(self, db_channel: DiscordChannel):
+        """
+        Called every time a DiscordChannel is saved, to follow settings changes.
+        """
+        channel = self.bot.get_channel(db_channel.discord_id)
+        if channel is None:
+            # Not on this bot (or worker).
+            return
+
+        await self.reschedule_ducks_leave(channel, db_channel)
+
+        if not self.last_planned_day:
+            # The daily planification didn't run yet, and will use the new settings.
+            return
+
+        await self.recompute_channel(channel, db_channel)
+
+    async def spawn_duck(
+            self,
+            channel: discord.TextChannel,
+            db_channel: DiscordChannel = None,
+            sun_state: SunState = None,
+            ghost: bool = False,
+    ):
+        if not self.bot.allow_ducks_spawning:
+            # Spawns were stopped while this one was waiting in the dispatch queue.
+            return
+
+        if ghost:
+            await GhostDuck(self.bot, channel).spawn()
+        else:
+            await ducks.spawn_random_weighted_duck(self.bot, channel, db_channel, sun=sun_state)
+
+    async def leave_duck(self, duck: ducks.Duck):
+        if duck.expires_at is None or duck not in self.bot.ducks_spawned.get(duck.channel, ()):
+            # Killed or removed while it was waiting in the dispatch queue.
+            return
+
+        await duck.leave()
+
+    async def reschedule_ducks_leave(self, channel: discord.TextChannel, db_channel: DiscordChannel):
+        """
+        Move the departure of the ducks on the channel if ducks_time_to_live changed, by itself or with a template.
+        """
+        for duck in self.bot.ducks_spawned.get(channel, ()):
+            if duck.expires_at is not None and duck.expires_at != duck.spawned_at + db_channel.ducks_time_to_live:
+                await duck.schedule_leave(db_channel)
 
     async def change_event(self, force_choice=None, force=False):
         can_not_select_event = not force and not force_choice
@@ -444,12 +625,32 @@ class DucksSpawning(Cog):
 
         await self.bot.log_to_channel(embed=embed)
 
-        with open("cache/event_cache.json", "w") as f:
-            json.dump({
-                "current_event": self.bot.current_event.name,
-                "stay_tuned_was_n_events_ago": self.bot.stay_tuned_was_n_events_ago,
-                "calm_times_ahead_was_n_events_ago": self.bot.calm_times_ahead_was_n_events_ago
-            }, f)
+        self.bot.ducks_journal.record_event()
+
+        if self.bot.cluster:
+            await self.bot.cluster.broadcast("event_changed", self.bot.ducks_journal.event_state())
+
+    # Cluster handlers, run when another worker asks for it #
+
+    async def cluster_planify(self, data):
+        await self.planify()
+        return len(self.bot.enabled_channels)
+
+    async def cluster_set_allow_ducks_spawning(self, data):
+        self.bot.allow_ducks_spawning = data
+
+    async def cluster_change_event(self, data):
+        force_choice = Events[data["event_name"]] if data["event_name"] else None
+        await self.change_event(force_choice=force_choice, force=data["force"])
+        return self.bot.current_event.name
+
+    async def cluster_get_event_state(self, data):
+        return self.bot.ducks_journal.event_state()
+
+    async def cluster_event_changed(self, data):
+        self.apply_event_state(data)
+        game = discord.Game(self.bot.current_event.value[0])
+        await self.bot.change_presence(status=discord.Status.online, activity=game)
 
 
 setup = DucksSpawning.setup
@@ -248,6 +248,7 @@ class DucksSpawningCommands(Cog):
         ducks_spawned_count = len(ducks_spawned)
 
         del self.bot.ducks_spawned[ctx.channel]
+        self.bot.ducks_journal.record_clear(ctx.channel)
 
         await ctx.send(
             _(
@@ -13,7 +13,7 @@ from utils.cog_class import Cog
 from utils.ctx_class import MyContext
 from utils.ducks import Map
 from utils.events import Events
-from utils.models import AccessLevel, get_from_db
+from utils.models import DB_LOCKS, ENTITIES_CACHE, AccessLevel, get_from_db
 
 
 def _(message):
@@ -50,9 +50,11 @@ class Emergencies(Cog):
         ducks today. This is executed everyday at midnight.
         """
 
-        ducks_spawning_cog = self.bot.get_cog("DucksSpawning")
-
-        await ducks_spawning_cog.planify()
+        if self.bot.cluster:
+            await self.bot.cluster.request("planify", all_workers=True)
+        else:
+            ducks_spawning_cog = self.bot.get_cog("DucksSpawning")
+            await ducks_spawning_cog.planify()
 
         await ctx.reply(
             f"Ducks spawns have been reset based on the current time of the day."
@@ -67,7 +69,10 @@ class Emergencies(Cog):
         Duck will still be able to leave, even if this lock is set.
         """
 
-        self.bot.allow_ducks_spawning = False
+        if self.bot.cluster:
+            await self.bot.cluster.request("set_allow_ducks_spawning", False, all_workers=True)
+        else:
+            self.bot.allow_ducks_spawning = False
 
         await ctx.reply(
             f"Ducks will no longer spawn until the lock is removed with "
@@ -93,7 +98,10 @@ class Emergencies(Cog):
         Allow ducks spawning again, everywhere. Ducks will spawn more quickly than usual if a planification isn't done.
         """
 
-        self.bot.allow_ducks_spawning = True
+        if self.bot.cluster:
+            await self.bot.cluster.request("set_allow_ducks_spawning", True, all_workers=True)
+        else:
+            self.bot.allow_ducks_spawning = True
 
         await ctx.reply(
             f"Ducks will now spawn. Consider planning again if they have been stopped for a while :"
@@ -113,9 +121,12 @@ class Emergencies(Cog):
         """
         Force a boss to spawn
         """
-        boss_cog = self.bot.get_cog("DuckBoss")
-
-        await boss_cog.spawn_boss()
+        if self.bot.cluster:
+            # Only the worker hosting the boss channel can spawn it
+            await self.bot.cluster.request("spawn_boss", all_workers=True)
+        else:
+            boss_cog = self.bot.get_cog("DuckBoss")
+            await boss_cog.spawn_boss()
 
         await ctx.reply(f"A boss has been spawned.")
 
@@ -133,8 +144,12 @@ class Emergencies(Cog):
                 event = Events[event_name]
             except KeyError:
                 raise commands.BadArgument(f"Event `{event_name}` not found. (Available events: {', '.join(Events.__members__)})")
-            else:
-                await ducks_spawning_cog.change_event(force_choice=Events[event_name], force=force)
+
+        if self.bot.cluster:
+            # Events are rolled by the cluster leader, and sent to every worker from there.
+            await self.bot.cluster.request("change_event", {"event_name": event_name, "force": force})
+        elif event_name:
+            await ducks_spawning_cog.change_event(force_choice=Events[event_name], force=force)
         else:
             await ducks_spawning_cog.change_event(force=force)
 
@@ -198,6 +213,25 @@ class Emergencies(Cog):
 
         await ctx.reply(f"{owner_role} members have been successfully updated.")
 
+    @manage_bot.command(aliases=["workers"])
+    async def cluster(self, ctx: MyContext):
+        """
+        Show the status of every worker process, when the bot is running in cluster mode.
+        """
+        if not self.bot.cluster:
+            await ctx.reply("The bot isn't running in cluster mode.")
+            return
+
+        lines = []
+        for status in await self.bot.cluster.request("worker_status", all_workers=True):
+            leader = " (leader)" if status["worker_id"] == self.bot.cluster.leader_id else ""
+            lines.append(
+                f"Worker {status['worker_id']}{leader}: shards {status['shard_ids']}, "
+                f"{status['shards_ready']} ready, {status['guilds']} guilds, latency {status['latency']}ms"
+            )
+
+        await ctx.send("\n".join(lines))
+
     @manage_bot.command()
     async def socketstats(self, ctx):
         delta = timezone.now() - self.bot.uptime
@@ -227,14 +261,154 @@ class Emergencies(Cog):
 
         await ctx.send(embed=e)
 
+    @manage_bot.command(aliases=["dispatch_queue", "rate_limits"])
+    async def dispatch(self, ctx: MyContext, reset: bool = False):
+        """
+        Show the ducks spawns and leaves dispatch queue statistics, to size the outbound budget against discord rate
+        limits.
+        """
+        ducks_spawning_cog = self.bot.get_cog("DucksSpawning")
+
+        lines = []
+        for shard_id, partition in sorted(ducks_spawning_cog.partitions.items()):
+            dispatch_queue = partition.dispatch_queue
+
+            oldest_enqueued_at = dispatch_queue.oldest_enqueued_at
+            if oldest_enqueued_at is not None:
+                oldest_wait = f"{ducks_spawning_cog.current_iteration_public - oldest_enqueued_at:.2f}s"
+            else:
+                oldest_wait = "-"
+
+            lines.append(
+                f"Shard {shard_id}{' (paused)' if partition.paused else ''}: "
+                f"budget {dispatch_queue.rate}/s (burst {dispatch_queue.burst}), "
+                f"queue depth {len(dispatch_queue)} actions from {dispatch_queue.guilds_waiting} guilds "
+                f"(oldest waiting for {oldest_wait}), "
+                f"dispatched {dispatch_queue.dispatched}, deferred {dispatch_queue.deferred} "
+                f"(mean deferral {dispatch_queue.mean_deferral:.2f}s, max {dispatch_queue.max_deferral:.2f}s)"
+            )
+
+            if reset:
+                dispatch_queue.reset_stats()
+
+        await ctx.send("\n".join(lines) or "No shard is spawning ducks yet.")
+
+    @manage_bot.command(aliases=["send_queue", "outbox"])
+    async def messages_queue(self, ctx: MyContext, reset: bool = False):
+        """
+        Show the outbound messages queue: requests in flight, queue depth and wait per priority, rate limited routes and
+        how many messages were merged together.
+        """
+        scheduler = self.bot.send_scheduler
+        outbox = self.bot.outbox
+        summary = scheduler.summary()
+
+        lines = [
+            f"In flight: {summary['in_flight']}/{summary['max_in_flight']}, "
+            f"{summary['rate_limited_routes']} routes rate limited"
+            f"{', globally rate limited' if summary['global_rate_limited'] else ''}",
+        ]
+        for priority, histogram in scheduler.waits.items():
+            lines.append(
+                f"{priority.name}: {summary['queue_depths'][priority.name]} queued, {histogram.count} started, "
+                f"wait p50 {histogram.percentile(50) * 1000:.2f}ms, p99 {histogram.percentile(99) * 1000:.2f}ms, "
+                f"max {histogram.max * 1000:.2f}ms"
+            )
+        lines.append(
+            f"Sent {scheduler.stats['sent']}, failed {scheduler.stats['failed']}, "
+            f"deferred {scheduler.stats['deferred']}, hit {scheduler.stats['rate_limited']} rate limits"
+        )
+        lines.append(
+            f"Outbox: {outbox.pending} messages waiting on {len(outbox.channels)} channels, "
+            f"{outbox.stats['messages']} messages sent in {outbox.stats['api_calls']} API calls"
+        )
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+        if reset:
+            scheduler.reset_stats()
+            outbox.stats.clear()
+
+    @manage_bot.command(aliases=["db_cache", "cache"])
+    async def entities_cache(self, ctx: MyContext, reset: bool = False):
+        """
+        Show the hit rate of the guilds, channels, users and members cache behind get_from_db, with its evictions and
+        the names waiting to be written.
+        """
+        summary = ENTITIES_CACHE.summary()
+
+        lines = [
+            f"{summary['entries']}/{summary['max_size']} entities cached for {summary['ttl']}s, "
+            f"{summary['pending_names']} names waiting to be written"
+        ]
+        for model_name, stats in sorted(ENTITIES_CACHE.stats.items()):
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / lookups * 100 if lookups else 0
+            lines.append(
+                f"{model_name}: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate), "
+                f"{stats['expirations']} expired, {stats['evictions']} evicted, {stats['invalidations']} invalidated, "
+                f"{stats['names_synced']} names written"
+            )
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+        if reset:
+            ENTITIES_CACHE.reset_stats()
+
+    @manage_bot.command(aliases=["loop_timings", "timings"])
+    async def loop_stats(self, ctx: MyContext, reset: bool = False):
+        """
+        Show how long each phase of the ducks spawning loop takes (p50/p99/max), how late the loop runs, and how many
+        iterations were skipped to catch up.
+        """
+        timings = self.bot.get_cog("DucksSpawning").timings
+
+        def histogram_line(name, histogram):
+            return (
+                f"{name}: {histogram.count} samples, p50 {histogram.percentile(50) * 1000:.2f}ms, "
+                f"p99 {histogram.percentile(99) * 1000:.2f}ms, max {histogram.max * 1000:.2f}ms"
+            )
+
+        lines = [histogram_line(name, histogram) for name, histogram in timings.histograms.items()]
+        for name, histogram in sorted(timings.drift.items()):
+            lines.append(
+                histogram_line(f"{name} drift", histogram)
+                + f", {timings.skipped_iterations[name]} skipped iterations"
+            )
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+        if reset:
+            timings.reset()
+
     @manage_bot.command()
-    async def locks(self, ctx):
+    async def locks(self, ctx, reset: bool = False):
+        """
+        Show the commands concurrency locks per channel, then how often each family of database locks was contended.
+        """
         ret = []
         for chid, sema in ctx.bot.concurrency._mapping.items():
             channel = ctx.bot.get_channel(chid)
             ret.append(f"{channel.guild.id} ({channel.guild.name}) - {channel.id} ({channel.name} <#{channel.id}>) - {sema}")
 
-        await ctx.send("\n".join(ret))
+        if ret:
+            await ctx.send("\n".join(ret))
+
+        held = DB_LOCKS.held()
+        lines = [f"Database locks: {len(DB_LOCKS)} keys locked or waited for"]
+        for family, stats in sorted(DB_LOCKS.families.items()):
+            contention = stats.contended / stats.acquisitions * 100 if stats.acquisitions else 0
+            lines.append(
+                f"{family}: {held[family]} held, {stats.acquisitions} acquisitions, "
+                f"{stats.contended} contended ({contention:.2f}%), max {stats.max_waiters} waiting, "
+                f"wait p50 {stats.waits.percentile(50) * 1000:.2f}ms, p99 {stats.waits.percentile(99) * 1000:.2f}ms, "
+                f"max {stats.waits.max * 1000:.2f}ms"
+            )
+
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+        if reset:
+            DB_LOCKS.reset_stats()
 
 
 setup = Emergencies.setup
@@ -7,7 +7,7 @@ from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound
 from discord.ext.commands import Group
 
 from utils.cog_class import Cog
-from utils.models import AccessLevel, DiscordChannel, Player, get_from_db
+from utils.models import ENTITIES_CACHE, AccessLevel, DiscordChannel, Player, get_from_db
 
 
 class RestAPI(Cog):
@@ -21,6 +21,12 @@ class RestAPI(Cog):
     `/api/channels/{channel_id}/settings`  [Authentication required] -> Returns channel settings
     `/api/channels/{channel_id}/top` [No authentication required] -> Returns the top scores (all players on the channel and some info about players)
     `/api/channels/{channel_id}/player/{player_id}` [No authentication required] -> Returns *all* the data for a specific user
+    `/api/loop/timings`  [Global Authentication required] -> Returns the ducks spawning loop timings (p50/p99/max per
+        phase, drift and skipped iterations per loop)
+    `/api/messages/queue`  [Global Authentication required] -> Returns the outbound messages queue metrics (in flight,
+        queue depth and wait per priority)
+    `/api/cache/entities`  [Global Authentication required] -> Returns the get_from_db cache metrics (hits, misses and
+        evictions per model)
 
     **Authentication**:
 
@@ -200,8 +206,8 @@ class RestAPI(Cog):
 
         player = (
             await Player.filter(
-                channel__discord_id=channel.id,
-                member__user__discord_id=int(request.match_info["player_id"]),
+                channel_id=channel.id,
+                user_discord_id=int(request.match_info["player_id"]),
             )
             .first()
             .prefetch_related("member__user")
@@ -336,6 +342,52 @@ class RestAPI(Cog):
             }
         )
 
+    async def loop_timings(self, request):
+        """
+        /loop/timings
+
+        Get the time spent in each phase of the ducks spawning loop, in milliseconds, then how late each loop (the
+        global one, and one per shard) runs, and how many of its iterations were skipped.
+        """
+        await self.authenticate_request(request)
+
+        ducks_spawning_cog = self.bot.get_cog("DucksSpawning")
+        if not ducks_spawning_cog:
+            raise HTTPNotFound(reason="The ducks spawning loop isn't running.")
+
+        return web.json_response(ducks_spawning_cog.timings.summary())
+
+    async def messages_queue(self, request):
+        """
+        /messages/queue
+
+        Get the outbound messages queue metrics: requests in flight, queue depth and wait per priority, and how many
+        messages were merged together.
+        """
+        await self.authenticate_request(request)
+
+        return web.json_response(
+            {
+                **self.bot.send_scheduler.summary(),
+                "outbox": {
+                    "pending": self.bot.outbox.pending,
+                    "channels": len(self.bot.outbox.channels),
+                    "stats": dict(self.bot.outbox.stats),
+                },
+            }
+        )
+
+    async def entities_cache(self, request):
+        """
+        /cache/entities
+
+        Get the metrics of the guilds, channels, users and members cache behind get_from_db: hits, misses, expirations,
+        evictions and invalidations per model, and names waiting to be written.
+        """
+        await self.authenticate_request(request)
+
+        return web.json_response(ENTITIES_CACHE.summary())
+
     async def run(self):
         # Don't wait for ready to avoid blocking the website
         # await self.bot.wait_until_ready()
@@ -343,6 +395,10 @@ class RestAPI(Cog):
         listen_port = self.config()["listen_port"]
         route_prefix = self.config()["route_prefix"]
 
+        if self.bot.cluster:
+            # Every worker serves the API of its own shards, on consecutive ports.
+            listen_port = int(listen_port) + self.bot.cluster.worker_id
+
         botlist_cog = self.bot.get_cog("BotsListVoting")
 
         routes = [
@@ -366,6 +422,9 @@ class RestAPI(Cog):
             ("GET", f"{route_prefix}/help/commands", self.commands),
             ("GET", f"{route_prefix}/status", self.status),
             ("GET", f"{route_prefix}/stats", self.stats),
+            ("GET", f"{route_prefix}/loop/timings", self.loop_timings),
+            ("GET", f"{route_prefix}/messages/queue", self.messages_queue),
+            ("GET", f"{route_prefix}/cache/entities", self.entities_cache),
         ]
 
         if not botlist_cog:
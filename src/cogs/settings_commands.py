@@ -546,6 +546,7 @@ class SettingsCommands(Cog):
 
             db_guild.language = language_code
             await db_guild.save()
+            self.bot.forget_guild_language(ctx.guild)
 
         _ = await ctx.get_translate_function()  # Deferered for the new language
         if db_guild.language:
@@ -690,17 +691,18 @@ class SettingsCommands(Cog):
             await ctx.send(
                 _("Ducks will spawn on {channel.mention}", channel=ctx.channel)
             )
-            await self.bot.get_cog("DucksSpawning").recompute_channel(ctx.channel)
+            # Saving the channel already planned it, but make sure it wasn't dropped since.
+            ducks_spawning_cog = self.bot.get_cog("DucksSpawning")
+            if ducks_spawning_cog:
+                await ducks_spawning_cog.recompute_channel(ctx.channel, db_channel)
         else:
+            # Saving the channel removed it from the planification.
             await ctx.send(
                 _("Ducks won't spawn on {channel.mention}", channel=ctx.channel)
             )
-            try:
-                del self.bot.enabled_channels[ctx.channel]
-            except KeyError:
-                pass
             try:
                 del self.bot.ducks_spawned[ctx.channel]
+                self.bot.ducks_journal.record_clear(ctx.channel)
             except KeyError:
                 pass
 
@@ -1047,7 +1049,6 @@ class SettingsCommands(Cog):
                     value = maximum_value
             db_channel.ducks_per_day = value
             await db_channel.save()
-            await self.bot.get_cog("DucksSpawning").recompute_channel(ctx.channel)
 
         await ctx.send(
             _(
@@ -1313,7 +1314,6 @@ class SettingsCommands(Cog):
             db_channel.night_end_at = seconds_night_end
 
             await db_channel.save()
-            await self.bot.get_cog("DucksSpawning").recompute_channel(ctx.channel)
 
         sun, duration_of_night, time_left_sun = await compute_sun_state(ctx.channel)
 
@@ -734,6 +734,8 @@ class StatisticsCommands(Cog):
             else:
                 db_channel = await get_from_db(ctx.channel)
 
+            if self.bot.players_cache:
+                self.bot.players_cache.forget_channel(db_channel.discord_id)
             await Player.filter(channel=db_channel).delete()
 
             await ctx.send(
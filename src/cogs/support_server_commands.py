@@ -41,7 +41,10 @@ class SupportServerCommands(Cog):
     @tasks.loop(seconds=30)
     async def background_loop(self):
         status_channel = self.bot.get_channel(self.config()["status_channel_id"])
-        if not status_channel or not isinstance(status_channel, discord.TextChannel):
+        if not status_channel and self.bot.cluster:
+            # The status channel is on another worker, the status loop runs there.
+            return
+        elif not status_channel or not isinstance(status_channel, discord.TextChannel):
             self.bot.logger.warning(
                 "The status channel for the support server command is misconfigured."
             )
@@ -58,7 +61,7 @@ class SupportServerCommands(Cog):
         )
 
         embed.add_field(
-            name="Guilds Count", value=f"{len(self.bot.guilds)}", inline=True
+            name="Guilds Count", value=f"{await self.bot.get_guilds_count()}", inline=True
         )
         embed.add_field(name="Users Count", value=f"{len(self.bot.users)}", inline=True)
         embed.add_field(
@@ -189,6 +189,7 @@ async def main():
         player = Player(
             channel=channel,
             member=member,
+            user_discord_id=member.user_id,
             active_powerups=remove_empty_data(
                 {
                     "confiscated": int(player_obj["confisque"]),
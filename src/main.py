@@ -34,18 +34,23 @@ allowed_mentions = discord.AllowedMentions(
     users=True,
 )
 
-bot = MyBot(
-    description=config["bot"]["description"],
-    intents=intents,
-    allowed_mentions=allowed_mentions,
-    enable_debug_events=False,
-    chunk_guilds_at_startup=False,
-)
+
+def create_bot(**kwargs) -> MyBot:
+    return MyBot(
+        description=config["bot"]["description"],
+        intents=intents,
+        allowed_mentions=allowed_mentions,
+        enable_debug_events=False,
+        chunk_guilds_at_startup=False,
+        **kwargs,
+    )
 
 
 async def main():
+    bot = create_bot()
     async with bot:
         await bot.start(config["auth"]["discord"]["token"])
 
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Only the oldest player of a user on a channel gets the key, in case duplicates were created before the unique
+    # index existed. The others keep a NULL key, that the unique index allows: they stay in the table with their
+    # statistics, but get_player never returns them anymore. Queries on all the players of a channel (like the
+    # leaderboards) still see them, as before this migration. They can be listed with
+    # `SELECT * FROM "players" WHERE "user_discord_id" IS NULL`, to be merged or deleted by hand.
+    return """
+        ALTER TABLE "players" ADD COLUMN IF NOT EXISTS "user_discord_id" BIGINT;
+        UPDATE "players" p SET "user_discord_id" = m."user_id"
+            FROM "members" m
+            WHERE m."id" = p."member_id"
+              AND p."user_discord_id" IS NULL
+              AND p."id" = (
+                  SELECT MIN(p2."id") FROM "players" p2
+                  JOIN "members" m2 ON m2."id" = p2."member_id"
+                  WHERE p2."channel_id" = p."channel_id" AND m2."user_id" = m."user_id"
+              );
+        CREATE UNIQUE INDEX IF NOT EXISTS "uid_players_channel_user_discord_id"
+            ON "players" ("channel_id", "user_discord_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uid_players_channel_user_discord_id";
+        ALTER TABLE "players" DROP COLUMN IF EXISTS "user_discord_id";"""
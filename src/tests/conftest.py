@@ -0,0 +1,8 @@
+import pathlib
+import sys
+
+SRC_DIRECTORY = pathlib.Path(__file__).parent.parent
+
+# Make `utils` importable however pytest is started
+if str(SRC_DIRECTORY) not in sys.path:
+    sys.path.insert(0, str(SRC_DIRECTORY))
@@ -0,0 +1,43 @@
+"""
+Helpers for the tests that need a database.
+"""
+import asyncio
+import functools
+import typing
+
+from tortoise import Tortoise
+
+from utils.models import DiscordChannel, DiscordGuild, DiscordMember, DiscordUser, Player
+
+
+def with_database(test):
+    """
+    Run an async test against a fresh in-memory SQLite database.
+    """
+
+    @functools.wraps(test)
+    def wrapper():
+        async def run():
+            await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["utils.models"]})
+            await Tortoise.generate_schemas()
+            try:
+                await test()
+            finally:
+                await Tortoise.close_connections()
+
+        asyncio.run(run())
+
+    return wrapper
+
+
+async def create_member(user_id: int = 3) -> typing.Tuple[DiscordChannel, DiscordMember]:
+    db_guild, _ = await DiscordGuild.get_or_create(discord_id=1, defaults={"name": "guild"})
+    db_channel, _ = await DiscordChannel.get_or_create(discord_id=2, defaults={"name": "channel", "guild": db_guild})
+    db_user = await DiscordUser.create(discord_id=user_id, name="user", discriminator="0")
+    db_member = await DiscordMember.create(guild=db_guild, user=db_user)
+    return db_channel, db_member
+
+
+async def create_player(user_id: int = 3) -> Player:
+    db_channel, db_member = await create_member(user_id)
+    return await Player.create(channel=db_channel, member=db_member, user_discord_id=user_id)
@@ -0,0 +1,138 @@
+import asyncio
+import types
+
+from utils.bot_class import MyBot
+from utils.channels import ChannelsRegistry
+
+
+class FakeChannel:
+    """
+    Like discord.py channels, different objects for the same channel compare equal.
+    """
+
+    def __init__(self, channel_id: int, guild):
+        self.id = channel_id
+        self.guild = guild
+
+    def __eq__(self, other):
+        return isinstance(other, FakeChannel) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeBot:
+    register_guild_channels = MyBot.register_guild_channels
+    refresh_channel = MyBot.refresh_channel
+    on_guild_available = MyBot.on_guild_available
+    on_guild_remove = MyBot.on_guild_remove
+    on_guild_channel_create = MyBot.on_guild_channel_create
+    on_guild_channel_update = MyBot.on_guild_channel_update
+    on_guild_channel_delete = MyBot.on_guild_channel_delete
+
+    def __init__(self):
+        self.channels_registry = ChannelsRegistry()
+        self.enabled_channels = {}
+        self.ducks_spawned = {}
+        self.forgotten_languages = []
+
+    def forget_guild_language(self, guild):
+        self.forgotten_languages.append(guild.id)
+
+
+def make_guild(guild_id: int, channel_ids):
+    guild = types.SimpleNamespace(id=guild_id, channels=[])
+    guild.channels = [FakeChannel(channel_id, guild) for channel_id in channel_ids]
+    return guild
+
+
+def test_guild_channels_are_registered_and_forgotten():
+    bot = FakeBot()
+    guild = make_guild(1, [10, 11])
+    other_guild = make_guild(2, [20])
+
+    asyncio.run(bot.on_guild_available(guild))
+    asyncio.run(bot.on_guild_available(other_guild))
+    assert len(bot.channels_registry) == 3
+    assert bot.channels_registry.get(10) is guild.channels[0]
+
+    asyncio.run(bot.on_guild_remove(guild))
+    assert 10 not in bot.channels_registry
+    assert 11 not in bot.channels_registry
+    assert bot.channels_registry.get(20) is other_guild.channels[0]
+    assert bot.forgotten_languages == [1]
+
+
+def test_channels_gone_from_a_guild_are_forgotten():
+    bot = FakeBot()
+    guild = make_guild(1, [10, 11])
+    asyncio.run(bot.on_guild_available(guild))
+
+    # The guild became available again, without one of its channels.
+    asyncio.run(bot.on_guild_available(make_guild(1, [11, 12])))
+
+    assert 10 not in bot.channels_registry
+    assert 11 in bot.channels_registry
+    assert 12 in bot.channels_registry
+
+
+def test_created_and_deleted_channels():
+    bot = FakeBot()
+    guild = make_guild(1, [10])
+    asyncio.run(bot.on_guild_available(guild))
+
+    channel = FakeChannel(11, guild)
+    asyncio.run(bot.on_guild_channel_create(channel))
+    assert bot.channels_registry.get(11) is channel
+
+    asyncio.run(bot.on_guild_channel_delete(channel))
+    assert 11 not in bot.channels_registry
+    assert 10 in bot.channels_registry
+
+    # Removing the guild later doesn't trip on the deleted channel.
+    asyncio.run(bot.on_guild_remove(guild))
+    assert len(bot.channels_registry) == 0
+
+
+def test_stale_channels_are_refreshed():
+    bot = FakeBot()
+    guild = make_guild(1, [10, 11])
+    asyncio.run(bot.on_guild_available(guild))
+
+    stale_channel = guild.channels[0]
+    ducks_left = types.SimpleNamespace(channel=stale_channel)
+    duck = types.SimpleNamespace(channel=stale_channel)
+    bot.enabled_channels[stale_channel] = ducks_left
+    bot.ducks_spawned[stale_channel] = [duck]
+
+    # discord.py made new objects for the channels of the guild.
+    new_guild = make_guild(1, [10, 11])
+    asyncio.run(bot.on_guild_available(new_guild))
+    new_channel = new_guild.channels[0]
+
+    assert bot.channels_registry.get(10) is new_channel
+    assert ducks_left.channel is new_channel
+    assert duck.channel is new_channel
+    # The dicts keys are the new objects too.
+    assert next(iter(bot.enabled_channels)) is new_channel
+    assert next(iter(bot.ducks_spawned)) is new_channel
+
+
+def test_updated_channels_are_refreshed():
+    bot = FakeBot()
+    guild = make_guild(1, [10])
+    asyncio.run(bot.on_guild_available(guild))
+
+    stale_channel = guild.channels[0]
+    ducks_left = types.SimpleNamespace(channel=stale_channel)
+    bot.enabled_channels[stale_channel] = ducks_left
+
+    # The same object being updated isn't a refresh.
+    asyncio.run(bot.on_guild_channel_update(stale_channel, stale_channel))
+    assert ducks_left.channel is stale_channel
+
+    new_channel = FakeChannel(10, guild)
+    asyncio.run(bot.on_guild_channel_update(stale_channel, new_channel))
+    assert bot.channels_registry.get(10) is new_channel
+    assert ducks_left.channel is new_channel
+    assert next(iter(bot.enabled_channels)) is new_channel
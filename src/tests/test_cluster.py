@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import tempfile
+import types
+
+from utils import cluster
+from utils.cluster import ClusterClient, Coordinator, split_shards
+
+
+def test_split_shards_covers_every_shard_once():
+    assert split_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_shards(2, 3) == [[0], [1], []]
+
+    ranges = split_shards(97, 8)
+    assert sorted(shard for shards in ranges for shard in shards) == list(range(97))
+    assert max(map(len, ranges)) - min(map(len, ranges)) <= 1
+
+
+def test_client_reconnects_to_the_coordinator(monkeypatch):
+    monkeypatch.setattr(cluster, "RECONNECT_DELAY", 0.01)
+    logger = logging.getLogger("tests.cluster")
+
+    async def wait_for(condition):
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("Timed out")
+
+    async def run(socket_path):
+        coordinator = Coordinator(socket_path, logger)
+        await coordinator.start()
+        client = ClusterClient(types.SimpleNamespace(logger=logger), socket_path, worker_id=0, shard_ids=[0])
+        client.add_handler("echo", lambda data: asyncio.sleep(0, result=data))
+        try:
+            await client.connect()
+            await wait_for(lambda: client.is_leader)
+
+            # Events without a handler are ignored.
+            await client._handle_event("unknown", None)
+
+            coordinator.workers[0].writer.close()
+            await wait_for(lambda: not client.is_leader)
+            await wait_for(lambda: client.is_leader)
+
+            assert await client.request("echo", 42, worker_id=0) == [42]
+        finally:
+            await client.close()
+            await coordinator.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(f"{directory}/cluster.sock"))
@@ -0,0 +1,101 @@
+import asyncio
+import types
+
+from utils import entities_cache
+from utils.entities_cache import EntitiesCache
+from utils.models import DiscordChannel, DiscordUser
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(entities_cache, "time", clock)
+
+    cache = EntitiesCache(ttl=60)
+    db_user = object()
+    cache.put((DiscordUser, 1), db_user)
+
+    clock.now += 59
+    assert cache.get((DiscordUser, 1)) is db_user
+    clock.now += 1
+    assert cache.get((DiscordUser, 1)) is None
+    assert len(cache.entries) == 0
+
+    assert cache.stats["DiscordUser"] == {"hits": 1, "misses": 1, "expirations": 1}
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = EntitiesCache(max_size=2)
+    cache.put((DiscordUser, 1), "first")
+    cache.put((DiscordUser, 2), "second")
+
+    # Makes the first entry the most recently used.
+    assert cache.get((DiscordUser, 1)) == "first"
+    cache.put((DiscordChannel, 3), "third")
+
+    assert cache.get((DiscordUser, 2)) is None
+    assert cache.get((DiscordUser, 1)) == "first"
+    assert cache.get((DiscordChannel, 3)) == "third"
+    assert cache.stats["DiscordUser"]["evictions"] == 1
+
+
+def test_saving_another_copy_invalidates_the_entry():
+    cache = EntitiesCache()
+    cached, other_copy = types.SimpleNamespace(), types.SimpleNamespace()
+    cache.put((DiscordUser, 1), cached)
+
+    cache.saved((DiscordUser, 1), cached)
+    assert cache.get((DiscordUser, 1)) is cached
+
+    cache.saved((DiscordUser, 1), other_copy)
+    assert cache.get((DiscordUser, 1)) is None
+    assert cache.stats["DiscordUser"]["invalidations"] == 1
+
+
+def test_peek_doesnt_return_expired_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(entities_cache, "time", clock)
+
+    cache = EntitiesCache(ttl=60)
+    cache.put((DiscordUser, 1), "user")
+    assert cache.peek((DiscordUser, 1)) == "user"
+
+    clock.now += 60
+    assert cache.peek((DiscordUser, 1)) is None
+    assert cache.stats == {}
+
+
+def test_saves_are_invalidated_on_other_workers():
+    async def run():
+        broadcasts = []
+
+        async def broadcast(name, data):
+            broadcasts.append((name, data))
+
+        cache, other_worker_cache = EntitiesCache(), EntitiesCache()
+        cache.bot = types.SimpleNamespace(cluster=types.SimpleNamespace(broadcast=broadcast))
+
+        db_user = object()
+        cache.put((DiscordUser, 1), db_user)
+        other_worker_cache.put((DiscordUser, 1), object())
+        other_worker_cache.put((DiscordChannel, 2), object())
+
+        cache.saved((DiscordUser, 1), db_user)
+        cache.invalidate((DiscordChannel, 2))
+        await asyncio.sleep(0)
+
+        # Sent together
+        assert broadcasts == [("entities_invalidated", [["DiscordUser", 1], ["DiscordChannel", 2]])]
+        assert cache.get((DiscordUser, 1)) is db_user
+
+        await other_worker_cache.cluster_entities_invalidated(broadcasts[0][1])
+        assert len(other_worker_cache.entries) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+import json
+import logging
+import pickle
+import types
+
+from utils.journal import SNAPSHOT_VERSION, DucksJournal
+
+
+def write_journal(journal: DucksJournal, *entries: dict):
+    with open(journal.journal_path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def test_nothing_saved(tmp_path):
+    assert DucksJournal(None, directory=str(tmp_path))._load() == (None, None)
+
+
+def test_journal_replay(tmp_path):
+    journal = DucksJournal(None, directory=str(tmp_path))
+    write_journal(
+        journal,
+        {"seq": 1, "at": 100, "op": "spawn", "id": "a", "channel": 1, "data": {"spawned_for": 0}},
+        {"seq": 2, "at": 100, "op": "spawn", "id": "b", "channel": 1, "data": {"spawned_for": 0}},
+        {"seq": 3, "at": 100, "op": "spawn", "id": "c", "channel": 2, "data": {"spawned_for": 0}},
+        {"seq": 4, "at": 110, "op": "update", "id": "a", "data": {"spawned_for": 10, "hp": 2}},
+        {"seq": 5, "at": 115, "op": "remove", "id": "b"},
+        {"seq": 6, "at": 120, "op": "event", "event": {"current_event": "CALM"}},
+    )
+    # The last line was cut in the middle of a write.
+    with open(journal.journal_path, "a") as f:
+        f.write('{"seq": 7, "at": 1')
+
+    restored, event = journal._load()
+
+    # Ducks were alive until the last entry.
+    assert restored == {1: [("a", {"spawned_for": 20, "hp": 2})], 2: [("c", {"spawned_for": 20})]}
+    assert event == {"current_event": "CALM"}
+    assert journal._seq == 6
+
+
+def test_snapshot_compacts_the_journal(tmp_path):
+    journal = DucksJournal(None, directory=str(tmp_path))
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "seq": 2,
+        "saved_at": 100,
+        "ducks": [("a", 1, {"spawned_for": 5}), ("b", 1, {"spawned_for": 5})],
+        "event": {"current_event": "CALM"},
+    }
+    journal._write_snapshot(pickle.dumps(snapshot))
+    with open(journal.journal_path) as f:
+        assert f.read() == ""
+
+    write_journal(
+        journal,
+        # Written before the snapshot, and already part of it.
+        {"seq": 2, "at": 90, "op": "clear", "channel": 1},
+        {"seq": 3, "at": 110, "op": "remove", "id": "b"},
+        {"seq": 4, "at": 110, "op": "spawn", "id": "c", "channel": 3, "data": {}},
+    )
+
+    restored, event = journal._load()
+
+    assert restored == {1: [("a", {"spawned_for": 15})], 3: [("c", {"spawned_for": 0})]}
+    assert event == {"current_event": "CALM"}
+    assert journal._seq == 4
+
+
+def test_writes_after_closing_are_dropped(tmp_path):
+    journal = DucksJournal(None, directory=str(tmp_path))
+    last_snapshot = pickle.dumps({"version": SNAPSHOT_VERSION, "seq": 2, "saved_at": 100, "ducks": [], "event": None})
+    journal._write_snapshot(last_snapshot, last=True)
+
+    # A compaction or a flush that was still queued in a thread when the journal was closed.
+    journal._write_snapshot(pickle.dumps({"version": SNAPSHOT_VERSION, "seq": 1}))
+    journal._append([json.dumps({"seq": 3, "at": 100, "op": "clear", "channel": 1})])
+
+    with open(journal.snapshot_path, "rb") as f:
+        assert f.read() == last_snapshot
+    with open(journal.journal_path) as f:
+        assert f.read() == ""
+
+
+def test_invalid_snapshots_fall_back_to_the_journal(tmp_path):
+    journal = DucksJournal(types.SimpleNamespace(logger=logging.getLogger("tests.journal")), directory=str(tmp_path))
+    spawn = {"seq": 5, "at": 100, "op": "spawn", "id": "a", "channel": 1, "data": {}}
+
+    for snapshot in [
+        # Cut in the middle of a write
+        pickle.dumps({"version": SNAPSHOT_VERSION, "seq": 10, "saved_at": 90, "ducks": [], "event": None})[:20],
+        b"",
+        b"not a pickle",
+        pickle.dumps({"version": SNAPSHOT_VERSION, "seq": 10}),
+        pickle.dumps({"version": SNAPSHOT_VERSION, "seq": 10, "saved_at": 90, "ducks": [("b",)], "event": None}),
+    ]:
+        with open(journal.snapshot_path, "wb") as f:
+            f.write(snapshot)
+        write_journal(journal, spawn)
+        journal._seq = 0
+
+        assert journal._load() == ({1: [("a", {"spawned_for": 0})]}, None)
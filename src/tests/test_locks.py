@@ -0,0 +1,51 @@
+import asyncio
+
+from utils.locks import LockManager
+
+
+def test_locks_are_dropped_when_unused():
+    async def run():
+        manager = LockManager()
+        order = []
+
+        async def lookup(name: str, key: int):
+            async with manager.hold("players", key):
+                order.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name} end")
+
+        first = asyncio.ensure_future(lookup("first", 1))
+        second = asyncio.ensure_future(lookup("second", 1))
+        other = asyncio.ensure_future(lookup("other", 2))
+        await asyncio.sleep(0)
+
+        assert len(manager) == 2
+        assert manager.held() == {"players": 2}
+
+        await asyncio.gather(first, second, other)
+
+        assert order.index("first end") < order.index("second start")
+        assert len(manager) == 0
+
+        stats = manager.families["players"]
+        assert (stats.acquisitions, stats.contended, stats.max_waiters) == (3, 1, 1)
+        assert stats.waits.count == 1
+
+        manager.reset_stats()
+        assert stats.acquisitions == 0
+
+    asyncio.run(run())
+
+
+def test_lock_is_dropped_on_errors():
+    async def run():
+        manager = LockManager()
+        try:
+            async with manager.hold("entities", 1):
+                raise ValueError()
+        except ValueError:
+            pass
+
+        assert len(manager) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,179 @@
+import asyncio
+
+from database import create_member, create_player, with_database
+from utils.models import ENTITIES_CACHE, DiscordChannel, DiscordGuild, DiscordUser, Player, disable_channels
+
+
+@with_database
+async def test_partial_object_saves_update_fields():
+    await DiscordUser.create(discord_id=3, name="user", discriminator="0", boss_kills=1)
+
+    db_user = await DiscordUser.filter(discord_id=3).only("boss_kills", "discord_id").first()
+    db_user.boss_kills += 1
+    await db_user.save(update_fields=["boss_kills"])
+
+    db_user = await DiscordUser.get(discord_id=3)
+    assert db_user.boss_kills == 2
+    assert db_user.name == "user"
+
+
+@with_database
+async def test_only_changed_fields_are_written():
+    await create_player()
+    db_player = await Player.get(user_discord_id=3)
+
+    assert db_player.changed_fields() == []
+
+    db_player.bullets -= 1
+    db_player.shooting_stats["missed"] += 1
+    assert sorted(db_player.changed_fields()) == ["bullets", "shooting_stats"]
+
+    await db_player.save()
+    assert db_player.changed_fields() == []
+
+
+@with_database
+async def test_reading_defaultdict_keys_is_not_a_change():
+    await create_player()
+    db_player = await Player.get(user_discord_id=3)
+
+    assert db_player.shooting_stats["never_seen"] == 0
+    assert db_player.best_times["normal"] == 660
+    assert db_player.changed_fields() == []
+
+    db_player.shooting_stats["never_seen"] = 1
+    assert db_player.changed_fields() == ["shooting_stats"]
+
+
+@with_database
+async def test_concurrent_increments_add_up():
+    await create_player()
+    first = await Player.get(user_discord_id=3)
+    second = await Player.get(user_discord_id=3)
+
+    first.increment("shooting_stats", "missed")
+    first.increment("shooting_stats", "shots_fired", 2)
+    await first.save()
+
+    second.increment("shooting_stats", "missed")
+    await second.save()
+
+    assert second.shooting_stats["missed"] == 2
+    assert second.changed_fields() == []
+
+    db_player = await Player.get(user_discord_id=3)
+    assert db_player.shooting_stats["missed"] == 2
+    assert db_player.shooting_stats["shots_fired"] == 2
+
+
+@with_database
+async def test_failed_save_keeps_the_increments():
+    await create_player()
+    db_player = await Player.get(user_discord_id=3)
+
+    db_player.increment("shooting_stats", "missed")
+    db_player.bullets = None
+    try:
+        await db_player.save()
+    except Exception:
+        pass
+    else:
+        raise AssertionError("The save should have failed")
+
+    # Rolled back along with the rest of the save
+    assert (await Player.get(user_discord_id=3)).shooting_stats["missed"] == 0
+    assert db_player.shooting_stats["missed"] == 1
+    assert db_player._pending_increments == {"shooting_stats": {"missed": 1}}
+
+    db_player.bullets = 2
+    await db_player.save()
+
+    db_player = await Player.get(user_discord_id=3)
+    assert db_player.shooting_stats["missed"] == 1
+    assert db_player.bullets == 2
+
+
+@with_database
+async def test_fetch_or_create_creates_the_player():
+    db_channel, db_member = await create_member()
+
+    db_player = await Player.fetch_or_create(db_channel, db_member)
+
+    assert db_player.pk is not None
+    assert db_player.user_discord_id == 3
+    assert db_player.channel is db_channel and db_player.member is db_member
+    assert db_player.changed_fields() == []
+    assert await Player.filter(channel_id=2, user_discord_id=3).count() == 1
+
+
+@with_database
+async def test_fetch_or_create_fetches_the_existing_player():
+    existing = await create_player()
+    existing.bullets = 1
+    await existing.save()
+    db_member = await existing.member
+
+    db_player = await Player.fetch_or_create(await existing.channel, db_member)
+
+    assert db_player.pk == existing.pk
+    assert db_player.bullets == 1
+    assert await Player.all().count() == 1
+
+
+@with_database
+async def test_concurrent_fetch_or_create_return_the_same_player():
+    db_channel, db_member = await create_member()
+
+    first, second = await asyncio.gather(
+        Player.fetch_or_create(db_channel, db_member),
+        Player.fetch_or_create(db_channel, db_member),
+    )
+
+    assert first.pk == second.pk
+    assert await Player.all().count() == 1
+
+
+@with_database
+async def test_duplicates_left_by_the_migration_are_ignored():
+    # The migration only gives the key to the oldest player of a user on a channel. Duplicates created before the
+    # unique index keep a NULL key: they stay in the table, but players are never resolved to them.
+    kept = await create_player()
+    await Player.create(channel=await kept.channel, member=await kept.member, user_discord_id=None)
+
+    db_player = await Player.fetch_or_create(await kept.channel, await kept.member)
+
+    assert db_player.pk == kept.pk
+    assert await Player.all().count() == 2
+
+
+@with_database
+async def test_disable_channels_skips_the_channels_never_to_disable():
+    db_guild = await DiscordGuild.create(discord_id=1, name="guild")
+    for discord_id in (10, 11, 12, 13):
+        await DiscordChannel.create(discord_id=discord_id, name="channel", guild=db_guild, enabled=discord_id != 13)
+        ENTITIES_CACHE.put((DiscordChannel, discord_id), object())
+
+    try:
+        # 13 is already disabled, and 12 must never be disabled.
+        assert await disable_channels([10, 11, 12, 13], skip_discord_ids=[12]) == 2
+
+        enabled = dict(await DiscordChannel.all().values_list("discord_id", "enabled"))
+        assert enabled == {10: False, 11: False, 12: True, 13: False}
+
+        # The cached channels that were updated behind the cache's back are invalidated.
+        assert ENTITIES_CACHE.peek((DiscordChannel, 10)) is None
+        assert ENTITIES_CACHE.peek((DiscordChannel, 11)) is None
+        assert ENTITIES_CACHE.peek((DiscordChannel, 12)) is not None
+    finally:
+        for discord_id in (10, 11, 12, 13):
+            ENTITIES_CACHE.forget((DiscordChannel, discord_id))
+
+
+def test_disable_no_channels_makes_no_query(monkeypatch):
+    def filter(*args, **kwargs):
+        raise AssertionError("No query should be made")
+
+    monkeypatch.setattr(DiscordChannel, "filter", filter)
+
+    assert asyncio.run(disable_channels([])) == 0
+    assert asyncio.run(disable_channels([12], skip_discord_ids=[12])) == 0
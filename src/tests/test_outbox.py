@@ -0,0 +1,63 @@
+import asyncio
+import types
+
+import discord
+
+from utils.outbox import MAX_CONTENT_LENGTH, MAX_EMBEDS, MergedMessage, OutboundMessage
+from utils.send_scheduler import MessagePriority
+
+
+def run_with_loop(test):
+    # OutboundMessage creates its future on the running loop.
+    async def run():
+        test()
+
+    asyncio.run(run())
+
+
+def message(content=None, embeds=(), kwargs=None, **extra) -> OutboundMessage:
+    return OutboundMessage(content, list(embeds), kwargs or {}, **extra)
+
+
+def test_contents_are_merged():
+    def test():
+        merged = MergedMessage(message("Bang", priority=MessagePriority.LOW))
+        assert merged.add(message("The duck is dead", priority=MessagePriority.HIGH))
+        assert merged.add(message(embeds=[discord.Embed(title="Level up")]))
+
+        assert merged.content == "Bang\nThe duck is dead"
+        assert len(merged.embeds) == 1
+        assert len(merged.messages) == 3
+        assert merged.priority == MessagePriority.HIGH
+
+    run_with_loop(test)
+
+
+def test_messages_that_cannot_be_merged():
+    def test():
+        merged = MergedMessage(message("Bang"))
+        # Files, views...
+        assert not merged.add(message("Loot", kwargs={"view": None}))
+        assert not merged.add(message("x" * MAX_CONTENT_LENGTH))
+
+        merged.add(message(embeds=[discord.Embed(title="Level up")]))
+        # The content would be displayed above the embed.
+        assert not merged.add(message("Bushes"))
+
+        assert not merged.add(message(embeds=[discord.Embed(title=str(i)) for i in range(MAX_EMBEDS)]))
+        assert merged.content == "Bang"
+        assert len(merged.messages) == 2
+
+    run_with_loop(test)
+
+
+def test_messages_are_merged_per_destination():
+    def test():
+        webhook = types.SimpleNamespace(url="https://discord.com/api/webhooks/1/token")
+        merged = MergedMessage(message("Quack", webhook=webhook, webhook_parameters={"username": "Duck"}))
+
+        assert not merged.add(message("Bang"))
+        assert not merged.add(message("Quack", webhook=webhook, webhook_parameters={"username": "Ghost duck"}))
+        assert merged.add(message("Quack", webhook=webhook, webhook_parameters={"username": "Duck"}))
+
+    run_with_loop(test)
@@ -0,0 +1,126 @@
+import random
+
+import numpy as np
+
+from utils import models
+from utils.models import DAY, DiscordChannel, DucksLeft, SunState, compute_ducks_counts, night_seconds_left_array, plan_spawns
+
+FIRST_DAY = 20000 * DAY
+
+
+def scalar_ducks_count(db_channel: DiscordChannel, now: int):
+    """
+    The computation done for a single channel before planning was vectorized.
+    """
+    now = now % DAY
+
+    total_seconds_left = DAY - now
+    total_night_seconds = db_channel.night_seconds_left(0)
+    night_seconds_left = db_channel.night_seconds_left(now)
+    total_day_seconds = DAY - total_night_seconds
+    day_seconds_left = total_seconds_left - night_seconds_left
+
+    total_ducks_today = db_channel.ducks_per_day
+
+    day_ducks_count = int(total_ducks_today * 9 / 10)
+    night_ducks_count = int(total_ducks_today * 1 / 10)
+    night_ducks_count += total_ducks_today - day_ducks_count - night_ducks_count
+
+    if total_day_seconds:
+        day_ducks = int(min((day_seconds_left * day_ducks_count) / total_day_seconds, total_day_seconds / 5))
+    else:
+        day_ducks = 0
+
+    if total_night_seconds:
+        night_ducks = int(min((night_seconds_left * night_ducks_count) / total_night_seconds, total_night_seconds / 5))
+    else:
+        night_ducks = 0
+
+    return day_ducks, night_ducks
+
+
+def random_channels(rng: random.Random, count: int):
+    channels = []
+    for discord_id in range(count):
+        kind = discord_id % 4
+        if kind == 0:
+            # No night
+            night_start_at = night_end_at = rng.randrange(DAY)
+        elif kind == 1:
+            night_start_at, night_end_at = sorted(rng.sample(range(DAY), 2))
+        elif kind == 2:
+            night_end_at, night_start_at = sorted(rng.sample(range(DAY), 2))
+        else:
+            # Almost the whole day is a night, or the opposite
+            night_start_at, night_end_at = rng.choice([(0, DAY - 1), (DAY - 1, 0), (10, 11), (11, 10)])
+
+        channels.append(DiscordChannel(
+            discord_id=discord_id,
+            name=str(discord_id),
+            ducks_per_day=rng.choice([1, 5, 9, 10, 11, 48, 96, rng.randrange(1, 5000)]),
+            night_start_at=night_start_at,
+            night_end_at=night_end_at,
+        ))
+    return channels
+
+
+def times_to_check(rng: random.Random, db_channels):
+    # Around the nights boundaries, where the sun state changes, and anywhere in the day. Not 0, which means now.
+    nows = {FIRST_DAY, FIRST_DAY + DAY - 1}
+    for db_channel in db_channels[:50]:
+        for boundary in (db_channel.night_start_at, db_channel.night_end_at):
+            nows.update(FIRST_DAY + (boundary + delta) % DAY for delta in (-1, 0, 1))
+    nows.update(FIRST_DAY + rng.randrange(DAY) for _ in range(50))
+    return sorted(nows)
+
+
+def test_ducks_counts_match_the_scalar_computation():
+    rng = random.Random(1234)
+    db_channels = random_channels(rng, 400)
+
+    for now in times_to_check(rng, db_channels):
+        day_ducks, night_ducks = compute_ducks_counts(db_channels, now)
+        expected = [scalar_ducks_count(db_channel, now) for db_channel in db_channels]
+
+        assert list(zip(day_ducks.tolist(), night_ducks.tolist())) == expected, now
+
+
+def test_night_seconds_left_match_the_scalar_computation():
+    rng = random.Random(5678)
+    db_channels = random_channels(rng, 400)
+    night_start_at = np.array([db_channel.night_start_at for db_channel in db_channels], dtype=np.int64)
+    night_end_at = np.array([db_channel.night_end_at for db_channel in db_channels], dtype=np.int64)
+
+    for now in times_to_check(rng, db_channels):
+        assert night_seconds_left_array(night_start_at, night_end_at, now).tolist() == [
+            db_channel.night_seconds_left(now) for db_channel in db_channels
+        ], now
+
+
+def test_planned_spawns_match_the_ducks_left(monkeypatch):
+    seeded = np.random.default_rng(42)
+    monkeypatch.setattr(models.np.random, "default_rng", lambda: seeded)
+
+    rng = random.Random(91011)
+    db_channels = random_channels(rng, 200)
+
+    for now in times_to_check(rng, db_channels)[::10]:
+        ducks_lefts = [DucksLeft(None, db_channel=db_channel) for db_channel in db_channels]
+        for ducks_left, (day_ducks, night_ducks) in zip(
+                ducks_lefts, (scalar_ducks_count(db_channel, now) for db_channel in db_channels)
+        ):
+            ducks_left.day_ducks, ducks_left.night_ducks = day_ducks, night_ducks
+
+        timestamps, indexes, sun_states = plan_spawns(ducks_lefts, now)
+
+        planned = {(index, sun_state): 0 for index in range(len(db_channels)) for sun_state in SunState}
+        for timestamp, index, sun_state in zip(timestamps.tolist(), indexes.tolist(), sun_states.tolist()):
+            db_channel = db_channels[index]
+            assert now <= timestamp < now - now % DAY + DAY
+            # Spawns happen when the channel is in the planned sun state.
+            assert db_channel.day_status(timestamp) == SunState(sun_state)
+            planned[index, SunState(sun_state)] += 1
+
+        for index, ducks_left in enumerate(ducks_lefts):
+            assert planned[index, SunState.DAY] == ducks_left.day_ducks
+            assert planned[index, SunState.NIGHT] == ducks_left.night_ducks
@@ -0,0 +1,98 @@
+import logging
+import types
+
+from database import create_player, with_database
+from utils.models import Player
+from utils.players_cache import PlayersCache, player_key
+
+
+def players_cache() -> PlayersCache:
+    # Flushed by the tests only
+    return PlayersCache(types.SimpleNamespace(logger=logging.getLogger("tests.players_cache")), flush_interval=3600)
+
+
+async def cached_player(cache: PlayersCache, user_id: int = 3) -> Player:
+    await create_player(user_id)
+    db_player = await Player.get(user_discord_id=user_id).prefetch_related("member")
+    return await cache.add(db_player)
+
+
+@with_database
+async def test_saves_are_deferred():
+    cache = players_cache()
+    db_player = await cached_player(cache)
+
+    db_player.bullets -= 1
+    await db_player.save()
+
+    assert cache.dirty == {player_key(db_player): db_player}
+    assert (await Player.get(user_discord_id=3)).bullets == 6
+
+    await cache.flush()
+    assert not cache.dirty
+    assert (await Player.get(user_discord_id=3)).bullets == 5
+    assert db_player.changed_fields() == []
+
+    await cache.close()
+
+
+@with_database
+async def test_increments_add_up_with_other_writers():
+    cache = players_cache()
+    db_player = await cached_player(cache)
+    other_player = await cached_player(cache, user_id=4)
+
+    db_player.increment("shooting_stats", "missed")
+    db_player.bullets -= 1
+    await db_player.save()
+    other_player.increment("shooting_stats", "missed", 3)
+    await other_player.save()
+
+    # Saved by someone else (another worker, the API) in the meantime
+    api_player = await Player.get(user_discord_id=3)
+    api_player.increment("shooting_stats", "missed")
+    await api_player.save()
+
+    await cache.flush()
+
+    assert db_player.shooting_stats["missed"] == 2
+    assert db_player.changed_fields() == []
+    assert db_player._pending_increments is None
+
+    db_player = await Player.get(user_discord_id=3)
+    assert db_player.shooting_stats["missed"] == 2
+    assert db_player.bullets == 5
+    assert (await Player.get(user_discord_id=4)).shooting_stats["missed"] == 3
+
+    await cache.close()
+
+
+@with_database
+async def test_failed_writes_are_retried():
+    cache = players_cache()
+    db_player = await cached_player(cache)
+
+    db_player.increment("shooting_stats", "missed")
+    db_player.bullets = None
+    await db_player.save()
+    try:
+        await cache.flush()
+    except Exception:
+        pass
+    else:
+        raise AssertionError("The write should have failed")
+
+    assert cache.dirty == {player_key(db_player): db_player}
+    assert cache.stats["failed_writes"] == 1
+    assert db_player._pending_increments == {"shooting_stats": {"missed": 1}}
+    assert db_player.shooting_stats["missed"] == 1
+    assert (await Player.get(user_discord_id=3)).shooting_stats["missed"] == 0
+
+    db_player.bullets = 2
+    await cache.flush()
+
+    db_player = await Player.get(user_discord_id=3)
+    assert db_player.shooting_stats["missed"] == 1
+    assert db_player.bullets == 2
+
+    await cache.close()
@@ -0,0 +1,107 @@
+import types
+
+from utils.models import DAY, SunState
+from utils.scheduling import DispatchQueue, DuckExpiryQueue, ShardPartition, SpawnScheduler
+
+
+def fake_ducks_left(day_ducks: int, night_ducks: int = 0, planned_spawns=()):
+    db_channel = types.SimpleNamespace(night_start_at=0, night_end_at=0)
+    return types.SimpleNamespace(
+        db_channel=db_channel,
+        day_ducks=day_ducks,
+        night_ducks=night_ducks,
+        get_planned_spawns=lambda now=None: list(planned_spawns),
+    )
+
+
+class FakeChannel:
+    def __init__(self, shard_id: int):
+        self.guild = types.SimpleNamespace(shard_id=shard_id)
+
+
+def fake_duck(shard_id: int, expires_at: float):
+    return types.SimpleNamespace(channel=FakeChannel(shard_id), expires_at=expires_at)
+
+
+def test_shard_partition_has_its_own_state():
+    first, second = ShardPartition(0, dispatch_rate=5), ShardPartition(1, dispatch_rate=10, dispatch_burst=20)
+
+    assert first.spawn_scheduler is not second.spawn_scheduler
+    assert (first.dispatch_queue.rate, first.dispatch_queue.burst) == (5, 5)
+    assert (second.dispatch_queue.rate, second.dispatch_queue.burst) == (10, 20)
+    assert not first.paused and first.task is None
+
+
+def test_spawn_scheduler_pops_due_spawns_only():
+    now = 1_000 * DAY + 3600
+    ducks_left = fake_ducks_left(day_ducks=50)
+    late_channel = fake_ducks_left(0, planned_spawns=[(now + 10, SunState.NIGHT), (now + 5, SunState.DAY)])
+
+    scheduler = SpawnScheduler()
+    scheduler.rebuild([ducks_left], now)
+    scheduler.plan(late_channel)
+    assert len(scheduler) == 52
+
+    assert list(scheduler.pop_due(now - 1)) == []
+
+    due = list(scheduler.pop_due(now + 5))
+    assert (late_channel, SunState.DAY) in due
+    assert (late_channel, SunState.NIGHT) not in due
+
+    rest = list(scheduler.pop_due(now - now % DAY + DAY))
+    assert len(due) + len(rest) == 52
+    assert rest.count((ducks_left, SunState.DAY)) + due.count((ducks_left, SunState.DAY)) == 50
+    assert len(scheduler) == 0
+
+
+def test_dispatch_queue_token_bucket():
+    queue = DispatchQueue(rate=2, burst=3)
+    for action in range(10):
+        queue.push(1, action, now=0)
+
+    assert list(queue.pop_ready(0)) == [0, 1, 2]
+    assert list(queue.pop_ready(0.4)) == []
+    assert list(queue.pop_ready(1)) == [3, 4]
+    # Idle time doesn't build up more than the burst.
+    assert list(queue.pop_ready(100)) == [5, 6, 7]
+
+    assert len(queue) == 2
+    assert queue.deferred == 5
+    assert queue.max_deferral == 100
+
+
+def test_dispatch_queue_round_robin_between_guilds():
+    queue = DispatchQueue(rate=100)
+    for action in ["a1", "a2", "a3"]:
+        queue.push(1, action, now=0)
+    queue.push(2, "b1", now=0)
+    queue.push(3, "c1", now=0)
+    queue.push(3, "c2", now=0)
+
+    assert queue.guilds_waiting == 3
+    assert list(queue.pop_ready(0)) == ["a1", "b1", "c1", "a2", "c2", "a3"]
+    assert queue.guilds_waiting == 0
+    assert queue.oldest_enqueued_at is None
+
+
+def test_duck_expiry_queue_pops_live_ducks_in_order():
+    bot = types.SimpleNamespace(ducks_spawned={})
+    queue = DuckExpiryQueue(bot)
+
+    late, early, other_shard, killed, rescheduled = (
+        fake_duck(0, 30), fake_duck(0, 10), fake_duck(1, 10), fake_duck(0, 5), fake_duck(0, 20)
+    )
+    for duck in (late, early, other_shard, killed, rescheduled):
+        bot.ducks_spawned.setdefault(duck.channel, []).append(duck)
+        queue.push(duck)
+
+    bot.ducks_spawned[killed.channel].remove(killed)
+    rescheduled.expires_at = 40
+    queue.push(rescheduled)
+
+    assert sorted(queue.shard_ids()) == [0, 1]
+    assert list(queue.pop_expired(30, shard_id=0)) == [early, late]
+    assert list(queue.pop_expired(30, shard_id=1)) == [other_shard]
+    assert queue.shard_ids() == [0]
+    assert list(queue.pop_expired(40, shard_id=0)) == [rescheduled]
+    assert len(queue) == 0
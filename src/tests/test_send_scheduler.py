@@ -0,0 +1,155 @@
+import asyncio
+import time
+import types
+
+import yarl
+
+from utils.send_scheduler import MessagePriority, RouteBucket, SendScheduler
+
+
+def scheduler(max_in_flight: int = 50) -> SendScheduler:
+    return SendScheduler(types.SimpleNamespace(), max_in_flight=max_in_flight)
+
+
+def test_route_bucket():
+    bucket = RouteBucket()
+    assert bucket.delay(0) == 0
+
+    bucket.update(limit=2, remaining=1, reset_after=5, now=10)
+    assert bucket.delay(10) == 0
+    bucket.acquire(10)
+    assert bucket.delay(11) == 4
+    assert bucket.delay(15) == 0
+
+    # Reset since the last response: the whole limit is available again.
+    bucket.acquire(15)
+    assert bucket.remaining == 1
+
+
+def test_jobs_start_by_priority():
+    async def run():
+        send_scheduler = scheduler(max_in_flight=1)
+        started = []
+
+        def job(name):
+            async def send():
+                started.append(name)
+                return name
+            return send
+
+        results = await asyncio.gather(
+            send_scheduler.send(("channels", 1), MessagePriority.LOW, job("leave")),
+            send_scheduler.send(("channels", 2), MessagePriority.NORMAL, job("loot")),
+            send_scheduler.send(("channels", 3), MessagePriority.HIGH, job("spawn")),
+            send_scheduler.send(("channels", 4), MessagePriority.HIGH, job("kill")),
+        )
+
+        assert results == ["leave", "loot", "spawn", "kill"]
+        assert started == ["spawn", "kill", "loot", "leave"]
+        send_scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_rate_limited_routes_are_held():
+    async def run():
+        send_scheduler = scheduler()
+        started = []
+
+        def job(name):
+            async def send():
+                started.append((name, time.monotonic()))
+            return send
+
+        limited = ("webhooks", 1)
+        send_scheduler.buckets[limited] = RouteBucket()
+        send_scheduler.buckets[limited].update(limit=1, remaining=0, reset_after=0.05, now=time.monotonic())
+
+        await asyncio.gather(
+            send_scheduler.send(limited, MessagePriority.LOW, job("leave")),
+            send_scheduler.send(limited, MessagePriority.HIGH, job("spawn")),
+            send_scheduler.send(("channels", 2), MessagePriority.LOW, job("other route")),
+        )
+
+        assert [name for name, _ in started] == ["other route", "spawn", "leave"]
+        assert started[1][1] - started[0][1] >= 0.04
+        assert send_scheduler.stats["deferred"] == 2
+        assert not send_scheduler._held and not send_scheduler._release_at
+        send_scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_held_jobs_are_not_requeued_on_every_wakeup():
+    async def run():
+        send_scheduler = scheduler()
+        limited = ("channels", 1)
+        send_scheduler.buckets[limited] = RouteBucket()
+        send_scheduler.buckets[limited].update(limit=1, remaining=0, reset_after=60, now=time.monotonic())
+
+        async def send():
+            pass
+
+        futures = [
+            asyncio.ensure_future(send_scheduler.send(limited, MessagePriority.NORMAL, send)) for _ in range(100)
+        ]
+        await send_scheduler.send(("channels", 2), MessagePriority.NORMAL, send)
+
+        assert len(send_scheduler._held[limited]) == 100
+        assert not send_scheduler._queue
+        assert send_scheduler.queue_depths()[MessagePriority.NORMAL] == 100
+        assert send_scheduler.stats["deferred"] == 100
+
+        send_scheduler.close()
+        for future in futures:
+            future.cancel()
+
+    asyncio.run(run())
+
+
+def response(url: str, status: int = 200, **headers):
+    return types.SimpleNamespace(
+        method="POST",
+        url=yarl.URL(url),
+        response=types.SimpleNamespace(status=status, headers=headers),
+    )
+
+
+def test_rate_limit_headers():
+    async def run():
+        send_scheduler = scheduler()
+
+        await send_scheduler._on_request_end(None, None, response(
+            "https://discord.com/api/v10/webhooks/7/token",
+            **{"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2"},
+        ))
+        bucket = send_scheduler.buckets[("webhooks", 7)]
+        assert (bucket.limit, bucket.remaining) == (5, 0)
+        assert 1.9 < bucket.delay(time.monotonic()) <= 2
+
+        # Not a message
+        await send_scheduler._on_request_end(None, None, response(
+            "https://discord.com/api/v10/channels/8/typing", **{"X-RateLimit-Remaining": "0"}
+        ))
+        assert ("channels", 8) not in send_scheduler.buckets
+
+        await send_scheduler._on_request_end(None, None, response(
+            "https://discord.com/api/v10/channels/8/messages",
+            status=429,
+            **{"Retry-After": "3", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "3"},
+        ))
+        assert send_scheduler.stats["rate_limited"] == 1
+        assert send_scheduler.buckets[("channels", 8)].delay(time.monotonic()) > 2.9
+        assert send_scheduler.global_reset_at == 0
+
+        await send_scheduler._on_request_end(None, None, response(
+            "https://discord.com/api/v10/channels/9/messages",
+            status=429,
+            **{"Retry-After": "4", "X-RateLimit-Global": "true"},
+        ))
+        assert ("channels", 9) not in send_scheduler.buckets
+        assert 3.9 < send_scheduler.global_reset_at - time.monotonic() <= 4
+        # Nothing starts until the global rate limit is over.
+        assert 3.9 < send_scheduler._start_ready_jobs(time.monotonic()) <= 4
+
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+import pytest
+
+from utils.timings import LatencyHistogram, LoopTimings
+
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    for millisecond in range(1, 1001):
+        histogram.record(millisecond / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.015)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.015)
+    assert histogram.percentile(100) == 1
+    assert histogram.mean == pytest.approx(0.5005)
+
+
+def test_percentile_of_empty_and_out_of_range_values():
+    histogram = LatencyHistogram(highest=10)
+    assert histogram.percentile(99) == 0
+
+    histogram.record(-1)
+    histogram.record(100)
+    assert histogram.percentile(0) == 0
+    # Counted in the highest trackable bucket, but the max is still exact.
+    assert histogram.percentile(100) == pytest.approx(10, rel=0.015)
+    assert histogram.max == 100
+
+    histogram.reset()
+    assert histogram.count == 0 and histogram.percentile(50) == 0
+
+
+def test_drift_is_kept_per_loop():
+    timings = LoopTimings(["tick"])
+    timings.drift["global"].record(0.001)
+    timings.drift["shard 1"].record(12)
+    timings.skipped_iterations["shard 1"] += 3
+
+    summary = timings.summary()
+    assert summary["loops"]["global"]["skipped_iterations"] == 0
+    assert summary["loops"]["global"]["drift"]["max_ms"] == 1
+    assert summary["loops"]["shard 1"]["skipped_iterations"] == 3
+    assert summary["loops"]["shard 1"]["drift"]["max_ms"] == 12000
+
+    timings.reset()
+    assert timings.summary()["loops"] == {}
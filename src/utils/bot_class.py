@@ -15,13 +15,20 @@ from discord.ext.commands.bot import AutoShardedBot
 from tortoise import timezone
 
 from utils import config
+from utils.channels import ChannelsRegistry
 from utils.ctx_class import MyContext
 from utils.events import Events
+from utils.journal import DucksJournal
 from utils.logger import FakeLogger
-from utils.models import AccessLevel, DucksLeft, get_from_db, init_db_connection, DiscordUser
+from utils.models import ENTITIES_CACHE, AccessLevel, DucksLeft, get_from_db, init_db_connection, DiscordUser, Player
+from utils.outbox import Outbox
+from utils.players_cache import PlayersCache
+from utils.scheduling import DuckExpiryQueue
+from utils.send_scheduler import SendScheduler
 
 if typing.TYPE_CHECKING:
     # Prevent circular imports
+    from utils.cluster import ClusterClient
     from utils.ducks import Duck
 
 
@@ -36,25 +43,52 @@ class MyBot(AutoShardedBot):
         self.stay_tuned_was_n_events_ago = 99
         self.calm_times_ahead_was_n_events_ago = 99
         activity = discord.Game(self.current_event.value[0])
+        self.send_scheduler = SendScheduler(
+            self, max_in_flight=self.config["bot"].get("max_in_flight_messages", 50)
+        )
         super().__init__(
             *args,
             command_prefix=get_prefix,
             activity=activity,
             case_insensitive=self.config["bot"]["commands_are_case_insensitive"],
+            http_trace=self.send_scheduler.trace_config,
             **kwargs,
         )
         self.commands_used = collections.Counter()
         self.top_users = collections.Counter()
         self.uptime = timezone.now()
         self.shards_ready = set()
+        self.channels_registry = ChannelsRegistry()
+        # Guild ID -> language set on the guild
+        self.guilds_languages: typing.Dict[int, str] = {}
         self.socket_stats = collections.Counter()
         self._client_session: Optional[aiohttp.ClientSession] = None
         self.ducks_spawned: collections.defaultdict[
             discord.TextChannel, collections.deque["Duck"]
         ] = collections.defaultdict(collections.deque)
+        self.ducks_expiry_queue = DuckExpiryQueue(self)
+        self.ducks_journal = DucksJournal(self)
+        self.outbox = Outbox(self, scheduler=self.send_scheduler)
+        self.outbox.window = self.config["bot"].get("messages_coalescing_window", self.outbox.window)
+        ENTITIES_CACHE.bot = self
+        ENTITIES_CACHE.max_size = self.config["bot"].get("entities_cache_max_size", ENTITIES_CACHE.max_size)
+        ENTITIES_CACHE.ttl = self.config["bot"].get("entities_cache_ttl", ENTITIES_CACHE.ttl)
+        ENTITIES_CACHE.names_sync_interval = self.config["bot"].get(
+            "names_sync_interval", ENTITIES_CACHE.names_sync_interval
+        )
+        self.players_cache: Optional[PlayersCache] = None
+        if self.config["bot"].get("players_write_behind", False):
+            self.players_cache = PlayersCache(
+                self,
+                max_size=self.config["bot"].get("players_cache_max_size", 10000),
+                flush_interval=self.config["bot"].get("players_write_behind_interval", 0.5),
+            )
+            Player.write_behind_cache = self.players_cache
         self.enabled_channels: typing.Dict[discord.TextChannel, DucksLeft] = {}
         self.concurrency = MaxConcurrency(number=1, per=BucketType.channel, wait=True)
         self.allow_ducks_spawning = True
+        # Set by the cluster launcher when running in cluster mode
+        self.cluster: Optional["ClusterClient"] = None
 
         self._duckhunt_public_log = None
 
@@ -69,6 +103,69 @@ class MyBot(AutoShardedBot):
                 "The bot haven't been setup yet. Ensure you call bot.async_setup asap."
             )
 
+    @property
+    def is_cluster_leader(self) -> bool:
+        """
+        Whether this process runs the things that must happen only once for the whole bot, like events. Always True
+        when the bot isn't running in cluster mode.
+        """
+        return self.cluster is None or self.cluster.is_leader
+
+    def get_guild_shard_id(self, guild_id: int) -> int:
+        return (guild_id >> 22) % self.shard_count
+
+    async def get_guilds_count(self) -> int:
+        """
+        Number of guilds the bot is in, counting the guilds of every worker in cluster mode.
+        """
+        if self.cluster:
+            return sum(await self.cluster.request("guilds_count", all_workers=True))
+
+        return len(self.guilds)
+
+    def get_channel(self, id: int, /):
+        return self.channels_registry.get(id) or super().get_channel(id)
+
+    def register_guild_channels(self, guild: Guild):
+        """
+        Update the channels registry with a guild, and move the planification and the ducks of its channels to the new
+        channel objects, if discord.py made new ones.
+        """
+        for channel in self.channels_registry.add_guild(guild):
+            self.refresh_channel(channel)
+
+    def refresh_channel(self, channel: discord.abc.GuildChannel):
+        """
+        Replace the stale objects for this channel with the live one.
+
+        Dicts keyed by channels find the new object (channels compare by ID), but keep the old one as key.
+        """
+        ducks_left = self.enabled_channels.pop(channel, None)
+        if ducks_left is not None:
+            ducks_left.channel = channel
+            self.enabled_channels[channel] = ducks_left
+
+        if channel in self.ducks_spawned:
+            ducks = self.ducks_spawned.pop(channel)
+            for duck in ducks:
+                duck.channel = channel
+            self.ducks_spawned[channel] = ducks
+
+    async def get_guild_language(self, guild: Guild) -> str:
+        """
+        The language set on a guild, kept in memory. Call forget_guild_language when it changes.
+        """
+        language = self.guilds_languages.get(guild.id)
+
+        if language is None:
+            db_guild = await get_from_db(guild)
+            language = self.guilds_languages[guild.id] = db_guild.language
+
+        return language
+
+    def forget_guild_language(self, guild: Guild):
+        self.guilds_languages.pop(guild.id, None)
+
     @property
     def available_guilds(self) -> typing.Iterable[Guild]:
         return filter(lambda g: not g.unavailable, self.guilds)
@@ -82,10 +179,18 @@ class MyBot(AutoShardedBot):
         """
         self.logger.debug("Running async init")
 
-        self._client_session = (
-            aiohttp.ClientSession()
+        # The webhooks use this session, the send scheduler reads their rate limits.
+        self._client_session = aiohttp.ClientSession(
+            trace_configs=[self.send_scheduler.trace_config]
         )  # There is no need to call __aenter__, since that does nothing in that case
 
+        if self.cluster:
+            await self.cluster.connect()
+            self.cluster.add_handler("guilds_count", self._cluster_guilds_count)
+            self.cluster.add_handler("log_to_channel", self._cluster_log_to_channel)
+            self.cluster.add_handler("worker_status", self._cluster_worker_status)
+            self.cluster.add_handler("entities_invalidated", ENTITIES_CACHE.cluster_entities_invalidated)
+
         if self.config["database"]["enable"]:
             await init_db_connection(self.config["database"])
 
@@ -114,8 +219,15 @@ class MyBot(AutoShardedBot):
 
     async def close(self) -> None:
         self.logger.warning("Bot closing request received...")
+        await self.outbox.flush()
+        self.send_scheduler.close()
+        if self.players_cache:
+            await self.players_cache.close()
+        await ENTITIES_CACHE.close()
         await super().close()
         await self._client_session.close()
+        if self.cluster:
+            await self.cluster.close()
         self.logger.warning("Bot closed. Bye.")
 
     def get_logging_channel(self):
@@ -128,6 +240,21 @@ class MyBot(AutoShardedBot):
         return self._duckhunt_public_log
 
     async def log_to_channel(self, *args, **kwargs):
+        if self.cluster:
+            server_id = self.config["duckhunt_public_log"]["server_id"]
+            if not self.get_guild(server_id):
+                # The logging channel is on another worker
+                embed = kwargs.get("embed")
+                results = await self.cluster.request(
+                    "log_to_channel",
+                    {
+                        "content": args[0] if args else kwargs.get("content"),
+                        "embed": embed.to_dict() if embed else None,
+                    },
+                    shard_id=self.get_guild_shard_id(server_id),
+                )
+                return results[0]
+
         channel = self.get_logging_channel()
         message = await channel.send(*args, **kwargs)
         try:
@@ -145,6 +272,22 @@ class MyBot(AutoShardedBot):
             )
             return False
 
+    async def _cluster_guilds_count(self, data):
+        return len(self.guilds)
+
+    async def _cluster_worker_status(self, data):
+        return {
+            "worker_id": self.cluster.worker_id,
+            "shard_ids": self.cluster.shard_ids,
+            "shards_ready": len(self.shards_ready),
+            "guilds": len(self.guilds),
+            "latency": round(self.latency * 1000, 2),
+        }
+
+    async def _cluster_log_to_channel(self, data):
+        embed = discord.Embed.from_dict(data["embed"]) if data["embed"] else None
+        return await self.log_to_channel(data["content"], embed=embed)
+
     async def on_socket_event_type(self, event_type):
         self.socket_stats[event_type] += 1
 
@@ -228,9 +371,17 @@ class MyBot(AutoShardedBot):
 
     async def on_shard_ready(self, shard_id):
         self.shards_ready.add(shard_id)
+        for guild in self.guilds:
+            if guild.shard_id == shard_id:
+                self.register_guild_channels(guild)
 
-    async def on_disconnect(self):
-        self.shards_ready = set()
+    async def on_shard_resumed(self, shard_id):
+        self.shards_ready.add(shard_id)
+
+    async def on_shard_disconnect(self, shard_id):
+        # Only the shard that disconnected pauses. on_disconnect isn't used, since it's dispatched whenever any shard
+        # reconnects, and the other shards wouldn't get ready again.
+        self.shards_ready.discard(shard_id)
 
     async def on_ready(self):
         messages = [
@@ -258,7 +409,26 @@ class MyBot(AutoShardedBot):
         for message in messages:
             self.logger.info(message)
 
+    async def on_guild_available(self, guild):
+        self.register_guild_channels(guild)
+
+    async def on_guild_remove(self, guild):
+        # Guilds going unavailable during outages keep their channels, so that the planification doesn't disable them.
+        self.channels_registry.remove_guild(guild)
+        self.forget_guild_language(guild)
+
+    async def on_guild_channel_create(self, channel):
+        self.channels_registry.add(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        if self.channels_registry.add(after):
+            self.refresh_channel(after)
+
+    async def on_guild_channel_delete(self, channel):
+        self.channels_registry.remove(channel)
+
     async def on_guild_join(self, guild):
+        self.register_guild_channels(guild)
         self.logger.info(f"Joined guild {guild.name} ({guild.id}), checking for bans...")
         is_banned = await DiscordUser.filter(access_level_override=0).filter(discord_id=guild.owner_id).exists()
         if is_banned:
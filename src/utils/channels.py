@@ -0,0 +1,62 @@
+"""
+Registry of the guild channels the bot can see, by ID.
+
+It's kept up to date from the gateway events (see MyBot), so that the spawning loop can resolve channel IDs without
+walking every channel of every guild, and always gets the live channel objects.
+"""
+import typing
+
+import discord
+
+
+class ChannelsRegistry:
+    def __init__(self):
+        self._channels: typing.Dict[int, discord.abc.GuildChannel] = {}
+        self._guilds_channels: typing.Dict[int, typing.Set[int]] = {}
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __contains__(self, channel_id: int):
+        return channel_id in self._channels
+
+    def get(self, channel_id: int) -> typing.Optional[discord.abc.GuildChannel]:
+        return self._channels.get(channel_id)
+
+    def add(self, channel: discord.abc.GuildChannel) -> bool:
+        """
+        Register a channel. Returns True if it replaces another object for the same channel, which is now stale.
+        """
+        previous = self._channels.get(channel.id)
+        self._channels[channel.id] = channel
+        self._guilds_channels.setdefault(channel.guild.id, set()).add(channel.id)
+
+        return previous is not None and previous is not channel
+
+    def remove(self, channel: discord.abc.GuildChannel):
+        self._channels.pop(channel.id, None)
+        guild_channels = self._guilds_channels.get(channel.guild.id)
+        if guild_channels is not None:
+            guild_channels.discard(channel.id)
+
+    def add_guild(self, guild: discord.Guild) -> typing.List[discord.abc.GuildChannel]:
+        """
+        Register every channel of a guild, forgetting the ones that are gone. Returns the channels that replaced stale
+        objects.
+        """
+        previous_ids = self._guilds_channels.pop(guild.id, set())
+
+        replaced = []
+        for channel in guild.channels:
+            if self.add(channel):
+                replaced.append(channel)
+            previous_ids.discard(channel.id)
+
+        for channel_id in previous_ids:
+            self._channels.pop(channel_id, None)
+
+        return replaced
+
+    def remove_guild(self, guild: discord.Guild):
+        for channel_id in self._guilds_channels.pop(guild.id, ()):
+            self._channels.pop(channel_id, None)
@@ -0,0 +1,425 @@
+"""
+Cluster mode: the shards are split between many worker processes, that talk together through a coordinator.
+
+The coordinator runs in the launcher process (see cluster.py), and listens on a Unix socket. Messages are JSON
+objects, one per line. Workers can:
+
+- ask another worker (found by shard ID or worker ID), or every worker, to run a command, and get the results back,
+- broadcast an event to every other worker.
+
+The coordinator also elects a leader (the connected worker with the lowest ID), that runs the things that must only
+happen once for the whole bot, like changing the event every hour or posting stats on bots lists.
+"""
+import asyncio
+import itertools
+import json
+import os
+import typing
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+
+# Max size of a single message
+STREAM_LIMIT = 2 ** 24
+
+# Seconds to wait before reconnecting to the coordinator, doubled after every failed attempt
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+
+Handler = typing.Callable[[dict], typing.Awaitable[typing.Any]]
+
+
+class ClusterError(Exception):
+    pass
+
+
+def split_shards(shard_count: int, workers_count: int) -> typing.List[typing.List[int]]:
+    """
+    Split the shards in contiguous ranges, one per worker, as evenly as possible.
+    """
+    per_worker, remainder = divmod(shard_count, workers_count)
+    ranges = []
+    start = 0
+    for worker_id in range(workers_count):
+        end = start + per_worker + (1 if worker_id < remainder else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+async def send_message(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> typing.Optional[dict]:
+    line = await reader.readline()
+    if not line:
+        return None
+
+    return json.loads(line)
+
+
+class _WorkerConnection:
+    def __init__(self, worker_id: int, shard_ids: typing.List[int], writer: asyncio.StreamWriter):
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.writer = writer
+        self.lock = asyncio.Lock()
+
+    async def send(self, message: dict):
+        async with self.lock:
+            await send_message(self.writer, message)
+
+
+class _PendingRequest:
+    def __init__(self, origin: _WorkerConnection, request_id: int, targets: typing.Iterable[int]):
+        self.origin = origin
+        self.request_id = request_id
+        self.waiting_for = set(targets)
+        self.results: typing.Dict[int, dict] = {}
+
+
+class Coordinator:
+    """
+    Routes messages between the workers. Runs in the launcher process.
+    """
+
+    def __init__(self, socket_path: str, logger):
+        self.socket_path = socket_path
+        self.logger = logger
+        self.workers: typing.Dict[int, _WorkerConnection] = {}
+        self.leader_id: typing.Optional[int] = None
+
+        self._server: typing.Optional[asyncio.AbstractServer] = None
+        self._counter = itertools.count()
+        self._pending: typing.Dict[int, _PendingRequest] = {}
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._server = await asyncio.start_unix_server(self._handle_worker, path=self.socket_path, limit=STREAM_LIMIT)
+        self.logger.info(f"Cluster coordinator listening on {self.socket_path}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def get_worker_for_shard(self, shard_id: int) -> typing.Optional[_WorkerConnection]:
+        for worker in self.workers.values():
+            if shard_id in worker.shard_ids:
+                return worker
+        return None
+
+    async def _elect_leader(self):
+        leader_id = min(self.workers, default=None)
+        if leader_id == self.leader_id:
+            return
+
+        self.leader_id = leader_id
+        self.logger.info(f"Cluster leader is now worker {leader_id}")
+        for worker in list(self.workers.values()):
+            await self._send_to(worker, {"op": "leader", "worker_id": leader_id})
+
+    async def _send_to(self, worker: _WorkerConnection, message: dict):
+        try:
+            await worker.send(message)
+        except (ConnectionError, OSError):
+            self.logger.warning(f"Couldn't send a message to worker {worker.worker_id}, it's probably restarting.")
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_message(reader)
+        if not hello or hello.get("op") != "hello":
+            writer.close()
+            return
+
+        worker = _WorkerConnection(hello["worker_id"], hello["shard_ids"], writer)
+        self.workers[worker.worker_id] = worker
+        self.logger.info(f"Worker {worker.worker_id} connected (shards {worker.shard_ids})")
+
+        await self._send_to(worker, {"op": "leader", "worker_id": self.leader_id})
+        await self._elect_leader()
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+
+                op = message["op"]
+                if op == "request":
+                    await self._route_request(worker, message)
+                elif op == "response":
+                    await self._handle_response(worker, message)
+                elif op == "broadcast":
+                    for other in list(self.workers.values()):
+                        if other is not worker:
+                            await self._send_to(other, {"op": "event", "name": message["name"], "data": message["data"]})
+        except (ConnectionError, json.JSONDecodeError):
+            self.logger.exception(f"Lost worker {worker.worker_id}")
+        finally:
+            if self.workers.get(worker.worker_id) is worker:
+                del self.workers[worker.worker_id]
+            self.logger.warning(f"Worker {worker.worker_id} disconnected")
+
+            # Don't leave other workers waiting for an answer that will never come.
+            for coordinator_request_id, pending in list(self._pending.items()):
+                if worker.worker_id in pending.waiting_for:
+                    await self._handle_response(
+                        worker,
+                        {"id": coordinator_request_id, "error": f"Worker {worker.worker_id} disconnected"},
+                    )
+
+            await self._elect_leader()
+
+    async def _route_request(self, origin: _WorkerConnection, message: dict):
+        if message.get("all_workers"):
+            targets = list(self.workers.values())
+        elif message.get("shard_id") is not None:
+            targets = [self.get_worker_for_shard(message["shard_id"])]
+        elif message.get("worker_id") is not None:
+            targets = [self.workers.get(message["worker_id"])]
+        else:
+            targets = [self.workers.get(self.leader_id)]
+
+        if not all(targets):
+            await self._send_to(
+                origin, {"op": "response", "id": message["id"], "error": "No worker is available for this request"}
+            )
+            return
+
+        coordinator_request_id = next(self._counter)
+        self._pending[coordinator_request_id] = _PendingRequest(
+            origin, message["id"], (target.worker_id for target in targets)
+        )
+
+        for target in targets:
+            await self._send_to(
+                target,
+                {"op": "request", "id": coordinator_request_id, "name": message["name"], "data": message["data"]},
+            )
+
+    async def _handle_response(self, worker: _WorkerConnection, message: dict):
+        pending = self._pending.get(message["id"])
+        if not pending or worker.worker_id not in pending.waiting_for:
+            return
+
+        pending.waiting_for.discard(worker.worker_id)
+        pending.results[worker.worker_id] = {
+            "worker_id": worker.worker_id,
+            "result": message.get("result"),
+            "error": message.get("error"),
+        }
+
+        if not pending.waiting_for:
+            del self._pending[message["id"]]
+            await self._send_to(
+                pending.origin,
+                {
+                    "op": "response",
+                    "id": pending.request_id,
+                    "results": [pending.results[worker_id] for worker_id in sorted(pending.results)],
+                },
+            )
+
+
+class ClusterClient:
+    """
+    The worker side of the cluster. Available as bot.cluster when the bot runs in cluster mode.
+    """
+
+    def __init__(self, bot: "MyBot", socket_path: str, worker_id: int, shard_ids: typing.List[int]):
+        self.bot = bot
+        self.socket_path = socket_path
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.leader_id: typing.Optional[int] = None
+
+        self._handlers: typing.Dict[str, Handler] = {}
+        self._counter = itertools.count()
+        self._futures: typing.Dict[int, asyncio.Future] = {}
+        self._writer: typing.Optional[asyncio.StreamWriter] = None
+        self._write_lock = asyncio.Lock()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader_id == self.worker_id
+
+    def add_handler(self, name: str, handler: Handler):
+        """
+        Register the coroutine run when another worker sends a request or an event called `name`. It gets the data
+        sent with it, and what it returns is sent back for requests.
+        """
+        self._handlers[name] = handler
+
+    def remove_handler(self, name: str):
+        self._handlers.pop(name, None)
+
+    async def connect(self):
+        reader = await self._open()
+        self._task = asyncio.ensure_future(self._run(reader))
+
+    async def _open(self) -> asyncio.StreamReader:
+        reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+        await self._send({"op": "hello", "worker_id": self.worker_id, "shard_ids": self.shard_ids})
+        self.bot.logger.info(f"Connected to the cluster coordinator as worker {self.worker_id} (shards {self.shard_ids})")
+        return reader
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            self._writer.close()
+
+    async def _run(self, reader: asyncio.StreamReader):
+        """
+        Handle the messages from the coordinator, and reconnect to it when the connection is lost.
+        """
+        while True:
+            try:
+                await self._read_loop(reader)
+            except (ConnectionError, json.JSONDecodeError):
+                self.bot.logger.exception("Error reading from the cluster coordinator.")
+
+            self._lost_connection()
+
+            delay = RECONNECT_DELAY
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    reader = await self._open()
+                    break
+                except (ConnectionError, OSError):
+                    self.bot.logger.warning(f"Couldn't reconnect to the cluster coordinator, retrying in {delay} seconds.")
+                    delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _lost_connection(self):
+        self.bot.logger.error("Lost the connection to the cluster coordinator, reconnecting.")
+
+        # Another worker may be elected in the meantime: stop acting as the leader until the coordinator says so.
+        self.leader_id = None
+
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+        # The responses to the requests sent will never come.
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(ClusterError("Lost the connection to the cluster coordinator"))
+
+    async def _send(self, message: dict):
+        async with self._write_lock:
+            if self._writer is None:
+                raise ClusterError("Not connected to the cluster coordinator")
+
+            await send_message(self._writer, message)
+
+    async def request(
+            self,
+            name: str,
+            data: typing.Any = None,
+            *,
+            shard_id: int = None,
+            worker_id: int = None,
+            all_workers: bool = False,
+            timeout: float = 30,
+    ) -> typing.List[typing.Any]:
+        """
+        Run the `name` handler on the worker owning `shard_id`, on `worker_id`, on every worker if `all_workers` is set,
+        or on the leader by default. Returns the list of results, ordered by worker ID.
+        """
+        request_id = next(self._counter)
+        future = self._futures[request_id] = asyncio.get_running_loop().create_future()
+
+        try:
+            await self._send(
+                {
+                    "op": "request",
+                    "id": request_id,
+                    "name": name,
+                    "data": data,
+                    "shard_id": shard_id,
+                    "worker_id": worker_id,
+                    "all_workers": all_workers,
+                }
+            )
+            response = await asyncio.wait_for(future, timeout)
+        finally:
+            self._futures.pop(request_id, None)
+
+        if response.get("error"):
+            raise ClusterError(response["error"])
+
+        errors = [f"worker {r['worker_id']}: {r['error']}" for r in response["results"] if r["error"]]
+        if errors:
+            raise ClusterError(", ".join(errors))
+
+        return [r["result"] for r in response["results"]]
+
+    async def broadcast(self, name: str, data: typing.Any = None):
+        """
+        Send an event to every other worker, without waiting for them to handle it.
+        """
+        await self._send({"op": "broadcast", "name": name, "data": data})
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        while True:
+            message = await read_message(reader)
+            if message is None:
+                return
+
+            op = message["op"]
+            if op == "leader":
+                self.leader_id = message["worker_id"]
+            elif op == "response":
+                future = self._futures.get(message["id"])
+                if future and not future.done():
+                    future.set_result(message)
+            elif op == "request":
+                asyncio.ensure_future(self._answer(message))
+            elif op == "event":
+                asyncio.ensure_future(self._handle_event(message["name"], message["data"]))
+
+    async def _run_handler(self, name: str, data: typing.Any):
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise ClusterError(f"No handler for {name} on worker {self.worker_id}")
+
+        try:
+            return await handler(data)
+        except Exception:
+            self.bot.logger.exception(f"Error in cluster handler {name}")
+            raise
+
+    async def _handle_event(self, name: str, data: typing.Any):
+        if name not in self._handlers:
+            # Workers can run different versions while restarting, or not have loaded the same cogs.
+            self.bot.logger.warning(f"Ignoring cluster event {name}, worker {self.worker_id} has no handler for it.")
+            return
+
+        try:
+            await self._run_handler(name, data)
+        except Exception:
+            # Already logged, and nobody is waiting for the result of an event.
+            pass
+
+    async def _answer(self, message: dict):
+        try:
+            result = await self._run_handler(message["name"], message["data"])
+            response = {"op": "response", "id": message["id"], "result": result}
+        except Exception as e:
+            response = {"op": "response", "id": message["id"], "error": f"{type(e).__name__}: {e}"}
+
+        try:
+            await self._send(response)
+        except (ClusterError, ConnectionError, OSError):
+            self.bot.logger.warning(f"Couldn't answer the cluster request {message['name']}, the coordinator is gone.")
@@ -209,8 +209,7 @@ class MyContext(commands.Context):
 
     async def get_language_code(self, user_language=False):
         if self.guild and not user_language:
-            db_guild = await get_from_db(self.guild)
-            language = db_guild.language
+            language = await self.bot.get_guild_language(self.guild)
         else:
             db_user = await get_from_db(self.author, as_user=True)
             language = db_user.language
@@ -1,10 +1,13 @@
 import asyncio
 import datetime
+import functools
+import itertools
 import random
 import time
 import typing
 from collections import defaultdict
 from enum import Enum
+from types import MappingProxyType
 from typing import Optional
 
 import discord
@@ -16,9 +19,10 @@ from utils.bot_class import MyBot
 from utils.bushes import bushes_objects, bushes_weights
 from utils.coats import Coats
 from utils.events import Events
-from utils.interaction import anti_bot_zero_width, get_webhook_if_possible
-from utils.models import DiscordChannel, Player, SunState, get_from_db, get_player
-from utils.translations import ntranslate, translate
+from utils.interaction import anti_bot_zero_width, anti_bot_zero_width_lines, get_webhook_if_possible
+from utils.models import DiscordChannel, DiscordGuild, Player, SunState, get_from_db, get_player
+from utils.send_scheduler import MessagePriority
+from utils.translations import get_language_ntranslate_function, get_language_translate_function, translate
 
 SECOND = 1
 MINUTE = 60 * SECOND
@@ -42,11 +46,93 @@ def _(s):
     return s
 
 
+@functools.lru_cache(maxsize=None)
+def get_webhook_templates(category: str) -> typing.Tuple[typing.Mapping[str, str], ...]:
+    """
+    Every (avatar, username) a duck of that category can use on webhooks. Ducks share these read-only dicts.
+    """
+    cosmetics = getattr(ducks_config, category)
+    return tuple(
+        MappingProxyType({"avatar_url": avatar_url, "username": username})
+        for avatar_url, username in itertools.product(cosmetics["avatar_urls"], cosmetics["usernames"])
+    )
+
+
+def find_webhook_template(category: str, webhook_parameters: dict) -> typing.Mapping[str, str]:
+    for template in get_webhook_templates(category):
+        if template == webhook_parameters:
+            return template
+
+    # Saved by an older version, or with cosmetics that changed since.
+    return MappingProxyType(dict(webhook_parameters))
+
+
+# Messages of every duck that only change by a few values, translated once per language.
+MESSAGES = {
+    "kill": _(
+        "{killer.mention} killed the duck in {spawned_for_str}, "
+        "for a total of {total_ducks_killed} "
+        "({ncategory_killed}) "
+        "[{splits_formatted}]"
+    ),
+    "kill_normal_exp": _("**Killed**: {normal_exp} exp"),
+    "kill_bonus_exp": _("**4-leaf Clover**: {bonus_experience} exp"),
+    "kill_decoy_bonus_exp": _("**2-leaf Clover**: {bonus_experience} exp"),
+    "kill_prestige_exp": _("**Prestige**: {prestige_experience} exp"),
+    "kill_holiday_bonus_exp": _("**Holiday Bonus**: {holiday_bonus_experience} exp"),
+    "hurt": _(
+        "{hurter.mention} hurt the duck [**SUPER DUCK detected**: {lives_left}/{total_lives}][**Damage** : -{damage}]"
+    ),
+    "hurt_hidden_lives": _("{hurter.mention} hurt the duck [**SUPER DUCK detected**][**Damage** : -{damage}]"),
+}
+
+# How the cosmetics from ducks_config are prepared before being picked at random
+TRANSLATED_COSMETICS = {"shouts", "bye_traces", "bye_shouts"}
+ESCAPED_COSMETICS = {"traces", "faces", "bye_traces"}
+
+
+@functools.lru_cache(maxsize=None)
+def get_message_template(language: str, category: str, kind: str) -> typing.Union[str, typing.Tuple[str, ...]]:
+    """
+    The parts of ducks messages that don't change from a message to the next, for a (language, category, kind).
+
+    For a message in MESSAGES, that's the translated format string, to fill with the variable parts. For cosmetics
+    (traces, shouts, ...), that's the tuple of translated and escaped choices to pick from.
+    """
+    if kind in MESSAGES:
+        return translate(MESSAGES[kind], language)
+
+    choices = getattr(ducks_config, category)[kind]
+    if kind in TRANSLATED_COSMETICS:
+        choices = [translate(choice, language) for choice in choices]
+    if kind in ESCAPED_COSMETICS:
+        choices = [escape_markdown(choice) for choice in choices]
+
+    return tuple(choices)
+
+
 class Duck:
     """
     The standard duck. Kill it with the pan command
     """
 
+    __slots__ = (
+        "bot",
+        "channel",
+        "decoy",
+        "_db_channel",
+        "_db_guild",
+        "_webhook_template",
+        "spawned_at",
+        "expires_at",
+        "journal_id",
+        "_target_lock",
+        "target_lock_by",
+        "db_target_lock_by",
+        "_lives",
+        "lives_left",
+    )
+
     category = _("normal")
     fake = False  # Fake ducks only exists when they are alone on a channel. They are used for taunt messages, mostly.
     use_bonus_exp = True
@@ -60,21 +146,20 @@ class Duck:
         self.decoy = decoy
 
         self._db_channel: Optional[DiscordChannel] = None
+        self._db_guild: Optional[DiscordGuild] = None
 
-        self._webhook_parameters = {
-            "avatar_url": random.choice(self.get_cosmetics()["avatar_urls"]),
-            "username": random.choice(self.get_cosmetics()["usernames"]),
-        }
+        self._webhook_template = random.choice(get_webhook_templates(self.category))
 
         self.spawned_at: Optional[int] = None
-        self.target_lock = asyncio.Lock()
+        self.expires_at: Optional[float] = None
+        self.journal_id: Optional[str] = None
+        # Created on the first shot, most ducks are never targeted.
+        self._target_lock: Optional[asyncio.Lock] = None
         self.target_lock_by: Optional[discord.Member] = None
         self.db_target_lock_by: Optional[Player] = None
 
         self._lives: Optional[int] = None
         self.lives_left: Optional[int] = self._lives
-        self._translate_function = None
-        self._ntranslate_function = None
 
     def serialize(self):
         return {
@@ -83,7 +168,7 @@ class Duck:
             "spawned_for": self.spawned_for,
             "lives_left": self.lives_left,
             "lives": self._lives,
-            "webhook_parameters": self._webhook_parameters,
+            "webhook_parameters": dict(self._webhook_template),
             "decoy": self.decoy
         }
 
@@ -93,11 +178,18 @@ class Duck:
         d.spawned_at = time.time() - data["spawned_for"]
         d.lives_left = data["lives_left"]
         d._lives = data["lives"]
-        d._webhook_parameters = data["webhook_parameters"]
+        d._webhook_template = find_webhook_template(cls.category, data["webhook_parameters"])
         d.decoy = data["decoy"]
 
         return d
 
+    @property
+    def target_lock(self) -> asyncio.Lock:
+        if self._target_lock is None:
+            self._target_lock = asyncio.Lock()
+
+        return self._target_lock
+
     def get_cosmetics(self):
         return getattr(ducks_config, self.category)
 
@@ -114,28 +206,12 @@ class Duck:
     # Database #
 
     async def get_translate_function(self):
-        if not self._translate_function:
-            db_guild = await get_from_db(self.channel.guild)
-            language = db_guild.language
-
-            def _(message, **kwargs):
-                return translate(message, language).format(**kwargs)
-
-            self._translate_function = _
-
-        return self._translate_function
+        language = await self.bot.get_guild_language(self.channel.guild)
+        return get_language_translate_function(language)
 
     async def get_ntranslate_function(self):
-        if not self._ntranslate_function:
-            db_guild = await get_from_db(self.channel.guild)
-            language = db_guild.language
-
-            def ngettext(singular, plurial, n, **kwargs):
-                return ntranslate(singular, plurial, n, language).format(**kwargs)
-
-            self._ntranslate_function = ngettext
-
-        return self._ntranslate_function
+        language = await self.bot.get_guild_language(self.channel.guild)
+        return get_language_ntranslate_function(language)
 
     async def get_db_channel(self):
         if not self._db_channel:
@@ -143,11 +219,18 @@ class Duck:
 
         return self._db_channel
 
+    async def get_db_guild(self):
+        if not self._db_guild:
+            self._db_guild = await get_from_db(self.channel.guild)
+
+        return self._db_guild
+
     async def get_webhook_parameters(self) -> dict:
         _ = await self.get_translate_function()
-        webhook = self._webhook_parameters
-        webhook["username"] = _(webhook["username"])
-        return webhook
+        return {
+            "avatar_url": self._webhook_template["avatar_url"],
+            "username": _(self._webhook_template["username"]),
+        }
 
     async def get_exp_value(self) -> int:
         db_channel = await self.get_db_channel()
@@ -166,11 +249,11 @@ class Duck:
 
     async def increment_hurts(self):
         db_hurter = self.db_target_lock_by
-        db_hurter.hurted[self.category] += 1
+        db_hurter.increment("hurted", self.category)
 
     async def increment_kills(self):
         db_killer = self.db_target_lock_by
-        db_killer.killed[self.category] += 1
+        db_killer.increment("killed", self.category)
 
         now = datetime.datetime.now()
         now_date = now.date()
@@ -179,21 +262,21 @@ class Duck:
             db_killer.ducks_killed_today = defaultdict(int)
 
         if self.decoy:
-            db_killer.ducks_killed_today["decoy"] += 1
+            db_killer.increment("ducks_killed_today", "decoy")
 
-        db_killer.ducks_killed_today[self.category] += 1
+        db_killer.increment("ducks_killed_today", self.category)
 
     async def increment_hugs(self):
         db_hugger = self.db_target_lock_by
-        db_hugger.hugged[self.category] += 1
+        db_hugger.increment("hugged", self.category)
 
     async def increment_resists(self):
         db_hurter = self.db_target_lock_by
-        db_hurter.resisted[self.category] += 1
+        db_hurter.increment("resisted", self.category)
 
     async def increment_frightens(self):
         db_frightener = self.db_target_lock_by
-        db_frightener.frightened[self.category] += 1
+        db_frightener.increment("frightened", self.category)
 
     async def set_best_time(self):
         db_hunter = self.db_target_lock_by
@@ -218,9 +301,12 @@ class Duck:
 
     # Messages #
 
+    async def get_template(self, kind: str):
+        language = await self.bot.get_guild_language(self.channel.guild)
+        return get_message_template(language, self.category, kind)
+
     async def get_trace(self) -> str:
-        traces = self.get_cosmetics()["traces"]
-        trace = escape_markdown(random.choice(traces))
+        trace = random.choice(await self.get_template("traces"))
 
         return anti_bot_zero_width(trace)
 
@@ -244,37 +330,27 @@ class Duck:
                 face = random.choice(faces)
         else:
             if not db_channel.use_emojis:
-                faces = self.get_cosmetics()["faces"]
-                face = escape_markdown(random.choice(faces))
+                face = random.choice(await self.get_template("faces"))
             else:
-                faces = self.get_cosmetics()["emojis"]
-                face = random.choice(faces)
+                face = random.choice(await self.get_template("emojis"))
 
         return face
 
     async def get_shout(self) -> str:
-        _ = await self.get_translate_function()
-        shouts = self.get_cosmetics()["shouts"]
+        shout = random.choice(await self.get_template("shouts"))
 
-        shout = _(random.choice(shouts))
         if "http" in shout:
             return shout
         else:
             return anti_bot_zero_width(shout)
 
     async def get_bye_trace(self) -> str:
-        _ = await self.get_translate_function()
-        traces = self.get_cosmetics()["bye_traces"]
-
-        trace = _(random.choice(traces))
+        trace = random.choice(await self.get_template("bye_traces"))
 
-        return anti_bot_zero_width(discord.utils.escape_markdown(trace))
+        return anti_bot_zero_width(trace)
 
     async def get_bye_shout(self) -> str:
-        _ = await self.get_translate_function()
-        shouts = self.get_cosmetics()["bye_shouts"]
-
-        shout = _(random.choice(shouts))
+        shout = random.choice(await self.get_template("bye_shouts"))
 
         return anti_bot_zero_width(shout)
 
@@ -297,11 +373,7 @@ class Duck:
     async def get_kill_message(
             self, killer, db_killer: Player, won_experience: int, bonus_experience: int, prestige_experience: int, holiday_bonus_experience: int
     ) -> str:
-        _ = await self.get_translate_function()
-        ngettext = await self.get_ntranslate_function()
-        db_guild = await get_from_db(self.channel.guild)
-
-        locale = db_guild.language
+        locale = await self.bot.get_guild_language(self.channel.guild)
 
         spawned_for = datetime.timedelta(seconds=self.spawned_for)
         if locale.startswith("ru"):
@@ -317,27 +389,26 @@ class Duck:
         this_ducks_killed = db_killer.killed.get(self.category)
 
         normal_exp = won_experience - bonus_experience - prestige_experience - holiday_bonus_experience
-        splits = [_("**Killed**: {normal_exp} exp", normal_exp=normal_exp)]
+        splits = [get_message_template(locale, self.category, "kill_normal_exp").format(normal_exp=normal_exp)]
 
         if bonus_experience:
             if self.decoy and False:
-                splits.append(_("**2-leaf Clover**: {bonus_experience} exp", bonus_experience=bonus_experience))
+                template = get_message_template(locale, self.category, "kill_decoy_bonus_exp")
             else:
-                splits.append(_("**4-leaf Clover**: {bonus_experience} exp", bonus_experience=bonus_experience))
+                template = get_message_template(locale, self.category, "kill_bonus_exp")
+            splits.append(template.format(bonus_experience=bonus_experience))
 
         if prestige_experience:
-            splits.append(_("**Prestige**: {prestige_experience} exp", prestige_experience=prestige_experience))
+            template = get_message_template(locale, self.category, "kill_prestige_exp")
+            splits.append(template.format(prestige_experience=prestige_experience))
 
         if holiday_bonus_experience:
-            splits.append(_("**Holiday Bonus**: {holiday_bonus_experience} exp", holiday_bonus_experience=holiday_bonus_experience))
+            template = get_message_template(locale, self.category, "kill_holiday_bonus_exp")
+            splits.append(template.format(holiday_bonus_experience=holiday_bonus_experience))
 
         splits_formatted = " + ".join(splits)
 
-        return _(
-            "{killer.mention} killed the duck in {spawned_for_str}, "
-            "for a total of {total_ducks_killed} "
-            "({ncategory_killed}) "
-            "[{splits_formatted}]",
+        return get_message_template(locale, self.category, "kill").format(
             killer=killer,
             splits_formatted=splits_formatted,
             spawned_for_str=spawned_for_str,
@@ -354,22 +425,19 @@ class Duck:
         )
 
     async def get_hurt_message(self, hurter, db_hurter, damage) -> str:
-        _ = await self.get_translate_function()
         db_channel = await self.get_db_channel()
 
         if db_channel.show_duck_lives:
             total_lives = await self.get_lives()
             lives_left = self.lives_left
-            return _(
-                "{hurter.mention} hurt the duck [**SUPER DUCK detected**: {lives_left}/{total_lives}][**Damage** : -{damage}]",
+            return (await self.get_template("hurt")).format(
                 hurter=hurter,
                 damage=damage,
                 lives_left=lives_left,
                 total_lives=total_lives,
             )
         else:
-            return _(
-                "{hurter.mention} hurt the duck [**SUPER DUCK detected**][**Damage** : -{damage}]",
+            return (await self.get_template("hurt_hidden_lives")).format(
                 hurter=hurter,
                 damage=damage,
             )
@@ -405,7 +473,11 @@ class Duck:
 
         return f"{shout} {trace}"
 
-    async def send(self, content: str, **kwargs):
+    async def send(self, content: str = None, priority: MessagePriority = MessagePriority.NORMAL, **kwargs):
+        """
+        Queue a message on the duck channel. It's sent in the background, merged with the messages that follow it
+        closely if possible.
+        """
         db_channel = await self.get_db_channel()
         if db_channel.use_webhooks:
             webhook = await get_webhook_if_possible(self.bot, db_channel)
@@ -414,54 +486,66 @@ class Duck:
 
         if webhook:
             this_webhook_parameters = await self.get_webhook_parameters()
+            sent = self.bot.outbox.send(
+                self.channel,
+                content,
+                webhook=webhook,
+                webhook_parameters=this_webhook_parameters,
+                priority=priority,
+                **kwargs,
+            )
 
             async def sendit():
                 try:
-                    await webhook.send(content, **this_webhook_parameters, **kwargs)
+                    await sent
                     return
                 except (discord.NotFound, ValueError) as e:
                     db_channel: DiscordChannel = await get_from_db(self.channel)
                     self.bot.logger.warning(
                         f"Removing webhook {webhook.url} on #{self.channel.name} on {self.channel.guild.id} from planification because {e}."
                     )
-                    db_channel.webhook_urls.remove(webhook.url)
-                    await db_channel.save()
+                    # Messages merged together all fail with the same webhook
+                    if webhook.url in db_channel.webhook_urls:
+                        db_channel.webhook_urls.remove(webhook.url)
+                        await db_channel.save()
                     try:
-                        await self.channel.send(content, **kwargs)
+                        await self.bot.outbox.send(self.channel, content, priority=priority, **kwargs)
                     except (discord.Forbidden, discord.NotFound):
                         self.bot.logger.warning(
                             f"Removing #{self.channel.name} on {self.channel.guild.id} from planification because I'm not allowed to send messages there {e}."
                         )
-                        try:
-                            del self.bot.enabled_channels[self.channel]
-                        except KeyError:
-                            pass
-                        try:
-                            del self.bot.ducks_spawned[self.channel]
-                        except KeyError:
-                            pass
+                        self.forget_channel()
 
             asyncio.ensure_future(sendit())
             return
 
+        sent = self.bot.outbox.send(self.channel, content, priority=priority, **kwargs)
+
         async def sendit():
             try:
-                await self.channel.send(content, **kwargs)
+                await sent
             except (discord.Forbidden, discord.NotFound):
                 # self.bot.logger.warning(
                 #     f"Removing #{self.channel.name} on {self.channel.guild.id} from planification because I'm not allowed to send messages there."
                 # )
-                try:
-                    del self.bot.enabled_channels[self.channel]
-                except KeyError:
-                    pass
-                try:
-                    del self.bot.ducks_spawned[self.channel]
-                except KeyError:
-                    pass
+                self.forget_channel()
 
         asyncio.ensure_future(sendit())
 
+    def forget_channel(self):
+        """
+        Stop spawning ducks on this channel, we can't send messages there.
+        """
+        try:
+            del self.bot.enabled_channels[self.channel]
+        except KeyError:
+            pass
+        try:
+            del self.bot.ducks_spawned[self.channel]
+            self.bot.ducks_journal.record_clear(self.channel)
+        except KeyError:
+            pass
+
     # Parameters #
 
     async def get_time_left(self) -> float:
@@ -570,9 +654,11 @@ class Duck:
                 f"Spawning {self}", guild=self.channel.guild, channel=self.channel
             )
             self.spawned_at = time.time()
-            await self.send(message)
+            await self.send(message, priority=MessagePriority.HIGH)
 
         bot.ducks_spawned[self.channel].append(self)
+        bot.ducks_journal.record_spawn(self)
+        await self.schedule_leave()
 
     async def shoot(self, args) -> Optional[bool]:
         if await self.will_frighten():
@@ -612,16 +698,35 @@ class Duck:
             f"Leaving {self}", guild=self.channel.guild, channel=self.channel
         )
 
-        await self.send(await self.get_left_message())
+        await self.send(await self.get_left_message(), priority=MessagePriority.LOW)
         self.despawn()
 
-    async def maybe_leave(self):
+    async def schedule_leave(self, db_channel: Optional[DiscordChannel] = None):
+        """
+        Plan the duck departure in the bot expiry queue, based on the channel ducks_time_to_live.
+
+        Pass a db_channel to use new channel settings, for instance after they were edited.
+        """
+        if db_channel:
+            self._db_channel = db_channel
+
         db_channel = await self.get_db_channel()
-        if db_channel.ducks_time_to_live < self.spawned_for:
-            await self.leave()
-            return True
-        else:
-            return False
+        self.expires_at = self.spawned_at + db_channel.ducks_time_to_live
+        self.bot.ducks_expiry_queue.push(self)
+
+    def restore(self, db_channel: DiscordChannel):
+        """
+        Put a deserialized duck back on its channel, silently. Unlike spawn, this doesn't need the database, since
+        db_channel (with its guild prefetched) is given by the caller.
+        """
+        self._db_channel = db_channel
+        self._db_guild = db_channel.guild
+
+        self.bot.ducks_spawned[self.channel].append(self)
+        self.bot.ducks_journal.record_spawn(self)
+
+        self.expires_at = self.spawned_at + db_channel.ducks_time_to_live
+        self.bot.ducks_expiry_queue.push(self)
 
     async def maybe_bushes_message(
             self, hunter, db_hunter
@@ -645,9 +750,9 @@ class Duck:
         gave_item = await item_found.give(db_channel, db_hunter)
 
         if gave_item:
-            db_hunter.found_items["took_" + item_found.db] += 1
+            db_hunter.increment("found_items", "took_" + item_found.db)
         else:
-            db_hunter.found_items["left_" + item_found.db] += 1
+            db_hunter.increment("found_items", "left_" + item_found.db)
 
         _ = await self.get_translate_function()
         args = await item_found.send_args(_, gave_item)
@@ -655,7 +760,7 @@ class Duck:
         args["content"] = f"{hunter.mention} > " + args.get("content", "")
 
         async def send_result():
-            await self.send(**args)
+            await self.send(priority=MessagePriority.LOW, **args)
 
         return send_result
 
@@ -697,13 +802,13 @@ class Duck:
             elif self.bot.current_event == Events.BLOSSOMING_FLOWERS:
                 bonus_experience = max(bonus_experience * 2, 21)
 
-            db_killer.shooting_stats["bonus_experience_earned"] += bonus_experience
+            db_killer.increment("shooting_stats", "bonus_experience_earned", bonus_experience)
             won_experience += bonus_experience
 
             prestige_experience = await self.get_prestige_experience(db_killer)
             if prestige_experience:
                 won_experience += prestige_experience
-                db_killer.shooting_stats["prestige_experience_earned"] += prestige_experience
+                db_killer.increment("shooting_stats", "prestige_experience_earned", prestige_experience)
 
             if self.bot.current_event == Events.BONUS:
                 if db_killer.shooting_stats.get("last_bonus_timestamp", 0) < time.time() - HOUR:
@@ -711,7 +816,7 @@ class Duck:
 
                     holiday_bonus_experience = random.randint(65, 280)
                     won_experience += holiday_bonus_experience
-                    db_killer.shooting_stats["holiday_bonus_experience_earned"] += holiday_bonus_experience
+                    db_killer.increment("shooting_stats", "holiday_bonus_experience_earned", holiday_bonus_experience)
 
         await db_killer.edit_experience_with_levelups(
             self.channel, won_experience, bot=self.bot
@@ -722,7 +827,8 @@ class Duck:
         await self.send(
             await self.get_kill_message(
                 killer, db_killer, won_experience, bonus_experience, prestige_experience, holiday_bonus_experience
-            )
+            ),
+            priority=MessagePriority.HIGH,
         )
         if bushes_coro is not None:
             await bushes_coro()
@@ -746,8 +852,10 @@ class Duck:
     # Utilities #
 
     def despawn(self):
+        self.expires_at = None
         try:
             self.bot.ducks_spawned[self.channel].remove(self)
+            self.bot.ducks_journal.record_remove(self)
         except ValueError:
             pass
 
@@ -756,7 +864,10 @@ class Duck:
         This function remove lives from a duck and returns True if the duck was killed, False otherwise
         """
         self.lives_left = self.lives_left - lives
-        return await self.is_killed()
+        killed = await self.is_killed()
+        if not killed:
+            self.bot.ducks_journal.record_update(self)
+        return killed
 
     async def post_kill(self, killer, db_killer, won_experience, bonus_experience, prestige_experience):
         """
@@ -785,6 +896,8 @@ class GhostDuck(Duck):
     A rare duck that does *not* say anything when it spawns.
     """
 
+    __slots__ = ()
+
     category = _("ghost")
     fake = False  # Fake ducks only exists when they are alone on a channel. They are used for taunt messages, mostly.
 
@@ -805,16 +918,20 @@ class GhostDuck(Duck):
 
         bot = self.bot
 
-        bot.ducks_spawned[self.channel].append(self)
-
         self.spawned_at = time.time()
 
+        bot.ducks_spawned[self.channel].append(self)
+        bot.ducks_journal.record_spawn(self)
+        await self.schedule_leave()
+
 
 class PrDuck(Duck):
     """
     Duck that will ask a simple math question to be killed
     """
 
+    __slots__ = ("anger_level", "answer", "operation")
+
     category = _("prof")
 
     def __init__(self, bot: MyBot, channel: discord.TextChannel, *args, **kwargs):
@@ -1345,20 +1462,12 @@ class Map:
 
     def get_map_string(self):
         string = "‮‭".join(XCOORDS) + "🔢\n"
-        string += "\n".join(
-            [
-                "".join(
-                    map(
-                        lambda e: "" + anti_bot_zero_width(e.value) + ""
-                        if e != MapTile.NOTHING
-                        else "" + anti_bot_zero_width(MapTile.TREE1.value) + "",
-                        row,
-                    )
-                )
-                + YCOORDS[i]
-                for i, row in enumerate(self.grid)
-            ]
+        # Empty tiles are shown as trees. Enum .value is slow to get for every tile, hence the _value_ and the replace.
+        nothing, tree = MapTile.NOTHING.value, MapTile.TREE1.value
+        rows = anti_bot_zero_width_lines(
+            ["".join([e._value_ for e in row]).replace(nothing, tree) for row in self.grid]
         )
+        string += "\n".join([row + y for row, y in zip(rows, YCOORDS)])
 
         return string
 
@@ -1368,6 +1477,8 @@ class CartographerDuck(Duck):
     Duck that will need to be found in the map
     """
 
+    __slots__ = ("map", "duck_coords")
+
     category = _("cartographer")
 
     def __init__(self, bot: MyBot, channel: discord.TextChannel, *args, **kwargs):
@@ -1454,6 +1565,8 @@ class BabyDuck(Duck):
     A baby duck. You shouldn't kill a baby duck. If you do, your exp will suffer.
     """
 
+    __slots__ = ()
+
     category = _("baby")
     leave_on_hug = True
     use_bonus_exp = False
@@ -1505,7 +1618,7 @@ class BabyDuck(Duck):
     async def get_hug_message(self, hugger, db_hugger, experience) -> str:
         spawned_for = datetime.timedelta(seconds=self.spawned_for)
 
-        db_guild = await get_from_db(self.channel.guild)
+        db_guild = await self.get_db_guild()
 
         locale = db_guild.language
 
@@ -1532,6 +1645,8 @@ class GoldenDuck(Duck):
     Duck worth twice the usual experience
     """
 
+    __slots__ = ()
+
     prestige_experience_chance = 100
 
     category = _("golden")
@@ -1554,6 +1669,8 @@ class PlasticDuck(Duck):
     Worthless duck (half the exp)
     """
 
+    __slots__ = ()
+
     prestige_experience_chance = 0
     category = _("plastic")
 
@@ -1578,6 +1695,8 @@ class KamikazeDuck(Duck):
     This duck kills every other duck on the channel when leaving
     """
 
+    __slots__ = ()
+
     category = _("kamikaze")
 
     async def get_ncategory_killed(self, this_ducks_killed):
@@ -1590,8 +1709,9 @@ class KamikazeDuck(Duck):
         )
 
     async def leave(self):
-        await self.send(await self.get_left_message())
+        await self.send(await self.get_left_message(), priority=MessagePriority.LOW)
         self.bot.ducks_spawned[self.channel].clear()
+        self.bot.ducks_journal.record_clear(self.channel)
 
 
 class MechanicalDuck(Duck):
@@ -1599,6 +1719,8 @@ class MechanicalDuck(Duck):
     This duck is not really a duck...
     """
 
+    __slots__ = ("creator",)
+
     category = _("mechanical")
     fake = True
     use_bonus_exp = False
@@ -1666,6 +1788,8 @@ class SuperDuck(Duck):
     A duck with many lives to spare.
     """
 
+    __slots__ = ()
+
     category = _("super")
 
     def __init__(self, *args, lives: int = None, **kwargs):
@@ -1701,6 +1825,8 @@ class MotherOfAllDucks(SuperDuck):
     This duck will spawn two more when she dies.
     """
 
+    __slots__ = ()
+
     category = _("moad")
 
     async def get_ncategory_killed(self, this_ducks_killed):
@@ -1731,6 +1857,8 @@ class ArmoredDuck(SuperDuck):
     This duck will resist a damage of 1.
     """
 
+    __slots__ = ()
+
     category = _("armored")
 
     async def get_ncategory_killed(self, this_ducks_killed):
@@ -1779,6 +1907,8 @@ class NightDuck(Duck):
     A normal duck that only spawns at night.
     """
 
+    __slots__ = ()
+
     category = _("night")
 
     async def get_ncategory_killed(self, this_ducks_killed):
@@ -1796,6 +1926,8 @@ class SleepingDuck(Duck):
     An un-miss-able duck that you can only shot at night
     """
 
+    __slots__ = ()
+
     category = _("sleeping")
 
     async def get_ncategory_killed(self, this_ducks_killed):
@@ -0,0 +1,194 @@
+"""
+In-process cache of the guilds, channels, users and members returned by get_from_db.
+
+get_from_db is called for nearly every message (prefix, bans, access levels...). Entities already seen are kept in an
+LRU, for `ttl` seconds at most so that changes made by other processes are picked up eventually, and returned without
+touching the database.
+
+The cache is kept coherent with the writes made in this process: the cached object is the one every caller gets and
+saves, and saving or deleting another copy of it drops it from the cache. In cluster mode, the other workers are told
+to drop the entities saved here. Names that changed on Discord are updated on the cached object right away, but written
+to the database in batches, every `names_sync_interval` seconds.
+"""
+import asyncio
+import collections
+import time
+import typing
+
+from tortoise.transactions import in_transaction
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+    from utils.models import TrackedChangesMixin
+
+# (model class, *identifiers)
+EntityKey = typing.Tuple[typing.Any, ...]
+
+
+class EntitiesCache:
+    def __init__(self, max_size: int = 50000, ttl: float = 600, names_sync_interval: float = 30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.names_sync_interval = names_sync_interval
+        self.bot: typing.Optional["MyBot"] = None
+
+        # key -> (object, expires at), least recently used first
+        self.entries: collections.OrderedDict[EntityKey, typing.Tuple["TrackedChangesMixin", float]] = (
+            collections.OrderedDict()
+        )
+        # key -> (object, names fields to write)
+        self.pending_names: typing.Dict[EntityKey, typing.Tuple["TrackedChangesMixin", typing.Tuple[str, ...]]] = {}
+        self._names_lock = asyncio.Lock()
+        self._task: typing.Optional[asyncio.Task] = None
+
+        # Model name -> model class, to find the keys invalidated by other workers
+        self._models: typing.Dict[str, typing.Any] = {}
+        # Keys to invalidate on the other workers, sent together
+        self._outgoing_invalidations: typing.List[list] = []
+
+        # Model name -> hits, misses, expirations, evictions, invalidations, names_synced
+        self.stats: typing.DefaultDict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+
+    # Cache #
+
+    def get(self, key: EntityKey):
+        stats = self.stats[key[0].__name__]
+        entry = self.entries.get(key)
+        if entry is None:
+            stats["misses"] += 1
+            return None
+
+        db_obj, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            stats["expirations"] += 1
+            stats["misses"] += 1
+            return None
+
+        stats["hits"] += 1
+        self.entries.move_to_end(key)
+        return db_obj
+
+    def peek(self, key: EntityKey):
+        """
+        Like get, without counting it in the stats nor changing the LRU order.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+
+        return entry[0]
+
+    def put(self, key: EntityKey, db_obj):
+        self._models[key[0].__name__] = key[0]
+        self.entries[key] = (db_obj, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            evicted_key, _ = self.entries.popitem(last=False)
+            self.stats[evicted_key[0].__name__]["evictions"] += 1
+
+    def forget(self, key: EntityKey):
+        if self.entries.pop(key, None) is not None:
+            self.stats[key[0].__name__]["invalidations"] += 1
+
+    def saved(self, key: EntityKey, db_obj):
+        """
+        Called when an object is saved. If it isn't the cached one, the cached one is now outdated.
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is not db_obj:
+            self.forget(key)
+
+        self._invalidate_elsewhere(key)
+
+    def invalidate(self, key: EntityKey):
+        """
+        Called when an object is deleted or updated without being loaded, here and on the other workers.
+        """
+        self.forget(key)
+        self._invalidate_elsewhere(key)
+
+    # Cluster #
+
+    def _invalidate_elsewhere(self, key: EntityKey):
+        if self.bot is None or self.bot.cluster is None:
+            return
+
+        self._outgoing_invalidations.append([key[0].__name__, *key[1:]])
+        if len(self._outgoing_invalidations) == 1:
+            asyncio.ensure_future(self._broadcast_invalidations())
+
+    async def _broadcast_invalidations(self):
+        keys, self._outgoing_invalidations = self._outgoing_invalidations, []
+        try:
+            await self.bot.cluster.broadcast("entities_invalidated", keys)
+        except Exception:
+            self.bot.logger.exception(f"Couldn't tell the other workers about {len(keys)} entities saved here.")
+
+    async def cluster_entities_invalidated(self, keys: typing.List[list]):
+        for model_name, *identifiers in keys:
+            model = self._models.get(model_name)
+            if model is not None:
+                self.forget((model, *identifiers))
+
+    # Names #
+
+    def sync_names(self, key: EntityKey, db_obj, fields: typing.Tuple[str, ...]):
+        """
+        Write the names fields of the object later, along with the other names that changed in the meantime.
+        """
+        self.pending_names[key] = (db_obj, fields)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.names_sync_interval)
+            try:
+                await self.flush_names()
+            except Exception:
+                if self.bot:
+                    self.bot.logger.exception("Couldn't write the names of cached entities, will retry.")
+
+    async def flush_names(self):
+        async with self._names_lock:
+            if not self.pending_names:
+                return
+
+            pending, self.pending_names = self.pending_names, {}
+            try:
+                # A single transaction, so that it's one commit whatever the number of names
+                async with in_transaction() as connection:
+                    for db_obj, fields in pending.values():
+                        await db_obj.save(using_db=connection, update_fields=fields)
+            except Exception:
+                for key, item in pending.items():
+                    self.pending_names.setdefault(key, item)
+                raise
+
+            for db_obj, _ in pending.values():
+                self.stats[type(db_obj).__name__]["names_synced"] += 1
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        await self.flush_names()
+
+    # Metrics #
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def summary(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "pending_names": len(self.pending_names),
+            "stats": {model_name: dict(counter) for model_name, counter in self.stats.items()},
+        }
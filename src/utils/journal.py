@@ -0,0 +1,304 @@
+"""
+Crash-safe storage of the ducks currently on channels, and of the current event.
+
+Every change is appended to a journal, which is compacted every so often into a binary snapshot of the live state. All
+the writes happen in a thread, away from the event loop, and files are replaced atomically. When the bot restarts, the
+state is restored from the snapshot, replaying the journal entries written after it.
+"""
+import asyncio
+import json
+import os
+import pickle
+import threading
+import time
+import typing
+import uuid
+
+import discord
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+    from utils.ducks import Duck
+
+SNAPSHOT_VERSION = 1
+
+# Channel ID -> list of (journal ID, serialized duck)
+RestoredDucks = typing.Dict[int, typing.List[typing.Tuple[str, dict]]]
+
+
+def _json_default(obj):
+    # Some ducks keep discord objects around (for instance, the mechanical ducks creator). Those can't be restored.
+    return None
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, default=_json_default)
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Write a file so that readers either see the previous content, or the whole new content, even if the process dies.
+    """
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class DucksJournal:
+    def __init__(self, bot: "MyBot", directory: str = "cache", name: str = "ducks"):
+        self.bot = bot
+        self.journal_path = os.path.join(directory, f"{name}_journal.jsonl")
+        self.snapshot_path = os.path.join(directory, f"{name}_snapshot.pickle")
+
+        self.flush_interval = 1
+        self.snapshot_interval = 300
+        self.snapshot_max_entries = 10000
+
+        self._pending: typing.List[str] = []
+        self._seq = 0
+        self._entries_since_snapshot = 0
+        self._last_snapshot_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: typing.Optional[asyncio.Task] = None
+        # Held by the threads writing the files. Once closed, the writes still queued in threads are dropped, so that
+        # they can't replace the last snapshot with an older one, or truncate the journal after it.
+        self._files_lock = threading.Lock()
+        self._closed = False
+
+    # Recording #
+
+    def _record(self, op: str, **kwargs):
+        self._seq += 1
+        self._pending.append(_dumps({"seq": self._seq, "at": time.time(), "op": op, **kwargs}))
+
+    def record_spawn(self, duck: "Duck"):
+        if duck.journal_id is None:
+            duck.journal_id = uuid.uuid4().hex
+
+        self._record("spawn", id=duck.journal_id, channel=duck.channel.id, data=duck.serialize())
+
+    def record_update(self, duck: "Duck"):
+        if duck.journal_id is not None:
+            self._record("update", id=duck.journal_id, data=duck.serialize())
+
+    def record_remove(self, duck: "Duck"):
+        if duck.journal_id is not None:
+            self._record("remove", id=duck.journal_id)
+
+    def record_clear(self, channel: discord.abc.Snowflake):
+        self._record("clear", channel=channel.id)
+
+    def record_event(self):
+        self._record("event", event=self.event_state())
+
+    def event_state(self) -> dict:
+        return {
+            "current_event": self.bot.current_event.name,
+            "stay_tuned_was_n_events_ago": self.bot.stay_tuned_was_n_events_ago,
+            "calm_times_ahead_was_n_events_ago": self.bot.calm_times_ahead_was_n_events_ago,
+        }
+
+    # Restoring #
+
+    async def load(self) -> typing.Tuple[typing.Optional[RestoredDucks], typing.Optional[dict]]:
+        """
+        Read the snapshot and replay the journal. Returns (None, None) if nothing was ever saved.
+        """
+        return await asyncio.to_thread(self._load)
+
+    def _load(self):
+        # Journal ID -> [channel ID, serialized duck, time of serialization]
+        ducks: typing.Dict[str, list] = {}
+        event = None
+        last_at = 0.0
+        found = False
+
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            snapshot = None
+        except (EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError):
+            # Cut by a full disk, or pickling classes that changed since. The ducks spawned since the last snapshot can
+            # still be restored from the journal, instead of not starting at all.
+            self.bot.logger.exception(f"Couldn't read the ducks snapshot {self.snapshot_path}, replaying the journal alone.")
+            snapshot = None
+
+        if isinstance(snapshot, dict) and snapshot.get("version") == SNAPSHOT_VERSION:
+            try:
+                snapshot_seq = snapshot["seq"]
+                saved_at = snapshot["saved_at"]
+                snapshot_event = snapshot["event"]
+                snapshot_ducks = {
+                    duck_id: [channel_id, data, saved_at] for duck_id, channel_id, data in snapshot["ducks"]
+                }
+            except (KeyError, TypeError, ValueError):
+                self.bot.logger.exception(f"Invalid ducks snapshot {self.snapshot_path}, replaying the journal alone.")
+            else:
+                found = True
+                self._seq = snapshot_seq
+                last_at = saved_at
+                event = snapshot_event
+                ducks = snapshot_ducks
+
+        snapshot_seq = self._seq
+
+        try:
+            with open(self.journal_path, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line cut in the middle of a write.
+                continue
+
+            if entry["seq"] <= snapshot_seq:
+                # Already part of the snapshot.
+                continue
+
+            found = True
+            self._seq = max(self._seq, entry["seq"])
+            last_at = max(last_at, entry["at"])
+            op = entry["op"]
+
+            if op == "spawn":
+                ducks[entry["id"]] = [entry["channel"], entry["data"], entry["at"]]
+            elif op == "update":
+                if entry["id"] in ducks:
+                    ducks[entry["id"]][1:] = [entry["data"], entry["at"]]
+            elif op == "remove":
+                ducks.pop(entry["id"], None)
+            elif op == "clear":
+                ducks = {duck_id: duck for duck_id, duck in ducks.items() if duck[0] != entry["channel"]}
+            elif op == "event":
+                event = entry["event"]
+
+        if not found:
+            return None, None
+
+        restored: RestoredDucks = {}
+        for duck_id, (channel_id, data, at) in ducks.items():
+            # Ducks were alive until the last thing we know of, most likely a few seconds before the bot stopped.
+            data["spawned_for"] = (data.get("spawned_for") or 0) + last_at - at
+            restored.setdefault(channel_id, []).append((duck_id, data))
+
+        return restored, event
+
+    # Writing #
+
+    def start(self, flush_interval: float = None, snapshot_interval: float = None, snapshot_max_entries: int = None):
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if snapshot_interval is not None:
+            self.snapshot_interval = snapshot_interval
+        if snapshot_max_entries is not None:
+            self.snapshot_max_entries = snapshot_max_entries
+
+        self._closed = False
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        # Start from a fresh snapshot, that forgets about everything that wasn't restored.
+        self._last_snapshot_at = 0.0
+
+        while True:
+            try:
+                if (
+                        time.time() - self._last_snapshot_at >= self.snapshot_interval
+                        or self._entries_since_snapshot >= self.snapshot_max_entries
+                ):
+                    await self.compact()
+                else:
+                    await self.flush()
+            except Exception:
+                self.bot.logger.exception("Couldn't write the ducks journal, will retry.")
+
+            await asyncio.sleep(self.flush_interval)
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+
+            lines, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._append, lines)
+            except Exception:
+                # Keep the entries for the next try.
+                self._pending = lines + self._pending
+                raise
+            self._entries_since_snapshot += len(lines)
+
+    def _append(self, lines: typing.List[str]):
+        with self._files_lock:
+            if self._closed:
+                return
+
+            with open(self.journal_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def compact(self):
+        async with self._lock:
+            snapshot = self._take_snapshot()
+            await asyncio.to_thread(self._write_snapshot, snapshot)
+
+    def _take_snapshot(self) -> bytes:
+        """
+        Serialize the live state. Pending entries are dropped, since the snapshot includes them.
+        """
+        now = time.time()
+        ducks = []
+
+        for channel, channel_ducks in self.bot.ducks_spawned.copy().items():
+            for duck in channel_ducks:
+                if duck.journal_id is None:
+                    duck.journal_id = uuid.uuid4().hex
+                ducks.append((duck.journal_id, channel.id, json.loads(_dumps(duck.serialize()))))
+
+        self._pending = []
+        self._entries_since_snapshot = 0
+        self._last_snapshot_at = now
+
+        return pickle.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "seq": self._seq,
+                "saved_at": now,
+                "ducks": ducks,
+                "event": self.event_state(),
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    def _write_snapshot(self, snapshot: bytes, last: bool = False):
+        with self._files_lock:
+            if self._closed:
+                return
+
+            atomic_write(self.snapshot_path, snapshot)
+            # If we die before this, the journal entries are ignored anyway, because they are older than the snapshot.
+            atomic_write(self.journal_path, b"")
+            self._closed = last
+
+    def close(self) -> int:
+        """
+        Stop the background writer, and synchronously save a last snapshot. Returns the number of ducks saved.
+
+        Writes running in a thread are waited for, and the ones that didn't start yet won't happen.
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        self._write_snapshot(self._take_snapshot(), last=True)
+        return sum(len(ducks) for ducks in self.bot.ducks_spawned.values())
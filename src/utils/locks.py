@@ -0,0 +1,86 @@
+"""
+Locks held while fetching or creating database rows, so that two commands don't create the same row at once.
+
+Locks are created when a key is first locked, and dropped as soon as nobody holds or waits for them anymore, so the
+number of locks stays at the number of lookups in progress. Keys are plain IDs, which don't keep discord.py objects
+alive. Each family of locks (entities, players...) counts how often its lookups had to wait for another one.
+"""
+import asyncio
+import collections
+import contextlib
+import time
+import typing
+
+from utils.timings import LatencyHistogram
+
+
+class _KeyLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Holding or waiting for the lock
+        self.users = 0
+
+
+class LockFamilyStats:
+    def __init__(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.max_waiters = 0
+        self.waits = LatencyHistogram()
+
+    def reset(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.max_waiters = 0
+        self.waits.reset()
+
+
+class LockManager:
+    def __init__(self):
+        # (family, key) -> lock, only while it's held or waited for
+        self._locks: typing.Dict[typing.Tuple[str, typing.Hashable], _KeyLock] = {}
+        self.families: typing.DefaultDict[str, LockFamilyStats] = collections.defaultdict(LockFamilyStats)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, family: str, key: typing.Hashable):
+        full_key = (family, key)
+        key_lock = self._locks.get(full_key)
+        if key_lock is None:
+            key_lock = self._locks[full_key] = _KeyLock()
+
+        stats = self.families[family]
+        stats.acquisitions += 1
+        key_lock.users += 1
+        try:
+            if key_lock.users > 1:
+                stats.contended += 1
+                stats.max_waiters = max(stats.max_waiters, key_lock.users - 1)
+                waiting_since = time.monotonic()
+                await key_lock.lock.acquire()
+                stats.waits.record(time.monotonic() - waiting_since)
+            else:
+                await key_lock.lock.acquire()
+
+            try:
+                yield
+            finally:
+                key_lock.lock.release()
+        finally:
+            key_lock.users -= 1
+            if not key_lock.users:
+                del self._locks[full_key]
+
+    def __len__(self):
+        return len(self._locks)
+
+    def held(self) -> typing.Counter[str]:
+        """
+        Number of keys locked or waited for, per family.
+        """
+        return collections.Counter(family for family, _ in self._locks)
+
+    def reset_stats(self):
+        for stats in self.families.values():
+            stats.reset()
@@ -1,6 +1,7 @@
 import asyncio
 import collections
 import datetime
+import json
 import random
 import string
 import time
@@ -9,15 +10,28 @@ from enum import IntEnum, unique
 
 import babel.lists
 import discord
+import numpy as np
 from discord.ext import commands
 from tortoise import Tortoise, fields, timezone
 from tortoise.models import Model
+from tortoise.transactions import in_transaction
 
 from utils.coats import Coats
+from utils.entities_cache import EntitiesCache, EntityKey
 from utils.levels import get_level_info
-from utils.translations import translate
-
-DB_LOCKS = collections.defaultdict(asyncio.Lock)
+from utils.locks import LockManager
+from utils.send_scheduler import MessagePriority
+from utils.translations import get_language_translate_function
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.players_cache import PlayersCache
+
+DB_LOCKS = LockManager()
+# Guilds, channels, users and members returned by get_from_db
+ENTITIES_CACHE = EntitiesCache()
+# Coroutines called with every DiscordChannel once it's saved, used to keep the ducks planification up to date.
+CHANNEL_SAVE_LISTENERS: typing.List[typing.Callable[["DiscordChannel"], typing.Awaitable[None]]] = []
 SECOND = 1
 MINUTE = 60 * SECOND
 HOUR = 60 * MINUTE
@@ -57,6 +71,131 @@ class PercentageField(fields.SmallIntField):
         return super().to_db_value(value, instance)
 
 
+def _copy_json(value):
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+def _json_changed(value, db_value, field: fields.JSONField) -> bool:
+    if value == db_value:
+        return False
+
+    if isinstance(field, DefaultDictJSONField) and isinstance(value, dict) and isinstance(db_value, dict):
+        # Reading a missing key of a defaultdict adds it with the default value, which isn't a change.
+        default = field.default_factory()
+        return any(db_value.get(key, default) != item for key, item in value.items()) or not (
+            value.keys() >= db_value.keys()
+        )
+
+    return True
+
+
+class TrackedChangesMixin:
+    """
+    Remember the values of the fields as they are in the database, so that save() only writes the fields that changed,
+    including JSON fields mutated in place. Nothing is written at all if nothing changed.
+
+    Passing update_fields to save() explicitly still works as usual. Partial objects (loaded with .only()) aren't
+    tracked, and must be saved with update_fields.
+    """
+
+    _db_values: typing.Optional[dict] = None
+
+    @classmethod
+    def _tracked_fields(cls) -> typing.Tuple[typing.Tuple[str, bool], ...]:
+        """
+        (field name, is a JSON field) for every field stored in the database, but the primary key.
+        """
+        tracked = cls.__dict__.get("_tracked_fields_cache")
+        if tracked is None:
+            meta = cls._meta
+            tracked = tuple(
+                (name, isinstance(meta.fields_map[name], fields.JSONField))
+                for name in sorted(meta.db_fields)
+                if name != meta.pk_attr
+            )
+            cls._tracked_fields_cache = tracked
+        return tracked
+
+    @classmethod
+    def _init_from_db(cls, **kwargs):
+        self = super()._init_from_db(**kwargs)
+        if not self._partial:
+            self.remember_db_values()
+        return self
+
+    def remember_db_values(self, names: typing.Optional[typing.Iterable[str]] = None):
+        if self._partial:
+            # Some fields weren't loaded
+            return
+
+        if names is None or self._db_values is None:
+            self._db_values = {
+                name: _copy_json(getattr(self, name)) if is_json else getattr(self, name)
+                for name, is_json in self._tracked_fields()
+            }
+        else:
+            for name in names:
+                value = getattr(self, name)
+                self._db_values[name] = _copy_json(value) if isinstance(value, (dict, list)) else value
+
+    def changed_fields(self) -> typing.List[str]:
+        """
+        Fields that were changed since the object was loaded from the database or saved.
+        """
+        db_values = self._db_values
+        fields_map = self._meta.fields_map
+        return [
+            name
+            for name, is_json in self._tracked_fields()
+            if (
+                _json_changed(getattr(self, name), db_values[name], fields_map[name])
+                if is_json
+                else getattr(self, name) != db_values[name]
+            )
+        ]
+
+    async def refresh_from_db(self, fields=None, using_db=None):
+        await super().refresh_from_db(fields=fields, using_db=using_db)
+        self.remember_db_values(fields)
+
+    async def save(self, using_db=None, update_fields=None, force_create=False, force_update=False):
+        if update_fields is None and self._saved_in_db and self._db_values is not None and not force_create:
+            update_fields = self.changed_fields()
+            if not update_fields:
+                return
+
+            meta = self._meta
+            update_fields += [
+                name for name in meta.db_fields if getattr(meta.fields_map[name], "auto_now", False)
+            ]
+
+        await super().save(
+            using_db=using_db, update_fields=update_fields, force_create=force_create, force_update=force_update
+        )
+        self.remember_db_values(update_fields)
+
+
+class CachedEntityMixin(TrackedChangesMixin):
+    """
+    Models cached by get_from_db. Saving or deleting another copy of the cached object drops it from the cache.
+    """
+
+    def entity_cache_key(self) -> EntityKey:
+        return type(self), self.pk
+
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        ENTITIES_CACHE.saved(self.entity_cache_key(), self)
+
+    async def delete(self, using_db=None):
+        ENTITIES_CACHE.invalidate(self.entity_cache_key())
+        await super().delete(using_db=using_db)
+
+
 class SupportTicket(Model):
     user: fields.ForeignKeyRelation["DiscordUser"] = fields.ForeignKeyField(
         "models.DiscordUser", related_name="support_tickets", db_index=True
@@ -95,7 +234,7 @@ class SupportTicket(Model):
         self.close_reason = reason
 
 
-class DiscordGuild(Model):
+class DiscordGuild(CachedEntityMixin, Model):
     discord_id = fields.BigIntField(pk=True)
     first_seen = fields.DatetimeField(auto_now_add=True)
 
@@ -130,91 +269,219 @@ class DucksLeft:
     This class stores the state of a channel, counting the ducks left.
     """
 
-    def __init__(self, channel, day_ducks=None, night_ducks=None):
+    def __init__(self, channel, day_ducks=None, night_ducks=None, db_channel=None):
         self.channel: discord.TextChannel = channel
-        self.db_channel: typing.Optional[DiscordChannel] = None
+        self.db_channel: typing.Optional[DiscordChannel] = db_channel
         self.day_ducks: int = day_ducks
         self.night_ducks: int = night_ducks
+        # Settings of the channel when the ducks left were computed
+        self.planned_settings: typing.Optional[typing.Tuple[int, int, int]] = (
+            db_channel.spawn_settings if db_channel else None
+        )
 
     async def compute_ducks_count(self, db_channel=None, now=None):
         if not db_channel:
             db_channel: DiscordChannel = await get_from_db(self.channel)
 
         self.db_channel = db_channel
+        self.planned_settings = db_channel.spawn_settings
 
-        if not now:
-            now = int(time.time())
+        day_ducks, night_ducks = compute_ducks_counts([db_channel], now)
+        self.day_ducks = int(day_ducks[0])
+        self.night_ducks = int(night_ducks[0])
 
-        now = now % DAY
+        return self
 
-        total_seconds_left = DAY - now
-        total_night_seconds = db_channel.night_seconds_left(0)
-        night_seconds_left = db_channel.night_seconds_left(now)
-        total_day_seconds = DAY - total_night_seconds
-        day_seconds_left = total_seconds_left - night_seconds_left
+    def get_planned_spawns(self, now=None) -> typing.List[typing.Tuple[int, SunState]]:
+        """
+        Draw the timestamps at which the ducks left should spawn for the rest of the day.
+        """
+        timestamps, _, sun_states = plan_spawns([self], now)
+        return list(zip(timestamps.tolist(), map(SunState, sun_states.tolist())))
+
+    def consume(self, sun_state: SunState):
+        """
+        Mark a planned duck as spawned.
+        """
+        if sun_state == SunState.DAY:
+            self.day_ducks -= 1
+        else:
+            self.night_ducks -= 1
+
+    @property
+    def ducks_left(self):
+        return self.night_ducks + self.day_ducks
 
-        total_ducks_today = db_channel.ducks_per_day
 
-        day_ducks_count = int(total_ducks_today * 9 / 10)
-        night_ducks_count = int(total_ducks_today * 1 / 10)
+def night_seconds_left_array(
+    night_start_at: np.ndarray, night_end_at: np.ndarray, now: int
+) -> np.ndarray:
+    """
+    Vectorized version of DiscordChannel.night_seconds_left, for many channels at once.
+    """
+    now = now % DAY
 
-        # Add missing ducks due to int() conversion to night.
-        night_ducks_count += total_ducks_today - day_ducks_count - night_ducks_count
+    simple = night_start_at < night_end_at
+    harder = night_start_at > night_end_at
 
-        # The min() here is protecting against having more than a duck every 5 seconds.
-        if total_day_seconds:
-            self.day_ducks = int(
-                min(
-                    (day_seconds_left * day_ducks_count) / total_day_seconds,
-                    total_day_seconds / 5,
-                )
-            )
-        else:
-            # Prevent ZeroDivisionError
-            self.day_ducks = 0
-
-        if total_night_seconds:
-            self.night_ducks = int(
-                min(
-                    (night_seconds_left * night_ducks_count) / total_night_seconds,
-                    total_night_seconds / 5,
-                )
-            )
-        else:
-            # Prevent ZeroDivisionError
-            self.night_ducks = 0
+    return np.select(
+        [
+            # Simple case: everything is the same day
+            simple & (night_start_at < now) & (now <= night_end_at),
+            simple & (night_end_at < now),
+            simple,
+            # Harder case: night starts in a day and end the next day
+            harder & (now <= night_end_at),
+            harder & (now <= night_start_at),
+            harder,
+        ],
+        [
+            night_end_at - now,
+            0,
+            night_end_at - night_start_at,
+            (night_end_at - now) + (DAY - night_start_at),
+            DAY - night_start_at,
+            DAY - now,
+        ],
+        # Nothing set
+        default=0,
+    )
 
-        return self
 
-    async def maybe_spawn_type(self, now=None) -> typing.Optional[SunState]:
-        if not self.db_channel:
-            self.db_channel: DiscordChannel = await get_from_db(self.channel)
+def compute_ducks_counts(
+    db_channels: typing.Sequence["DiscordChannel"], now=None
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute how many ducks are left to spawn today during the day and during the night, for every channel at once.
 
-        db_channel = self.db_channel
+    This returns two arrays (day ducks, night ducks), in the same order as the channels.
+    """
+    if not now:
+        now = int(time.time())
 
-        if not now:
-            now = int(time.time())
+    now = now % DAY
 
-        now = now % DAY
+    count = len(db_channels)
+    ducks_per_day = np.fromiter(
+        (c.ducks_per_day for c in db_channels), dtype=np.int64, count=count
+    )
+    night_start_at = np.fromiter(
+        (c.night_start_at for c in db_channels), dtype=np.int64, count=count
+    )
+    night_end_at = np.fromiter(
+        (c.night_end_at for c in db_channels), dtype=np.int64, count=count
+    )
 
-        sun_state = db_channel.day_status(now)
+    total_seconds_left = DAY - now
+    total_night_seconds = night_seconds_left_array(night_start_at, night_end_at, 0)
+    night_seconds_left = night_seconds_left_array(night_start_at, night_end_at, now)
+    total_day_seconds = DAY - total_night_seconds
+    day_seconds_left = total_seconds_left - night_seconds_left
+
+    day_ducks_count = np.trunc(ducks_per_day * 9 / 10)
+    night_ducks_count = np.trunc(ducks_per_day * 1 / 10)
+
+    # Add missing ducks due to int() conversion to night.
+    night_ducks_count += ducks_per_day - day_ducks_count - night_ducks_count
+
+    # The minimum() here is protecting against having more than a duck every 5 seconds.
+    # np.divide's where= prevents ZeroDivisionError, leaving 0 ducks when there is no day (or no night).
+    day_ducks = np.divide(
+        day_seconds_left * day_ducks_count,
+        total_day_seconds,
+        out=np.zeros(count),
+        where=total_day_seconds != 0,
+    )
+    day_ducks = np.minimum(day_ducks, total_day_seconds / 5)
 
-        if sun_state == SunState.DAY:
-            if random.randint(0, db_channel.day_seconds_left(now)) < self.day_ducks:
-                self.day_ducks -= 1
-                return SunState.DAY
-        elif sun_state == SunState.NIGHT:
-            if random.randint(0, db_channel.night_seconds_left(now)) < self.night_ducks:
-                self.night_ducks -= 1
-                return SunState.NIGHT
-        return None
+    night_ducks = np.divide(
+        night_seconds_left * night_ducks_count,
+        total_night_seconds,
+        out=np.zeros(count),
+        where=total_night_seconds != 0,
+    )
+    night_ducks = np.minimum(night_ducks, total_night_seconds / 5)
 
-    @property
-    def ducks_left(self):
-        return self.night_ducks + self.day_ducks
+    return day_ducks.astype(np.int64), night_ducks.astype(np.int64)
 
 
-class DiscordChannel(Model):
+def plan_spawns(
+    ducks_lefts: typing.Sequence[DucksLeft], now=None
+) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draw the timestamps at which the ducks left should spawn for the rest of the day, for every channel at once.
+
+    Every duck gets a second picked uniformly at random in the day (or night) seconds left today.
+    This returns three arrays: the timestamps, the index of the channel in ducks_lefts, and the SunState of the spawns.
+    """
+    if not now:
+        now = int(time.time())
+
+    first_second = now - now % DAY
+    now = now % DAY
+
+    count = len(ducks_lefts)
+    night_start_at = np.fromiter(
+        (d.db_channel.night_start_at for d in ducks_lefts), dtype=np.int64, count=count
+    )
+    night_end_at = np.fromiter(
+        (d.db_channel.night_end_at for d in ducks_lefts), dtype=np.int64, count=count
+    )
+
+    simple = night_start_at < night_end_at
+    harder = night_start_at > night_end_at
+
+    # Seconds left today are split like this : [day 1][night 1][day 2][night 2]
+    # In the simple case, night 2 is empty. In the harder case, night 1 is the end of the night that started yesterday.
+    # Nights follow the same boundaries as DiscordChannel.day_status : night_start_at < second <= night_end_at
+    night_1_start = np.where(simple, np.maximum(now, night_start_at + 1), now)
+    night_1_end = np.where(simple | harder, np.maximum(night_1_start, night_end_at + 1), now)
+    night_2_start = np.where(harder, np.maximum(now, night_start_at + 1), DAY)
+
+    segments = {
+        SunState.DAY: ((now, night_1_start), (night_1_end, night_2_start)),
+        SunState.NIGHT: ((night_1_start, night_1_end), (night_2_start, DAY)),
+    }
+    ducks_counts = {
+        SunState.DAY: np.fromiter(
+            (d.day_ducks for d in ducks_lefts), dtype=np.int64, count=count
+        ),
+        SunState.NIGHT: np.fromiter(
+            (d.night_ducks for d in ducks_lefts), dtype=np.int64, count=count
+        ),
+    }
+
+    rng = np.random.default_rng()
+    all_timestamps, all_indexes, all_sun_states = [], [], []
+
+    for sun_state, ((start_1, end_1), (start_2, end_2)) in segments.items():
+        length_1 = np.broadcast_to(end_1 - start_1, (count,))
+        length_2 = np.broadcast_to(end_2 - start_2, (count,))
+        total_seconds = length_1 + length_2
+
+        ducks_count = np.where(total_seconds > 0, np.maximum(ducks_counts[sun_state], 0), 0)
+        indexes = np.repeat(np.arange(count), ducks_count)
+
+        offsets = rng.integers(0, total_seconds[indexes])
+        in_first_segment = offsets < length_1[indexes]
+        seconds = np.where(
+            in_first_segment,
+            np.broadcast_to(start_1, (count,))[indexes] + offsets,
+            np.broadcast_to(start_2, (count,))[indexes] + offsets - length_1[indexes],
+        )
+
+        all_timestamps.append(first_second + seconds)
+        all_indexes.append(indexes)
+        all_sun_states.append(np.full(len(indexes), int(sun_state)))
+
+    return (
+        np.concatenate(all_timestamps).astype(np.int64),
+        np.concatenate(all_indexes),
+        np.concatenate(all_sun_states),
+    )
+
+
+class DiscordChannel(CachedEntityMixin, Model):
     discord_id = fields.BigIntField(pk=True)
     first_seen = fields.DatetimeField(auto_now_add=True)
 
@@ -290,6 +557,19 @@ class DiscordChannel(Model):
     levels_to_roles_ids_mapping = fields.JSONField(default=dict)
     prestige_to_roles_ids_mapping = fields.JSONField(default=dict)
 
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+
+        for listener in CHANNEL_SAVE_LISTENERS:
+            await listener(self)
+
+    @property
+    def spawn_settings(self) -> typing.Tuple[int, int, int]:
+        """
+        The settings used to plan ducks spawns. The planification must change when they do.
+        """
+        return self.ducks_per_day, self.night_start_at, self.night_end_at
+
     def serialize(self, serialize_fields=None):
         DONT_SERIALIZE = {"guild", "members", "playerss", "webhook_urls", "api_key"}
 
@@ -617,7 +897,7 @@ async def get_word_protect_for(guild, word):
     )
 
 
-class UserInventory(Model):
+class UserInventory(TrackedChangesMixin, Model):
     # There is another bug in tortoise preventing this.
     # But you can't add a primary key on a ForeignKey like you can in django
     # Or you won't be able to save the model
@@ -657,7 +937,7 @@ class UserInventory(Model):
         table = "inventories"
 
 
-class DiscordUser(Model):
+class DiscordUser(CachedEntityMixin, Model):
     discord_id = fields.BigIntField(pk=True)
     first_seen = fields.DatetimeField(auto_now_add=True)
 
@@ -716,7 +996,7 @@ class DiscordUser(Model):
         return f"<User name={self.name}#{self.discriminator}>"
 
 
-class Player(Model):
+class Player(TrackedChangesMixin, Model):
     id = fields.IntField(pk=True)
     first_seen = fields.DatetimeField(auto_now_add=True)
 
@@ -726,6 +1006,8 @@ class Player(Model):
     member: fields.ForeignKeyRelation["DiscordMember"] = fields.ForeignKeyField(
         "models.DiscordMember", related_name="players"
     )
+    # Copy of member.user_id, so that a player can be found from the channel and user IDs without joining members.
+    user_discord_id = fields.BigIntField(null=True)
 
     ducks_killed_today = DefaultDictJSONField(default_factory=int)
     ducks_killed_today_last_reset = fields.DatetimeField(auto_now_add=True)
@@ -789,6 +1071,264 @@ class Player(Model):
         "givebacks",
     }
 
+    # Set by the bot when the players write-behind cache is enabled, see utils/players_cache.py
+    write_behind_cache: typing.ClassVar[typing.Optional["PlayersCache"]] = None
+    # The cache this player is in, if any
+    _write_behind: typing.Optional["PlayersCache"] = None
+
+    # Field name -> key -> amount, for the counters incremented since the last save.
+    _pending_increments: typing.Optional[typing.Dict[str, collections.Counter]] = None
+
+    def increment(self, field_name: str, key: str, amount: typing.Union[int, float] = 1):
+        """
+        Add to a counter of a JSON statistics field, like increment("shooting_stats", "missed").
+
+        The counter is updated right away on this object, and atomically in the database on the next save, so that
+        other commands saving the same player in the meantime don't overwrite each other's counts.
+        """
+        getattr(self, field_name)[key] += amount
+
+        if self._pending_increments is None:
+            self._pending_increments = collections.defaultdict(collections.Counter)
+        self._pending_increments[field_name][key] += amount
+
+    def _only_incremented(self, field_name: str, counters: collections.Counter) -> bool:
+        """
+        Whether the field was only changed through increment() since it was loaded.
+        """
+        default = self._meta.fields_map[field_name].default_factory()
+        expected = dict(self._db_values[field_name])
+        for key, amount in counters.items():
+            expected[key] = expected.get(key, default) + amount
+
+        current = getattr(self, field_name)
+        return current.keys() >= expected.keys() and all(
+            value == expected.get(key, default) for key, value in current.items()
+        )
+
+    def atomic_increments(self) -> typing.Dict[str, collections.Counter]:
+        """
+        The pending increments that can be written atomically. Fields that were changed otherwise (a prestige, a
+        reset...) are saved whole, increments included.
+        """
+        return {
+            field_name: counters
+            for field_name, counters in (self._pending_increments or {}).items()
+            if any(counters.values()) and self._only_incremented(field_name, counters)
+        }
+
+    @classmethod
+    def supports_bulk_increment(cls, using_db=None) -> bool:
+        connection = using_db or cls._choose_db(True)
+        return connection.capabilities.dialect in ("postgres", "sqlite")
+
+    async def _flush_increments(self, increments: typing.Dict[str, collections.Counter], using_db=None) -> bool:
+        return await type(self).bulk_increment([(self, increments)], using_db=using_db)
+
+    @classmethod
+    async def bulk_increment(
+            cls, players_increments: typing.List[typing.Tuple["Player", typing.Dict[str, collections.Counter]]],
+            using_db=None
+    ) -> bool:
+        """
+        Apply the increments of many players in the database in a single UPDATE, and reload the incremented fields from
+        what it returned. Returns False if the database can't do that, in which case the fields have to be saved as
+        usual.
+        """
+        connection = using_db or cls._choose_db(True)
+        if not cls.supports_bulk_increment(connection):
+            return False
+
+        if not players_increments:
+            return True
+
+        dialect = connection.capabilities.dialect
+
+        meta = cls._meta
+        field_names = sorted({field_name for _, increments in players_increments for field_name in increments})
+        columns = [meta.fields_db_projection[field_name] for field_name in field_names]
+        pk_column = meta.db_pk_column
+
+        # One row per player: its primary key, then the amounts to add to every field, as JSON objects.
+        values = []
+        rows = []
+        for player, increments in players_increments:
+            row = [player.pk] + [json.dumps(increments.get(field_name, {})) for field_name in field_names]
+            if dialect == "postgres":
+                placeholders = [f"${len(values) + 1}::bigint"]
+                placeholders += [f"${len(values) + index}::jsonb" for index in range(2, len(row) + 1)]
+            else:
+                placeholders = ["?"] * len(row)
+            values.extend(row)
+            rows.append(f"({', '.join(placeholders)})")
+
+        assignments = []
+        for index, column in enumerate(columns):
+            if dialect == "postgres":
+                assignments.append(
+                    f'"{column}" = COALESCE(p."{column}", \'{{}}\'::jsonb) || COALESCE('
+                    f'(SELECT jsonb_object_agg(d.key, COALESCE((p."{column}"->>d.key)::numeric, 0) + d.value::numeric) '
+                    f'FROM jsonb_each_text(v.amounts_{index}) AS d), \'{{}}\'::jsonb)'
+                )
+            else:
+                assignments.append(
+                    f'"{column}" = json_patch(COALESCE("{meta.db_table}"."{column}", \'{{}}\'), '
+                    f'(SELECT json_group_object(d.key, '
+                    f'COALESCE(json_extract("{meta.db_table}"."{column}", \'$."\' || d.key || \'"\'), 0) + d.value) '
+                    f'FROM json_each(v.column{index + 2}) AS d))'
+                )
+
+        if dialect == "postgres":
+            returning = ", ".join(f'p."{column}"' for column in [pk_column] + columns)
+            amounts = ", ".join(f"amounts_{index}" for index in range(len(columns)))
+            query = (
+                f'UPDATE "{meta.db_table}" AS p SET {", ".join(assignments)} '
+                f'FROM (VALUES {", ".join(rows)}) AS v(pk, {amounts}) '
+                f'WHERE p."{pk_column}" = v.pk RETURNING {returning}'
+            )
+        else:
+            returning = ", ".join(f'"{column}"' for column in [pk_column] + columns)
+            query = (
+                f'UPDATE "{meta.db_table}" SET {", ".join(assignments)} '
+                f'FROM (VALUES {", ".join(rows)}) AS v '
+                f'WHERE "{meta.db_table}"."{pk_column}" = v.column1 RETURNING {returning}'
+            )
+        _, returned_rows = await connection.execute_query(query, values)
+
+        returned = {row[pk_column]: row for row in returned_rows}
+        for player, increments in players_increments:
+            row = returned.get(player.pk)
+            if row is None:
+                continue
+
+            for field_name in increments:
+                value = meta.fields_map[field_name].to_python_value(row[meta.fields_db_projection[field_name]])
+                setattr(player, field_name, value)
+            player.remember_db_values(increments)
+
+            # Increments made while the UPDATE was running are written on the next save.
+            for field_name, counters in (player._pending_increments or {}).items():
+                if field_name in increments:
+                    value = getattr(player, field_name)
+                    for key, amount in counters.items():
+                        value[key] += amount
+        return True
+
+    async def save(self, using_db=None, update_fields=None, force_create=False, force_update=False):
+        if self._write_behind is not None and self._saved_in_db and update_fields is None and not force_create:
+            # Written later by the cache, with other players.
+            self._write_behind.mark_dirty(self)
+            return
+
+        increments = {}
+        if self._pending_increments and self._saved_in_db and self._db_values is not None and not force_create:
+            increments = self.atomic_increments()
+
+        pending, self._pending_increments = self._pending_increments, None
+        # Incremented fields (value, database value) before the increments were written, in case the save fails
+        previous = {}
+
+        try:
+            if increments:
+                previous = {name: (getattr(self, name), self._db_values[name]) for name in increments}
+                if using_db is None:
+                    # The increments and the other fields are saved together, or not at all.
+                    async with in_transaction() as connection:
+                        await self._save_incremented(increments, connection, update_fields, force_update)
+                else:
+                    await self._save_incremented(increments, using_db, update_fields, force_update)
+                return
+
+            await super().save(
+                using_db=using_db, update_fields=update_fields, force_create=force_create, force_update=force_update
+            )
+        except Exception:
+            for name, (value, db_value) in previous.items():
+                setattr(self, name, value)
+                self._db_values[name] = db_value
+
+            if pending:
+                # Keep the increments for the next save, with the ones made in the meantime.
+                for field_name, counters in (self._pending_increments or {}).items():
+                    pending[field_name].update(counters)
+                self._pending_increments = pending
+            raise
+
+    async def _save_incremented(
+            self, increments: typing.Dict[str, collections.Counter], using_db, update_fields, force_update: bool
+    ):
+        if await self._flush_increments(increments, using_db=using_db):
+            # Unless they were changed again by someone else, the incremented fields now match the database.
+            if update_fields is not None:
+                update_fields = [name for name in update_fields if name not in increments]
+                if not update_fields:
+                    return
+
+        await super().save(using_db=using_db, update_fields=update_fields, force_update=force_update)
+
+    @classmethod
+    async def fetch_or_create(cls, db_channel: DiscordChannel, db_member: "DiscordMember") -> "Player":
+        """
+        Get the player of a member on a channel, creating it if it doesn't exist yet, in a single query.
+        """
+        player = cls(channel=db_channel, member=db_member, user_discord_id=db_member.user_id)
+
+        connection = cls._choose_db(True)
+        dialect = connection.capabilities.dialect
+        if dialect not in ("postgres", "sqlite"):
+            existing = await cls.filter(channel_id=db_channel.discord_id, user_discord_id=db_member.user_id).first()
+            if existing is None:
+                await player.save()
+                return player
+            existing.channel = db_channel
+            existing.member = db_member
+            return existing
+
+        meta = cls._meta
+        columns = []
+        values = []
+        for name in meta.db_fields:
+            if name == meta.pk_attr:
+                continue
+            columns.append(f'"{meta.fields_db_projection[name]}"')
+            values.append(meta.fields_map[name].to_db_value(getattr(player, name), player))
+
+        table = meta.db_table
+        if dialect == "postgres":
+            # Rows inserted by a statement aren't visible to the rest of it, hence the union.
+            placeholders = ", ".join(f"${i}" for i in range(1, len(values) + 1))
+            query = (
+                f'WITH inserted AS (INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({placeholders}) '
+                f'ON CONFLICT ("channel_id", "user_discord_id") DO NOTHING RETURNING *) '
+                f"SELECT * FROM inserted UNION ALL "
+                f'SELECT * FROM "{table}" WHERE "channel_id" = ${len(values) + 1} '
+                f'AND "user_discord_id" = ${len(values) + 2} LIMIT 1'
+            )
+            values += [db_channel.discord_id, db_member.user_id]
+        else:
+            placeholders = ", ".join("?" for _ in values)
+            query = (
+                f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({placeholders}) '
+                f'ON CONFLICT ("channel_id", "user_discord_id") '
+                f'DO UPDATE SET "user_discord_id" = excluded."user_discord_id" RETURNING *'
+            )
+
+        _, rows = await connection.execute_query(query, values)
+        if rows:
+            player = cls._init_from_db(**dict(rows[0]))
+        else:
+            # Created by another process after the statement started.
+            player = await cls.get(channel_id=db_channel.discord_id, user_discord_id=db_member.user_id)
+
+        player.channel = db_channel
+        player.member = db_member
+        return player
+
+    async def delete(self, using_db=None):
+        if self._write_behind is not None:
+            self._write_behind.forget(self)
+        await super().delete(using_db=using_db)
+
     async def do_prestige(self, bot, kept_exp):
         """
         Reset a player data, persisting his/her ID. What's left to do is.
@@ -949,12 +1489,8 @@ class Player(Model):
             guild: discord.Guild = ctx.guild
 
             if isinstance(ctx, discord.TextChannel):
-                db_guild = await get_from_db(guild)
-                language_code = db_guild.language
-
-                def _(message):
-                    return translate(message, language_code)
-
+                language_code = await bot.get_guild_language(guild)
+                _ = get_language_translate_function(language_code)
             else:
                 _ = await ctx.get_translate_function()
                 bot = ctx.bot
@@ -1006,7 +1542,11 @@ class Player(Model):
                 e.title = _("You leveled down!")
                 e.color = discord.Colour.red()
 
-            asyncio.ensure_future(ctx.send(embed=e))
+            if isinstance(ctx, discord.TextChannel):
+                # Merged with the messages of the duck, when possible
+                bot.outbox.send(ctx, embed=e, priority=MessagePriority.LOW)
+            else:
+                asyncio.ensure_future(ctx.send(embed=e))
             asyncio.ensure_future(self.change_roles(bot))
 
     async def change_roles(self, bot):
@@ -1126,12 +1666,13 @@ class Player(Model):
 
     class Meta:
         table = "players"
+        unique_together = (("channel", "user_discord_id"),)
 
     def __repr__(self):
         return f"<Player member={self.member} channel={self.channel}>"
 
 
-class DiscordMember(Model):
+class DiscordMember(CachedEntityMixin, Model):
     landmines: fields.ReverseRelation["LandminesUserData"]
 
     id = fields.IntField(pk=True)
@@ -1148,6 +1689,9 @@ class DiscordMember(Model):
         enum_type=AccessLevel, default=AccessLevel.DEFAULT
     )
 
+    def entity_cache_key(self) -> EntityKey:
+        return DiscordMember, self.user_id, self.guild_id
+
     def get_access_level(self):
         override = self.user.access_level_override
         if override != AccessLevel.DEFAULT:
@@ -1380,23 +1924,76 @@ async def get_tag(name, increment_uses=True) -> typing.Optional[Tag]:
             return None
 
 
+def _entity_cache_key(discord_object, as_user=False) -> typing.Optional[EntityKey]:
+    if isinstance(discord_object, discord.Guild):
+        return DiscordGuild, discord_object.id
+    elif isinstance(discord_object, (discord.TextChannel, discord.VoiceChannel)):
+        return DiscordChannel, discord_object.id
+    elif isinstance(discord_object, discord.Member) and not as_user:
+        return DiscordMember, discord_object.id, discord_object.guild.id
+    elif isinstance(discord_object, (discord.User, discord.ClientUser, discord.Member)):
+        return DiscordUser, discord_object.id
+    else:
+        return None
+
+
+def _sync_names(key: EntityKey, db_obj, discord_object):
+    """
+    Update the names of the object if they changed on Discord. They are written to the database later, in batches.
+    """
+    if isinstance(db_obj, DiscordUser):
+        if (
+            discord_object.name != db_obj.name
+            or discord_object.discriminator != db_obj.discriminator
+        ):
+            db_obj.name = discord_object.name
+            db_obj.discriminator = discord_object.discriminator
+            ENTITIES_CACHE.sync_names(key, db_obj, ("name", "discriminator"))
+    elif isinstance(db_obj, (DiscordGuild, DiscordChannel)):
+        if discord_object.name != db_obj.name:
+            db_obj.name = discord_object.name
+            ENTITIES_CACHE.sync_names(key, db_obj, ("name",))
+
+
 async def get_from_db(discord_object, as_user=False):
-    async with DB_LOCKS[(discord_object, as_user)]:
-        if isinstance(discord_object, discord.Guild):
+    if isinstance(discord_object, discord.Thread):
+        return await get_from_db(discord_object.parent)
+
+    key = _entity_cache_key(discord_object, as_user)
+    if key is None:
+        obj_type_name = type(discord_object).__name__
+        print(
+            f"Unknown object type passed to get_from_db <type:{obj_type_name}>, <obj:{discord_object}>"
+        )
+        return None
+
+    db_obj = ENTITIES_CACHE.get(key)
+    if db_obj is not None:
+        if key[0] is DiscordMember:
+            # The guild or the user may have been dropped from the cache since (expired, saved by another worker...).
+            # Access levels are read from them, so share the current ones.
+            if ENTITIES_CACHE.peek((DiscordGuild, discord_object.guild.id)) is not db_obj.guild:
+                db_obj.guild = await get_from_db(discord_object.guild)
+            if ENTITIES_CACHE.peek((DiscordUser, discord_object.id)) is not db_obj.user:
+                db_obj.user = await get_from_db(discord_object, as_user=True)
+
+        _sync_names(key, db_obj, discord_object)
+        return db_obj
+
+    async with DB_LOCKS.hold("entities", key):
+        # Another call may have loaded it while we were waiting for the lock.
+        db_obj = ENTITIES_CACHE.peek(key)
+        if db_obj is not None:
+            return db_obj
+
+        if key[0] is DiscordGuild:
             db_obj = await DiscordGuild.filter(discord_id=discord_object.id).first()
             if not db_obj:
                 db_obj = DiscordGuild(
                     discord_id=discord_object.id, name=discord_object.name
                 )
                 await db_obj.save()
-            if discord_object.name != db_obj.name:
-                db_obj.name = discord_object.name
-                await db_obj.save()
-
-            return db_obj
-        elif isinstance(discord_object, discord.TextChannel) or isinstance(
-            discord_object, discord.VoiceChannel
-        ):
+        elif key[0] is DiscordChannel:
             db_obj = await DiscordChannel.filter(discord_id=discord_object.id).first()
             if not db_obj:
                 db_obj = DiscordChannel(
@@ -1405,33 +2002,21 @@ async def get_from_db(discord_object, as_user=False):
                     guild=await get_from_db(discord_object.guild),
                 )
                 await db_obj.save()
-
-            if discord_object.name != db_obj.name:
-                db_obj.name = discord_object.name
-                await db_obj.save()
-
-            return db_obj
-        elif isinstance(discord_object, discord.Member) and not as_user:
-            db_obj = (
-                await DiscordMember.filter(
-                    user__discord_id=discord_object.id,
-                    guild__discord_id=discord_object.guild.id,
-                )
-                .first()
-                .prefetch_related("user", "guild")
-            )
+        elif key[0] is DiscordMember:
+            db_guild = await get_from_db(discord_object.guild)
+            db_user = await get_from_db(discord_object, as_user=True)
+            db_obj = await DiscordMember.filter(
+                user__discord_id=discord_object.id,
+                guild__discord_id=discord_object.guild.id,
+            ).first()
             if not db_obj:
-                db_obj = DiscordMember(
-                    guild=await get_from_db(discord_object.guild),
-                    user=await get_from_db(discord_object, as_user=True),
-                )
+                db_obj = DiscordMember(guild=db_guild, user=db_user)
                 await db_obj.save()
-            return db_obj
-        elif (
-            isinstance(discord_object, discord.User)
-            or isinstance(discord_object, discord.ClientUser)
-            or (isinstance(discord_object, discord.Member) and as_user)
-        ):
+            else:
+                # Share the cached guild and user, instead of copies of them.
+                db_obj.guild = db_guild
+                db_obj.user = db_user
+        else:
             db_obj = await DiscordUser.filter(discord_id=discord_object.id).first()
             if not db_obj:
                 db_obj = DiscordUser(
@@ -1441,22 +2026,9 @@ async def get_from_db(discord_object, as_user=False):
                 )
                 await db_obj.save()
 
-            if (
-                discord_object.name != db_obj.name
-                or discord_object.discriminator != db_obj.discriminator
-            ):
-                db_obj.name = discord_object.name
-                db_obj.discriminator = discord_object.discriminator
-                await db_obj.save()
-
-            return db_obj
-        elif isinstance(discord_object, discord.Thread):
-            return await get_from_db(discord_object.parent)
-        else:
-            obj_type_name = type(discord_object).__name__
-            print(
-                f"Unknown object type passed to get_from_db <type:{obj_type_name}>, <obj:{discord_object}>"
-            )
+        _sync_names(key, db_obj, discord_object)
+        ENTITIES_CACHE.put(key, db_obj)
+        return db_obj
 
 
 async def get_random_player(channel: typing.Union[DiscordChannel, discord.TextChannel]):
@@ -1465,29 +2037,42 @@ async def get_random_player(channel: typing.Union[DiscordChannel, discord.TextCh
     else:
         db_channel = channel
 
-    return random.choice(
+    db_player = random.choice(
         await Player.filter(channel=db_channel).prefetch_related("member__user")
     )
 
+    cache = Player.write_behind_cache
+    if cache is not None:
+        # Use the cached object if the player is cached, so that changes aren't made to a copy.
+        db_player = await cache.add(db_player)
+
+    return db_player
+
 
 async def get_player(
     member: discord.Member, channel: discord.TextChannel, giveback=False
 ):
-    async with DB_LOCKS[(member, channel)]:
-        db_obj = (
-            await Player.filter(
-                member__user__discord_id=member.id, channel__discord_id=channel.id
-            )
-            .prefetch_related("member__user")
-            .first()
-        )
-        if not db_obj:
-            db_obj = Player(
-                channel=await get_from_db(channel),
-                member=await get_from_db(member, as_user=False),
+    cache = Player.write_behind_cache
+    if cache is not None:
+        db_obj = cache.get((member.id, channel.id))
+        if db_obj is not None:
+            if giveback:
+                await db_obj.maybe_giveback()
+            return db_obj
+
+    async with DB_LOCKS.hold("players", (member.id, channel.id)):
+        # Another command may have cached the player while we were waiting for the lock.
+        db_obj = cache.players.get((member.id, channel.id)) if cache is not None else None
+        if db_obj is None:
+            # The channel and the member are usually cached, leaving a single query.
+            db_obj = await Player.fetch_or_create(
+                await get_from_db(channel), await get_from_db(member, as_user=False)
             )
-            await db_obj.save()
-        elif giveback:
+
+            if cache is not None:
+                db_obj = await cache.add(db_obj)
+
+        if giveback:
             await db_obj.maybe_giveback()
 
         return db_obj
@@ -1501,7 +2086,7 @@ async def get_user_inventory(
     else:
         db_user = user
 
-    async with DB_LOCKS[(db_user,)]:
+    async with DB_LOCKS.hold("inventories", db_user.discord_id):
         inventory, created = await UserInventory.get_or_create(
             user_id=db_user.discord_id
         )
@@ -1517,7 +2102,7 @@ async def get_member_landminesdata(
     else:
         db_member = member
 
-    async with DB_LOCKS[(db_member,)]:
+    async with DB_LOCKS.hold("landmines", db_member.pk):
         eventdata, created = await LandminesUserData.get_or_create(
             member_id=db_member.pk
         )
@@ -1559,6 +2144,40 @@ async def get_enabled_channels():
     return await DiscordChannel.filter(enabled=True).all()
 
 
+async def disable_channels(
+    discord_ids: typing.Iterable[int], skip_discord_ids: typing.Iterable[int] = ()
+) -> int:
+    """
+    Disable many channels with a single UPDATE query, leaving alone the channels in skip_discord_ids.
+
+    Returns the number of channels that were disabled.
+    """
+    discord_ids = set(discord_ids) - set(skip_discord_ids)
+    if not discord_ids:
+        return 0
+
+    for discord_id in discord_ids:
+        ENTITIES_CACHE.invalidate((DiscordChannel, discord_id))
+
+    return await DiscordChannel.filter(discord_id__in=discord_ids, enabled=True).update(
+        enabled=False
+    )
+
+
+async def get_channels_with_guilds(discord_ids: typing.Iterable[int]) -> typing.Dict[int, "DiscordChannel"]:
+    """
+    Fetch many channels and their guilds at once (one query each), returning a discord_id -> DiscordChannel mapping.
+
+    Unlike get_from_db, this doesn't create missing channels.
+    """
+    discord_ids = set(discord_ids)
+    if not discord_ids:
+        return {}
+
+    db_channels = await DiscordChannel.filter(discord_id__in=discord_ids).prefetch_related("guild")
+    return {db_channel.discord_id: db_channel for db_channel in db_channels}
+
+
 async def init_db_connection(config, create_dbs=False):
     tortoise_config = {
         "connections": {
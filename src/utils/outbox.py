@@ -0,0 +1,276 @@
+"""
+Buffer of the messages the bot sends on hunting channels, merging the ones produced together.
+
+A kill can send the kill message, then the bushes loot, then a level up embed. Messages queued on a channel within a
+short window are merged into as few API calls as possible: consecutive messages going to the same destination (the
+same webhook, with the same name and avatar, or the channel itself) become a single message, as long as it stays under
+Discord limits. Messages that can't be merged are sent separately. Either way, they are sent in the order they were
+queued, through the bot SendScheduler.
+"""
+import asyncio
+import collections
+import functools
+import typing
+
+import discord
+
+from utils.send_scheduler import MessagePriority, SendScheduler
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+
+COALESCE_WINDOW = 0.25
+
+# Discord limits for a single message
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_EMBEDS_LENGTH = 6000
+
+
+class OutboundMessage:
+    __slots__ = ("webhook", "webhook_parameters", "content", "embeds", "kwargs", "priority", "future")
+
+    def __init__(
+        self,
+        content: typing.Optional[str],
+        embeds: typing.List[discord.Embed],
+        kwargs: dict,
+        webhook: typing.Optional[discord.Webhook] = None,
+        webhook_parameters: typing.Optional[dict] = None,
+        priority: MessagePriority = MessagePriority.NORMAL,
+    ):
+        self.content = content
+        self.embeds = embeds
+        # Anything else than content and embeds (files, views, ...), which prevents merging
+        self.kwargs = kwargs
+        self.webhook = webhook
+        self.webhook_parameters = webhook_parameters or {}
+        self.priority = priority
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def same_destination(self, other: "OutboundMessage") -> bool:
+        if self.webhook is None or other.webhook is None:
+            return self.webhook is other.webhook
+
+        return self.webhook.url == other.webhook.url and self.webhook_parameters == other.webhook_parameters
+
+
+class MergedMessage:
+    """
+    Consecutive outbound messages sent as a single one.
+    """
+
+    __slots__ = ("messages", "contents", "content_length", "embeds", "embeds_length", "priority")
+
+    def __init__(self, message: OutboundMessage):
+        self.messages = [message]
+        self.contents = [message.content] if message.content else []
+        self.content_length = len(message.content) if message.content else 0
+        self.embeds = list(message.embeds)
+        self.embeds_length = sum(len(embed) for embed in message.embeds)
+        self.priority = message.priority
+
+    @property
+    def first(self) -> OutboundMessage:
+        return self.messages[0]
+
+    @property
+    def content(self) -> typing.Optional[str]:
+        return "\n".join(self.contents) if self.contents else None
+
+    def add(self, message: OutboundMessage) -> bool:
+        """
+        Merge a message if possible. Returns False if it has to be sent separately.
+        """
+        first = self.first
+        if first.kwargs or message.kwargs or not first.same_destination(message):
+            return False
+
+        if message.content and self.embeds:
+            # The content would be displayed above the embeds queued before it.
+            return False
+
+        content_length = self.content_length
+        if message.content:
+            content_length += len(message.content) + (1 if self.contents else 0)
+
+        embeds_length = self.embeds_length + sum(len(embed) for embed in message.embeds)
+
+        if (
+            content_length > MAX_CONTENT_LENGTH
+            or len(self.embeds) + len(message.embeds) > MAX_EMBEDS
+            or embeds_length > MAX_EMBEDS_LENGTH
+        ):
+            return False
+
+        self.messages.append(message)
+        if message.content:
+            self.contents.append(message.content)
+        self.content_length = content_length
+        self.embeds.extend(message.embeds)
+        self.embeds_length = embeds_length
+        self.priority = min(self.priority, message.priority)
+        return True
+
+
+def _consume_exception(future: asyncio.Future):
+    # Failures are reported to whoever awaits the future. Those who don't care shouldn't get "exception was never
+    # retrieved" warnings.
+    if not future.cancelled():
+        future.exception()
+
+
+def _wake_up(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ChannelOutbox:
+    def __init__(self, outbox: "Outbox", channel: discord.abc.Messageable):
+        self.outbox = outbox
+        self.channel = channel
+        self.queue: collections.deque[OutboundMessage] = collections.deque()
+        self.task: typing.Optional[asyncio.Task] = None
+        self.wakeup: typing.Optional[asyncio.Future] = None
+
+    def push(self, message: OutboundMessage):
+        self.queue.append(message)
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def take_merged(self) -> MergedMessage:
+        merged = MergedMessage(self.queue.popleft())
+        while self.queue and merged.add(self.queue[0]):
+            self.queue.popleft()
+
+        return merged
+
+    async def wait_window(self):
+        """
+        Wait for other messages to be queued, unless the outbox is flushed in the meantime.
+        """
+        loop = asyncio.get_running_loop()
+        self.wakeup = loop.create_future()
+        handle = loop.call_later(self.outbox.window, _wake_up, self.wakeup)
+        try:
+            await self.wakeup
+        finally:
+            handle.cancel()
+            self.wakeup = None
+
+    async def run(self):
+        try:
+            if self.outbox.window:
+                await self.wait_window()
+
+            while self.queue:
+                # Messages queued while the previous one was being sent are merged too.
+                await self.deliver(self.take_merged())
+        except asyncio.CancelledError:
+            while self.queue:
+                self.queue.popleft().future.cancel()
+            raise
+        finally:
+            self.task = None
+            self.outbox.channels.pop(self.channel.id, None)
+
+    async def deliver(self, merged: MergedMessage):
+        first = merged.first
+        kwargs = dict(first.kwargs)
+        if merged.embeds:
+            kwargs["embeds"] = merged.embeds
+
+        self.outbox.stats["api_calls"] += 1
+        self.outbox.stats["merged_messages"] += len(merged.messages) - 1
+
+        if first.webhook:
+            route = ("webhooks", first.webhook.id)
+            send = functools.partial(first.webhook.send, merged.content, **first.webhook_parameters, **kwargs)
+        else:
+            route = ("channels", self.channel.id)
+            send = functools.partial(self.channel.send, merged.content, **kwargs)
+
+        try:
+            if self.outbox.scheduler:
+                await self.outbox.scheduler.send(route, merged.priority, send)
+            else:
+                await send()
+        except asyncio.CancelledError:
+            for message in merged.messages:
+                message.future.cancel()
+            raise
+        except Exception as e:
+            self.outbox.stats["failed_api_calls"] += 1
+            for message in merged.messages:
+                if not message.future.done():
+                    message.future.set_exception(e)
+        else:
+            for message in merged.messages:
+                if not message.future.done():
+                    message.future.set_result(None)
+
+
+class Outbox:
+    def __init__(self, bot: "MyBot", scheduler: typing.Optional[SendScheduler] = None):
+        self.bot = bot
+        self.scheduler = scheduler
+        self.window = COALESCE_WINDOW
+        # Channel ID -> outbox of the channel, while it has messages to send
+        self.channels: typing.Dict[int, ChannelOutbox] = {}
+        self.stats = collections.Counter()
+
+    def send(
+        self,
+        channel: discord.abc.Messageable,
+        content: typing.Optional[str] = None,
+        *,
+        webhook: typing.Optional[discord.Webhook] = None,
+        webhook_parameters: typing.Optional[dict] = None,
+        priority: MessagePriority = MessagePriority.NORMAL,
+        **kwargs,
+    ) -> asyncio.Future:
+        """
+        Queue a message on a channel, optionally through one of its webhooks. The returned future is done once the
+        message is sent, with the exception raised when sending it if it failed.
+
+        Messages merged together are sent with the highest of their priorities.
+        """
+        embeds = list(kwargs.pop("embeds", None) or [])
+        embed = kwargs.pop("embed", None)
+        if embed is not None:
+            embeds.append(embed)
+
+        message = OutboundMessage(
+            content, embeds, kwargs, webhook=webhook, webhook_parameters=webhook_parameters, priority=priority
+        )
+        message.future.add_done_callback(_consume_exception)
+        self.stats["messages"] += 1
+
+        channel_outbox = self.channels.get(channel.id)
+        if channel_outbox is None:
+            channel_outbox = self.channels[channel.id] = ChannelOutbox(self, channel)
+
+        channel_outbox.push(message)
+        return message.future
+
+    @property
+    def pending(self) -> int:
+        return sum(len(channel_outbox.queue) for channel_outbox in self.channels.values())
+
+    async def flush(self):
+        """
+        Send everything that is queued right away, for instance before closing the bot.
+        """
+        window, self.window = self.window, 0
+        try:
+            tasks = []
+            for channel_outbox in self.channels.values():
+                if channel_outbox.wakeup is not None:
+                    _wake_up(channel_outbox.wakeup)
+                if channel_outbox.task is not None:
+                    tasks.append(channel_outbox.task)
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.window = window
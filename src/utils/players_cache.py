@@ -0,0 +1,220 @@
+"""
+Opt-in write-behind cache of the players currently hunting.
+
+Hunters shoot, reload and buy things in quick succession, and every command loads its Player from the database and
+saves it before answering. With the cache enabled, the players used recently stay in memory, keyed by (member,
+channel): get_player returns the same object to every command, and Player.save() only marks it dirty. Dirty players
+are written in batched multi-row UPDATEs every `flush_interval` seconds, when they are evicted to keep the cache under
+`max_size` players, and when the bot closes.
+
+While a player is cached, this process owns its row, but for the counters changed with Player.increment: those are added
+to the database values when written, so that other workers or the API updating the same player don't lose counts.
+Queries reading players straight from the database (leaderboards, the API) can be up to `flush_interval` seconds
+behind, and anything deleting players has to forget them first.
+"""
+import asyncio
+import collections
+import typing
+
+from tortoise.transactions import in_transaction
+
+from utils.models import Player
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+
+# (user ID, channel ID)
+PlayerKey = typing.Tuple[int, int]
+
+
+def player_key(player: Player) -> PlayerKey:
+    return player.member.user_id, player.channel_id
+
+
+class PlayersCache:
+    def __init__(self, bot: "MyBot", max_size: int = 10000, flush_interval: float = 0.5, batch_size: int = 500):
+        self.bot = bot
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # Least recently used first
+        self.players: collections.OrderedDict[PlayerKey, Player] = collections.OrderedDict()
+        self.dirty: typing.Dict[PlayerKey, Player] = {}
+
+        self._lock = asyncio.Lock()
+        self._task: typing.Optional[asyncio.Task] = None
+        self.stats = collections.Counter()
+
+    # Cache #
+
+    def get(self, key: PlayerKey) -> typing.Optional[Player]:
+        player = self.players.get(key)
+        if player is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        self.players.move_to_end(key)
+        return player
+
+    async def add(self, player: Player) -> Player:
+        """
+        Cache a player loaded from the database. If it was cached in the meantime, the cached object is returned
+        instead, so that there is only ever one object per player.
+        """
+        key = player_key(player)
+        cached = self.players.get(key)
+        if cached is not None:
+            self.players.move_to_end(key)
+            return cached
+
+        player._write_behind = self
+        self.players[key] = player
+
+        evicted = []
+        while len(self.players) > self.max_size:
+            _, old_player = self.players.popitem(last=False)
+            old_player._write_behind = None
+            self.stats["evictions"] += 1
+            if self.dirty.pop(player_key(old_player), None) is not None:
+                evicted.append(old_player)
+
+        if evicted:
+            await self._write(evicted)
+
+        return player
+
+    def forget(self, player: Player):
+        """
+        Stop caching a player, without writing its pending changes.
+        """
+        key = player_key(player)
+        self.dirty.pop(key, None)
+        cached = self.players.pop(key, None)
+        if cached is not None:
+            cached._write_behind = None
+
+    def forget_channel(self, channel_id: int):
+        for key, player in list(self.players.items()):
+            if key[1] == channel_id:
+                self.forget(player)
+
+    # Writing #
+
+    def mark_dirty(self, player: Player):
+        self.dirty[player_key(player)] = player
+        self.stats["deferred_saves"] += 1
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                self.bot.logger.exception("Couldn't write the cached players, will retry.")
+
+    async def flush(self):
+        async with self._lock:
+            if not self.dirty:
+                return
+
+            players = list(self.dirty.values())
+            self.dirty.clear()
+            await self._write(players)
+
+    async def _write(self, players: typing.List[Player]):
+        """
+        Write the players in a single transaction. Counters that were only incremented are added to the database
+        values, with one UPDATE per batch of players, so that other workers or the API writing the same players don't
+        lose each other's counts. The other changed fields are written whole, with one UPDATE per batch of players
+        having changed the same fields.
+        """
+        atomic = Player.supports_bulk_increment()
+
+        # Changed fields -> players
+        changed_players: typing.DefaultDict[typing.Tuple[str, ...], typing.List[Player]] = collections.defaultdict(list)
+        incremented = []
+        previous = []
+        for player in players:
+            increments = player.atomic_increments() if atomic else {}
+            changed = tuple(name for name in player.changed_fields() if name not in increments)
+
+            previous.append((
+                player,
+                dict(player._db_values),
+                player._pending_increments,
+                {name: getattr(player, name) for name in increments},
+            ))
+            player._pending_increments = None
+            player.remember_db_values(changed)
+
+            if changed:
+                changed_players[changed].append(player)
+            if increments:
+                incremented.append((player, increments))
+
+        if not changed_players and not incremented:
+            return
+
+        writes = 0
+        try:
+            async with in_transaction() as connection:
+                for fields, fields_players in changed_players.items():
+                    await Player.bulk_update(fields_players, fields, batch_size=self.batch_size, using_db=connection)
+                    writes += -(-len(fields_players) // self.batch_size)
+
+                for start in range(0, len(incremented), self.batch_size):
+                    await Player.bulk_increment(incremented[start:start + self.batch_size], using_db=connection)
+                    writes += 1
+        except Exception:
+            for player, db_values, increments, values in previous:
+                player._db_values = db_values
+                for name, value in values.items():
+                    setattr(player, name, value)
+
+                if increments:
+                    # Keep the increments for the next write, with the ones made in the meantime.
+                    for field_name, counters in (player._pending_increments or {}).items():
+                        increments[field_name].update(counters)
+                    player._pending_increments = increments
+
+                if player._write_behind is self:
+                    self.dirty.setdefault(player_key(player), player)
+            self.stats["failed_writes"] += 1
+            raise
+
+        self.stats["writes"] += writes
+        self.stats["written_players"] += len(players)
+        self.stats["incremented_players"] += len(incremented)
+
+    async def close(self):
+        """
+        Write everything that is pending, and stop caching players. Saves are done right away again afterwards.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        await self.flush()
+
+        for player in self.players.values():
+            player._write_behind = None
+        self.players.clear()
+        if Player.write_behind_cache is self:
+            Player.write_behind_cache = None
+
+    # Metrics #
+
+    def summary(self) -> dict:
+        return {
+            "cached_players": len(self.players),
+            "max_size": self.max_size,
+            "dirty_players": len(self.dirty),
+            "flush_interval": self.flush_interval,
+            "stats": dict(self.stats),
+        }
@@ -0,0 +1,234 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import typing
+
+import numpy as np
+
+from utils.models import SunState, plan_spawns
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+    from utils.ducks import Duck
+    from utils.models import DucksLeft
+
+
+class SpawnScheduler:
+    """
+    This class stores every duck spawn planned for the day, ordered by timestamp.
+
+    Spawn times are drawn once per channel when the channel is planned, so the spawning loop only has to look at the
+    spawns that are due instead of rolling dice for every channel every second.
+
+    The daily planification is kept in sorted arrays, while channels planned during the day go to a small heap.
+    """
+
+    def __init__(self):
+        self._heap: typing.List[typing.Tuple[int, int, "DucksLeft", SunState]] = []
+        self._counter = itertools.count()
+
+        self._planned_ducks_lefts: typing.List["DucksLeft"] = []
+        self._planned_timestamps = np.empty(0, dtype=np.int64)
+        self._planned_indexes = np.empty(0, dtype=np.int64)
+        self._planned_sun_states = np.empty(0, dtype=np.int64)
+        self._position = 0
+
+    def __len__(self):
+        return len(self._planned_timestamps) - self._position + len(self._heap)
+
+    def plan(self, ducks_left: "DucksLeft", now: int = None):
+        """
+        Push the spawns of a single channel in the schedule.
+        """
+        for timestamp, sun in ducks_left.get_planned_spawns(now):
+            heapq.heappush(self._heap, (timestamp, next(self._counter), ducks_left, sun))
+
+    def rebuild(self, ducks_lefts: typing.Iterable["DucksLeft"], now: int = None):
+        """
+        Replace the whole schedule with the spawns of the given channels, drawing all the spawn times at once.
+        """
+        ducks_lefts = list(ducks_lefts)
+        timestamps, indexes, sun_states = plan_spawns(ducks_lefts, now)
+        order = np.argsort(timestamps, kind="stable")
+
+        self._heap = []
+        self._planned_ducks_lefts = ducks_lefts
+        self._planned_timestamps = timestamps[order]
+        self._planned_indexes = indexes[order]
+        self._planned_sun_states = sun_states[order]
+        self._position = 0
+
+    def pop_due(self, now: int) -> typing.Iterator[typing.Tuple["DucksLeft", SunState]]:
+        """
+        Yield (and remove) every spawn planned at or before `now`.
+
+        Entries are never removed when a channel is replanned or disabled, so callers must check that the DucksLeft
+        they get is still the one used by the channel.
+        """
+        due = int(np.searchsorted(self._planned_timestamps, now, side="right"))
+        while self._position < due:
+            position = self._position
+            self._position += 1
+            yield (
+                self._planned_ducks_lefts[self._planned_indexes[position]],
+                SunState(self._planned_sun_states[position]),
+            )
+
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timestamp, _, ducks_left, sun = heapq.heappop(heap)
+            yield ducks_left, sun
+
+
+class DuckExpiryQueue:
+    """
+    This class stores every spawned duck, ordered by the time at which they should leave the channel.
+
+    Ducks are kept in one heap per shard, so that every shard can make its own ducks leave.
+
+    Ducks are never removed from the queue when they are killed or rescheduled. Instead, entries are ignored when
+    popped if the duck isn't on the channel anymore, or if its expiry time changed.
+    """
+
+    def __init__(self, bot: "MyBot"):
+        self.bot = bot
+        self._heaps: typing.DefaultDict[int, typing.List[typing.Tuple[float, int, "Duck"]]] = collections.defaultdict(
+            list
+        )
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def shard_ids(self) -> typing.List[int]:
+        """
+        The shards that still have ducks waiting to leave.
+        """
+        return [shard_id for shard_id, heap in self._heaps.items() if heap]
+
+    def push(self, duck: "Duck"):
+        heapq.heappush(self._heaps[duck.channel.guild.shard_id], (duck.expires_at, next(self._counter), duck))
+
+    def pop_expired(self, now: float, shard_id: int) -> typing.Iterator["Duck"]:
+        """
+        Yield (and remove) every duck of the shard still on a channel whose time to live is over, oldest first.
+        """
+        heap = self._heaps[shard_id]
+        while heap and heap[0][0] <= now:
+            expires_at, _, duck = heapq.heappop(heap)
+            if duck.expires_at != expires_at:
+                # Despawned, or rescheduled with another time to live.
+                continue
+
+            if duck not in self.bot.ducks_spawned.get(duck.channel, ()):
+                # Removed from the channel without despawning (kamikaze, ducks clear, ...).
+                continue
+
+            yield duck
+
+
+class DispatchQueue:
+    """
+    This class spreads outbound actions (ducks spawning and leaving) over time, to stay under the rate limits.
+
+    The budget is a token bucket refilled by `rate` tokens per second, holding at most `burst` tokens. Each action costs
+    a token. Actions over budget are deferred to the next ticks instead of being dropped, and guilds are served in a
+    round-robin fashion so that channels late in the planning aren't always the ones waiting.
+    """
+
+    def __init__(self, rate: float = 20, burst: float = None):
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._last_refill: typing.Optional[float] = None
+
+        # Guild ID -> deque of (enqueued_at, action). The order of the keys is the round-robin order.
+        self._queues: typing.OrderedDict[int, typing.Deque[typing.Tuple[float, typing.Any]]] = collections.OrderedDict()
+        self._depth = 0
+
+        self.dispatched = 0
+        self.deferred = 0
+        self.total_deferral = 0.0
+        self.max_deferral = 0.0
+
+    def __len__(self):
+        return self._depth
+
+    @property
+    def guilds_waiting(self) -> int:
+        return len(self._queues)
+
+    @property
+    def oldest_enqueued_at(self) -> typing.Optional[float]:
+        return min((queue[0][0] for queue in self._queues.values()), default=None)
+
+    @property
+    def mean_deferral(self) -> float:
+        if not self.deferred:
+            return 0.0
+        return self.total_deferral / self.deferred
+
+    def push(self, guild_id: int, action: typing.Any, now: float):
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = collections.deque()
+
+        queue.append((now, action))
+        self._depth += 1
+
+    def _refill(self, now: float):
+        if self._last_refill is not None:
+            elapsed = max(0.0, now - self._last_refill)
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def pop_ready(self, now: float) -> typing.Iterator[typing.Any]:
+        """
+        Yield (and remove) as many actions as the budget allows, taking one action per guild in turn.
+        """
+        self._refill(now)
+
+        queues = self._queues
+        while queues and self._tokens >= 1:
+            guild_id, queue = next(iter(queues.items()))
+            enqueued_at, action = queue.popleft()
+
+            if queue:
+                queues.move_to_end(guild_id)
+            else:
+                del queues[guild_id]
+
+            self._tokens -= 1
+            self._depth -= 1
+            self.dispatched += 1
+
+            deferral = now - enqueued_at
+            if deferral > 0:
+                self.deferred += 1
+                self.total_deferral += deferral
+                self.max_deferral = max(self.max_deferral, deferral)
+
+            yield action
+
+    def reset_stats(self):
+        self.dispatched = 0
+        self.deferred = 0
+        self.total_deferral = 0.0
+        self.max_deferral = 0.0
+
+
+class ShardPartition:
+    """
+    The ducks spawning state of a single shard: its planned spawns, its outbound budget, and the task running its loop.
+
+    Keeping shards apart means a shard that is slow or reconnecting only delays its own ducks.
+    """
+
+    def __init__(self, shard_id: int, dispatch_rate: float, dispatch_burst: float = None):
+        self.shard_id = shard_id
+        self.spawn_scheduler = SpawnScheduler()
+        self.dispatch_queue = DispatchQueue(rate=dispatch_rate, burst=dispatch_burst)
+        self.paused = False
+        self.task: typing.Optional[asyncio.Task] = None
@@ -0,0 +1,325 @@
+"""
+Central scheduler for the messages the bot sends on hunting channels.
+
+Discord rate limits messages per channel and per webhook. The scheduler reads the rate limit headers of every response
+(through an aiohttp trace, on both the discord.py session and the webhooks session) to know when each route can send
+again, bounds the number of requests in flight, and starts the most important messages first: hunters are waiting for
+spawns and kills, not so much for ducks leaving or for bushes loot.
+"""
+import asyncio
+import collections
+import heapq
+import itertools
+import re
+import time
+import typing
+from enum import IntEnum
+
+import aiohttp
+
+from utils.timings import LatencyHistogram
+
+if typing.TYPE_CHECKING:
+    # Prevent circular imports
+    from utils.bot_class import MyBot
+
+# ("channels" or "webhooks", ID)
+Route = typing.Tuple[str, int]
+
+MESSAGE_ROUTE_RE = re.compile(r"/(channels)/(\d+)/messages$|/(webhooks)/(\d+)/[^/]+$")
+
+# Past that many known buckets, the ones that are reset are forgotten.
+MAX_BUCKETS = 10000
+
+
+class MessagePriority(IntEnum):
+    # Spawns and kills, that hunters are waiting for
+    HIGH = 0
+    NORMAL = 1
+    # Leaves, bushes loot, level ups
+    LOW = 2
+
+
+class RouteBucket:
+    """
+    Rate limit of a route, as last reported by Discord.
+    """
+
+    __slots__ = ("limit", "remaining", "reset_at")
+
+    def __init__(self):
+        self.limit: typing.Optional[int] = None
+        self.remaining = 1
+        self.reset_at = 0.0
+
+    def delay(self, now: float) -> float:
+        """
+        How long to wait before sending on this route.
+        """
+        if self.remaining > 0 or now >= self.reset_at:
+            return 0.0
+
+        return self.reset_at - now
+
+    def acquire(self, now: float):
+        if now >= self.reset_at:
+            # The bucket was reset since the last response we saw
+            self.remaining = self.limit or 1
+        self.remaining -= 1
+
+    def update(self, limit: typing.Optional[int], remaining: int, reset_after: float, now: float):
+        if limit is not None:
+            self.limit = limit
+        self.remaining = remaining
+        self.reset_at = now + reset_after
+
+
+class SendJob:
+    __slots__ = ("route", "priority", "send", "future", "queued_at")
+
+    def __init__(self, route: Route, priority: MessagePriority, send: typing.Callable[[], typing.Awaitable]):
+        self.route = route
+        self.priority = priority
+        self.send = send
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class SendScheduler:
+    def __init__(self, bot: "MyBot", max_in_flight: int = 50):
+        self.bot = bot
+        self.max_in_flight = max_in_flight
+
+        self.buckets: typing.Dict[Route, RouteBucket] = {}
+        self.global_reset_at = 0.0
+
+        # (priority, sequence, job): jobs of the same priority are started in order
+        self._queue: typing.List[typing.Tuple[int, int, SendJob]] = []
+        self._sequence = itertools.count()
+        # Jobs waiting for their rate limited route, in the order they'll be sent. Only the first one of a route is put
+        # back in the queue when the route is available again, and the next one once it's started.
+        self._held: typing.Dict[Route, typing.Deque[typing.Tuple[int, int, SendJob]]] = {}
+        self._released: typing.Dict[Route, SendJob] = {}
+        # (time, route): when to check if a route with held jobs is available again
+        self._release_at: typing.List[typing.Tuple[float, Route]] = []
+        self._in_flight = 0
+        self._running: typing.Set[asyncio.Task] = set()
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._task: typing.Optional[asyncio.Task] = None
+
+        self.stats = collections.Counter()
+        self.waits: typing.Dict[MessagePriority, LatencyHistogram] = {
+            priority: LatencyHistogram() for priority in MessagePriority
+        }
+
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_end.append(self._on_request_end)
+
+    # Sending #
+
+    async def send(self, route: Route, priority: MessagePriority, send: typing.Callable[[], typing.Awaitable]):
+        """
+        Call send once the route isn't rate limited anymore and more important messages are started, and return its
+        result.
+        """
+        job = SendJob(route, priority, send)
+        heapq.heappush(self._queue, (priority, next(self._sequence), job))
+        self.stats["queued"] += 1
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch())
+        else:
+            self._wakeup.set()
+
+        return await job.future
+
+    async def _dispatch(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._start_ready_jobs(time.monotonic())
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _start_ready_jobs(self, now: float) -> typing.Optional[float]:
+        """
+        Start as many jobs as possible, by priority. Returns how long to wait for a rate limited route to be available
+        again, if any job is waiting for one.
+        """
+        if now < self.global_reset_at:
+            return self.global_reset_at - now
+
+        self._release_routes(now)
+
+        while self._queue and self._in_flight < self.max_in_flight:
+            item = heapq.heappop(self._queue)
+            job = item[2]
+            route = job.route
+
+            held = self._held.get(route)
+            if self._released.get(route) is job:
+                del self._released[route]
+            elif held is not None:
+                # Older jobs of the route go first.
+                held.append(item)
+                self.stats["deferred"] += 1
+                continue
+
+            bucket = self.buckets.get(route)
+            if bucket is not None:
+                delay = bucket.delay(now)
+                if delay > 0:
+                    if held is None:
+                        held = self._held[route] = collections.deque()
+                    held.appendleft(item)
+                    heapq.heappush(self._release_at, (now + delay, route))
+                    self.stats["deferred"] += 1
+                    continue
+                bucket.acquire(now)
+
+            if held is not None:
+                self._release_next(route, held)
+
+            self._in_flight += 1
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+        if self._release_at:
+            return max(0.0, self._release_at[0][0] - now)
+        return None
+
+    def _release_routes(self, now: float):
+        """
+        Put back in the queue the first held job of the routes that should be available again.
+        """
+        while self._release_at and self._release_at[0][0] <= now:
+            _, route = heapq.heappop(self._release_at)
+            held = self._held.get(route)
+            if held is None or route in self._released:
+                continue
+
+            bucket = self.buckets.get(route)
+            delay = bucket.delay(now) if bucket is not None else 0.0
+            if delay > 0:
+                # Rate limited again by responses received in the meantime
+                heapq.heappush(self._release_at, (now + delay, route))
+                continue
+
+            self._release_next(route, held)
+
+    def _release_next(self, route: Route, held: typing.Deque[typing.Tuple[int, int, SendJob]]):
+        if not held:
+            del self._held[route]
+            return
+
+        item = held.popleft()
+        self._released[route] = item[2]
+        heapq.heappush(self._queue, item)
+        if not held:
+            del self._held[route]
+
+    async def _execute(self, job: SendJob):
+        self.waits[job.priority].record(time.monotonic() - job.queued_at)
+        try:
+            result = await job.send()
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.stats["sent"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            self._wakeup.set()
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    # Rate limits #
+
+    async def _on_request_end(self, session, trace_config_ctx, params: aiohttp.TraceRequestEndParams):
+        if params.method != "POST":
+            return
+
+        match = MESSAGE_ROUTE_RE.search(params.url.path)
+        if not match:
+            return
+
+        headers = params.response.headers
+        now = time.monotonic()
+
+        if params.response.status == 429:
+            self.stats["rate_limited"] += 1
+            retry_after = float(headers.get("Retry-After", 1))
+            if headers.get("X-RateLimit-Global"):
+                self.global_reset_at = now + retry_after
+                return
+
+        if "X-RateLimit-Remaining" not in headers:
+            return
+
+        if match.group(1):
+            route = (match.group(1), int(match.group(2)))
+        else:
+            route = (match.group(3), int(match.group(4)))
+
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            if len(self.buckets) >= MAX_BUCKETS:
+                self.forget_expired_buckets()
+            bucket = self.buckets[route] = RouteBucket()
+
+        limit = headers.get("X-RateLimit-Limit")
+        bucket.update(
+            int(limit) if limit else None,
+            int(headers["X-RateLimit-Remaining"]),
+            float(headers.get("X-RateLimit-Reset-After", 0)),
+            now,
+        )
+
+    def forget_expired_buckets(self):
+        """
+        Drop the buckets that are reset, so that routes not used anymore don't pile up.
+        """
+        now = time.monotonic()
+        for route, bucket in list(self.buckets.items()):
+            if now >= bucket.reset_at:
+                del self.buckets[route]
+
+    # Metrics #
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depths(self) -> typing.Dict[MessagePriority, int]:
+        depths = collections.Counter(priority for priority, _, _ in self._queue)
+        for held in self._held.values():
+            depths.update(priority for priority, _, _ in held)
+        return {priority: depths[priority] for priority in MessagePriority}
+
+    def reset_stats(self):
+        self.stats.clear()
+        for histogram in self.waits.values():
+            histogram.reset()
+
+    def summary(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depths": {priority.name: depth for priority, depth in self.queue_depths().items()},
+            "rate_limited_routes": sum(1 for bucket in self.buckets.values() if bucket.delay(time.monotonic())),
+            "global_rate_limited": time.monotonic() < self.global_reset_at,
+            "stats": dict(self.stats),
+            "waits": {priority.name: histogram.summary() for priority, histogram in self.waits.items()},
+        }
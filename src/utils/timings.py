@@ -0,0 +1,131 @@
+"""
+Fixed-memory latency histograms, used to keep an eye on the time spent in the background loops.
+"""
+import collections
+import contextlib
+import time
+import typing
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations, in the spirit of HdrHistogram.
+
+    Durations are counted in microseconds, in log-linear buckets: every power of two is split in the same number of
+    sub-buckets, so that quantiles are precise to about 1.5% whatever the magnitude, using a constant amount of memory.
+    """
+
+    def __init__(self, highest: float = 3600, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+
+        self.highest_us = int(highest * 1_000_000)
+        self.counts = [0] * (self._index_for(self.highest_us) + 1)
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index_for(self, value_us: int) -> int:
+        exponent = max(0, value_us.bit_length() - self.sub_bucket_bits)
+        return exponent * self.sub_bucket_half_count + (value_us >> exponent)
+
+    def _highest_value_for(self, index: int) -> int:
+        if index < self.sub_bucket_count:
+            return index
+
+        exponent = (index - self.sub_bucket_count) // self.sub_bucket_half_count + 1
+        mantissa = index - exponent * self.sub_bucket_half_count
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value: float):
+        """
+        Record a duration, in seconds.
+        """
+        value_us = min(max(0, int(value * 1_000_000)), self.highest_us)
+        self.counts[self._index_for(value_us)] += 1
+
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Return the duration (in seconds) under which `percentile`% of the recorded durations are.
+        """
+        if not self.count:
+            return 0.0
+
+        threshold = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(self._highest_value_for(index) / 1_000_000, self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self) -> dict:
+        """
+        Quantiles of the histogram, in milliseconds.
+        """
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LoopTimings:
+    """
+    Time spent in each phase of a loop iteration, plus how late iterations start, and how many were skipped.
+
+    Phases are shared by the loops running the same code, but drift and skipped iterations are kept per loop, so that a
+    single late loop (a stalled shard, for instance) doesn't get averaged away.
+    """
+
+    def __init__(self, phases: typing.Iterable[str]):
+        self.histograms: typing.Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in phases}
+        # Loop name -> how late its iterations start
+        self.drift: typing.DefaultDict[str, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        # Loop name -> iterations skipped to catch up
+        self.skipped_iterations: typing.Counter[str] = collections.Counter()
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histograms[phase].record(time.perf_counter() - start)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.drift.clear()
+        self.skipped_iterations.clear()
+
+    def summary(self) -> dict:
+        return {
+            "phases": {phase: histogram.summary() for phase, histogram in self.histograms.items()},
+            "loops": {
+                name: {"drift": histogram.summary(), "skipped_iterations": self.skipped_iterations[name]}
+                for name, histogram in sorted(self.drift.items())
+            },
+        }
@@ -1,3 +1,4 @@
+import functools
 import gettext
 from typing import Optional
 
@@ -74,6 +75,7 @@ TRANSLATORS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
 def get_translation(language_code):
     return gettext.translation(
         "messages", localedir="locales/", languages=[language_code], fallback=True
@@ -133,6 +135,26 @@ def get_ntranslate_function(bot_or_ctx, language_code, additional_kwargs=None):
     return ngettext
 
 
+@functools.lru_cache(maxsize=None)
+def get_language_translate_function(language_code):
+    """
+    A translate function for the language, shared by everything (ducks, level ups, ...) using it.
+    """
+
+    def _(message, **kwargs):
+        return translate(message, language_code).format(**kwargs)
+
+    return _
+
+
+@functools.lru_cache(maxsize=None)
+def get_language_ntranslate_function(language_code):
+    def ngettext(singular, plural, n, **kwargs):
+        return ntranslate(singular, plural, n, language_code).format(**kwargs)
+
+    return ngettext
+
+
 def fake_translation(message, language_code=None):
     return message
 